@@ -17,11 +17,16 @@ python manage.py makemigrations --noinput
 
 echo "4. Running migrations..."
 python manage.py migrate --noinput
+python manage.py createcachetable
 
 echo "5. Collecting static files..."
 python manage.py collectstatic --noinput --clear
 
-echo "6. Verifying static files..."
+echo "6. Pre-rendering static catalog..."
+# Disajikan vercel.json untuk URL katalog tanpa query string (lihat products/static_catalog.py)
+python manage.py build_static_catalog --clean
+
+echo "7. Verifying static files..."
 echo "=== Static files structure ==="
 find staticfiles -type f | head -20
 echo "=== CSS files ==="
@@ -29,7 +34,7 @@ find staticfiles -name "*.css" | head -10
 echo "=== Image files ==="
 find staticfiles -name "*.png" -o -name "*.jpg" -o -name "*.jpeg" | head -10
 
-echo "7. Checking if staticfiles directory exists..."
+echo "8. Checking if staticfiles directory exists..."
 if [ -d "staticfiles" ]; then
     echo "✅ staticfiles directory exists"
     echo "Contents:"
@@ -5,6 +5,16 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+
+View yang menunggu gateway (Midtrans/SMTP) ditulis async: order_detail,
+continue_payment, retry_payment, midtrans_notification dan
+resend_verification_code. Di ASGI satu worker bisa menunggu banyak request
+gateway sekaligus (python manage.py benchmark_gateway_concurrency).
+Jalankan dengan:
+
+    uvicorn ecommerce.asgi:application --host 0.0.0.0 --port $PORT --workers 2
+
+Middleware proyek mendukung async, sehingga view async tidak dipaksa ke thread.
 """
 
 import os
@@ -13,4 +23,24 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ecommerce.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+
+async def application(scope, receive, send):
+    """
+    Aplikasi Django + lifespan ASGI: saat worker berhenti, client HTTP Midtrans
+    bersama (lihat products/midtrans_utils.py) ditutup
+    """
+    if scope['type'] != 'lifespan':
+        return await django_application(scope, receive, send)
+
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            from products.midtrans_utils import aclose_async_clients
+
+            await aclose_async_clients()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
@@ -5,10 +5,9 @@ Optimized for Vercel deployment.
 
 from pathlib import Path
 import os
-import ssl
-import certifi
 import dj_database_url
 from decouple import config
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -36,6 +35,16 @@ if IS_VERCEL:
 else:
     ALLOWED_HOSTS = ['localhost', '127.0.0.1', '*']
 
+# ==================== STARTUP ====================
+# Cold start (Vercel): modul berat dimuat saat pertama dipakai, bukan saat import settings
+# - email: SSL context dibuat saat email pertama dikirim (products/mail.py)
+# - Midtrans: midtransclient di-import di dalam view pembayaran
+# - Cloudinary: app hanya dipasang jika CLOUDINARY_URL diisi (storage default FileSystemStorage)
+# LAZY_STARTUP=False memuat semuanya di awal seperti sebelumnya (pembanding untuk
+# python manage.py profile_startup)
+LAZY_STARTUP = config('LAZY_STARTUP', default=True, cast=bool)
+CLOUDINARY_ENABLED = bool(config('CLOUDINARY_URL', default='')) or not LAZY_STARTUP
+
 # ==================== APPLICATION DEFINITION ====================
 INSTALLED_APPS = [
     'unfold',
@@ -47,14 +56,14 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'django.contrib.humanize',
     
-    # Third party apps
-    'cloudinary_storage',
-    'cloudinary',
-    
     # Local apps
     'products',
 ]
 
+if CLOUDINARY_ENABLED:
+    # Third party apps
+    INSTALLED_APPS[-1:-1] = ['cloudinary_storage', 'cloudinary']
+
 # ==================== MIDDLEWARE ====================
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
@@ -62,6 +71,8 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'products.page_cache.auth_cookie_middleware',
+    'products.db_router.replica_stickiness_middleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -83,6 +94,7 @@ TEMPLATES = [
                 'django.template.context_processors.media',
                 'django.template.context_processors.static',
                 'django.template.context_processors.csrf',
+                'products.page_cache.page_cache_context',
             ],
         },
     },
@@ -91,24 +103,143 @@ TEMPLATES = [
 WSGI_APPLICATION = 'ecommerce.wsgi.application'
 
 # ==================== DATABASE CONFIGURATION ====================
+# Mode SQLite untuk beberapa worker gunicorn di satu server:
+# - WAL: pembaca tidak memblokir penulis (dan sebaliknya)
+# - synchronous=NORMAL: aman di WAL, fsync hanya saat checkpoint
+# - busy_timeout: tunggu lock alih-alih langsung "database is locked"
+# - transaction_mode=IMMEDIATE: transaksi tulis (atomic) langsung mengambil
+#   write lock di BEGIN, sehingga tidak gagal saat upgrade lock baca -> tulis
+# Benchmark: python manage.py benchmark_sqlite_writes
+SQLITE_TUNED = config('SQLITE_TUNED', default=True, cast=bool)
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': config('SQLITE_BUSY_TIMEOUT', default=5000, cast=int),      # ms
+    'mmap_size': config('SQLITE_MMAP_SIZE', default=128 * 1024 * 1024, cast=int),  # byte
+    'cache_size': config('SQLITE_CACHE_SIZE', default=-32000, cast=int),         # negatif = KiB
+    'temp_store': 'MEMORY',
+}
+SQLITE_OPTIONS = {
+    'init_command': ';'.join(f'PRAGMA {name}={value}' for name, value in SQLITE_PRAGMAS.items()),
+    'transaction_mode': 'IMMEDIATE',
+}
+
+# Mode koneksi PostgreSQL (DATABASE_POOL_MODE):
+# - persistent : satu koneksi per worker dipakai ulang (CONN_MAX_AGE), cocok untuk server biasa
+# - pool       : connection pool psycopg 3 bawaan Django 5 per proses; instance serverless
+#                yang masih hangat memakai ulang koneksi tanpa handshake baru
+# - pgbouncer  : DATABASE_URL mengarah ke PgBouncer (transaction mode); koneksi ditutup
+#                setiap request, tanpa server-side cursor & prepared statement
+# Benchmark: python manage.py benchmark_db_connections
+DATABASE_POOL_MODE = config('DATABASE_POOL_MODE', default='persistent')
+DATABASE_POOL_MIN_SIZE = config('DATABASE_POOL_MIN_SIZE', default=0, cast=int)
+DATABASE_POOL_MAX_SIZE = config('DATABASE_POOL_MAX_SIZE', default=4, cast=int)
+DATABASE_POOL_TIMEOUT = config('DATABASE_POOL_TIMEOUT', default=10, cast=int)   # detik menunggu koneksi kosong
+
+
+def postgres_database(url, mode):
+    if mode == 'persistent':
+        return dj_database_url.parse(url, conn_max_age=600, conn_health_checks=True)
+    database = dj_database_url.parse(url, conn_max_age=0)
+    options = database.setdefault('OPTIONS', {})
+    if mode == 'pool':
+        options['pool'] = {
+            'min_size': DATABASE_POOL_MIN_SIZE,
+            'max_size': DATABASE_POOL_MAX_SIZE,
+            'timeout': DATABASE_POOL_TIMEOUT,
+        }
+    elif mode == 'pgbouncer':
+        # Transaction pooling: cursor & prepared statement tidak bertahan antar transaksi
+        database['DISABLE_SERVER_SIDE_CURSORS'] = True
+        options['prepare_threshold'] = None  # psycopg 3; psycopg2 tidak memakai prepared statement
+    else:
+        raise ImproperlyConfigured('DATABASE_POOL_MODE harus persistent, pool atau pgbouncer')
+    return database
+
+
 if IS_VERCEL:
     # Database untuk production (PostgreSQL)
     database_url = config('DATABASE_URL')
     DATABASES = {
-        'default': dj_database_url.parse(
-            database_url,
-            conn_max_age=600,
-            conn_health_checks=True,
-        )
+        'default': postgres_database(database_url, DATABASE_POOL_MODE)
     }
 else:
-    # Database untuk development (SQLite)
+    # Database untuk development / server tunggal (SQLite)
     DATABASES = {
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
         }
     }
+    if SQLITE_TUNED:
+        DATABASES['default']['OPTIONS'] = SQLITE_OPTIONS
+
+if DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql':
+    # Lookup trigram pg_trgm untuk pencarian fuzzy (products/fuzzy_search.py)
+    INSTALLED_APPS.insert(-1, 'django.contrib.postgres')
+
+# Read replica untuk baca katalog & laporan (products/db_router.py)
+# DATABASE_REPLICA_URLS: daftar URL dipisah koma, mis. postgres://...replica1,postgres://...replica2
+# atau untuk uji lokal sqlite:////path/replica.sqlite3
+DATABASE_REPLICA_URLS = [url.strip() for url in config('DATABASE_REPLICA_URLS', default='').split(',') if url.strip()]
+DATABASE_REPLICA_MAX_LAG = config('DATABASE_REPLICA_MAX_LAG', default=5, cast=int)          # detik
+DATABASE_REPLICA_HEALTH_INTERVAL = 5                                                        # detik antar cek
+DATABASE_REPLICA_STICKY_SECONDS = config('DATABASE_REPLICA_STICKY_SECONDS', default=10, cast=int)
+DATABASE_REPLICA_STICKY_COOKIE = 'mm_primary'
+for _index, _url in enumerate(DATABASE_REPLICA_URLS, start=1):
+    if _url.startswith(('postgres://', 'postgresql://')):
+        _replica = postgres_database(_url, DATABASE_POOL_MODE)
+    else:
+        _replica = dj_database_url.parse(_url)
+    # Test memakai database default, bukan membuat database replica terpisah
+    _replica['TEST'] = {'MIRROR': 'default'}
+    DATABASES[f'replica_{_index}'] = _replica
+if DATABASE_REPLICA_URLS:
+    DATABASE_ROUTERS = ['products.db_router.ReplicaRouter']
+
+# ==================== CACHE ====================
+# Default tabel database agar cache & versi tag invalidasi (page_cache) dipakai
+# bersama oleh semua worker gunicorn & instance (buat tabel: python manage.py createcachetable).
+# LocMemCache terpisah per proses: hanya untuk development (DEBUG=True, satu proses runserver)
+if DEBUG:
+    _default_cache_backend = 'django.core.cache.backends.locmem.LocMemCache'
+else:
+    _default_cache_backend = 'django.core.cache.backends.db.DatabaseCache'
+
+CACHE_BACKEND = config('CACHE_BACKEND', default=_default_cache_backend)
+if CACHE_BACKEND.endswith('LocMemCache') and config('WEB_CONCURRENCY', default=1, cast=int) > 1:
+    raise ImproperlyConfigured(
+        'LocMemCache tidak dipakai bersama antar worker (WEB_CONCURRENCY > 1): '
+        'invalidasi cache hanya berlaku di satu worker. Pakai DatabaseCache atau cache bersama lain.'
+    )
+
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': config('CACHE_LOCATION', default='django_cache'),
+    }
+}
+
+# Cache halaman katalog (lihat products/page_cache.py)
+PAGE_CACHE_ENABLED = config('PAGE_CACHE_ENABLED', default=True, cast=bool)
+PAGE_CACHE_TIMEOUT = 60 * 15          # Lama HTML disimpan di cache server
+PAGE_CACHE_BROWSER_MAX_AGE = 60       # Cache-Control max-age untuk browser
+PAGE_CACHE_CDN_MAX_AGE = 60 * 5       # Cache-Control s-maxage untuk CDN
+PAGE_CACHE_AUTH_COOKIE = 'mm_auth'    # Cookie penanda login untuk hydrate header
+
+# Pre-render katalog publik (python manage.py build_static_catalog)
+STATIC_CATALOG_ROOT = BASE_DIR / 'static_catalog'
+# Render ulang halaman yang terpengaruh setiap produk berubah (butuh filesystem yang bisa ditulis)
+STATIC_CATALOG_AUTO_REBUILD = config('STATIC_CATALOG_AUTO_REBUILD', default=False, cast=bool)
+
+# Autocomplete pencarian dari index di memori (lihat products/search_index.py)
+SEARCH_SUGGEST_LIMIT = 8              # Jumlah saran per request
+SEARCH_SUGGEST_RECHECK_SECONDS = 2    # Jeda minimum cek versi katalog untuk memperbarui index
+
+# Pencarian fuzzy halaman shop (lihat products/fuzzy_search.py)
+FUZZY_SEARCH_THRESHOLD = config('FUZZY_SEARCH_THRESHOLD', default=0.6, cast=float)   # Kemiripan trigram minimum (0-1)
+FUZZY_SEARCH_MAX_RESULTS = 200        # Maksimal produk hasil pencarian
+FUZZY_SEARCH_TIMEOUT_MS = 200         # Batas waktu query fuzzy, lewat dari ini hanya kecocokan persis
 
 # ==================== PASSWORD VALIDATION ====================
 AUTH_PASSWORD_VALIDATORS = [
@@ -145,8 +276,76 @@ STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 # Pastikan ini di settings.py
 DEBUG = False  # Atau dari environment variable
 
-# Simple static files storage
-STATICFILES_STORAGE = 'django.contrib.staticfiles.storage.StaticFilesStorage'
+# Static files storage dengan optimasi gambar saat collectstatic
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'products.storage.OptimizedStaticFilesStorage',
+    },
+}
+
+# Optimasi gambar (lihat products/storage.py)
+STATIC_IMAGE_MAX_DIMENSION = 1600
+STATIC_IMAGE_JPEG_QUALITY = 85
+STATIC_IMAGE_WEBP_QUALITY = 82
+STATIC_FAVICON_SOURCE = 'image/icon mancingmo3.png'
+STATIC_FAVICON_DIR = 'image/favicon'
+
+# Bundle CSS/JS per halaman, dibangun saat collectstatic (lihat products/assets.py)
+# Urutan file dipertahankan: header/footer -> CSS halaman -> layout dasar (base.css)
+_BASE_CSS_HEAD = ['css/header.css', 'css/footer.css']
+_BASE_CSS_TAIL = ['css/base.css']
+_ACCOUNT_CSS = ['css/edit_profile.css', 'css/order_history.css', 'css/change_password.css']
+_BASE_JS = ['js/base.js']
+
+ASSET_BUNDLES = {
+    'base': {'css': _BASE_CSS_HEAD + _BASE_CSS_TAIL, 'js': _BASE_JS},
+    'home': {'css': _BASE_CSS_HEAD + ['css/index.css'] + _BASE_CSS_TAIL},
+    'shop': {
+        'css': _BASE_CSS_HEAD + ['css/shop.css'] + _BASE_CSS_TAIL,
+        'js': _BASE_JS + ['js/search_suggest.js'],
+    },
+    'product_detail': {
+        'css': _BASE_CSS_HEAD + ['css/product_detail.css'] + _BASE_CSS_TAIL,
+        'js': _BASE_JS + ['js/product_detail.js'],
+    },
+    'about': {'css': _BASE_CSS_HEAD + ['css/about.css'] + _BASE_CSS_TAIL},
+    'contact': {'css': _BASE_CSS_HEAD + ['css/contact.css'] + _BASE_CSS_TAIL},
+    'cart': {'css': _BASE_CSS_HEAD + ['css/cart.css'] + _BASE_CSS_TAIL},
+    'checkout': {
+        'css': _BASE_CSS_HEAD + ['css/checkout.css'] + _BASE_CSS_TAIL,
+        'js': _BASE_JS + ['js/checkout.js'],
+    },
+    'login': {'css': _BASE_CSS_HEAD + ['css/login page.css'] + _BASE_CSS_TAIL},
+    'register': {'css': _BASE_CSS_HEAD + ['css/register page.css'] + _BASE_CSS_TAIL},
+    'verify_email': {'css': _BASE_CSS_HEAD + ['css/verify_email.css'] + _BASE_CSS_TAIL},
+    'account': {'css': _BASE_CSS_HEAD + _ACCOUNT_CSS + _BASE_CSS_TAIL},
+    'profile': {'css': _BASE_CSS_HEAD + _ACCOUNT_CSS + ['css/profile.css'] + _BASE_CSS_TAIL},
+    'order_detail': {'css': _BASE_CSS_HEAD + _ACCOUNT_CSS + ['css/order_detail.css'] + _BASE_CSS_TAIL},
+}
+
+# ==================== SESSION ====================
+# SESSION_BACKEND:
+# - db             : default Django, setiap request login membaca tabel django_session
+# - cached_db      : baca dari cache, tulis ke cache + database
+# - cache          : hanya cache (butuh CACHE_BACKEND bersama antar instance, bukan locmem)
+# - signed_cookies : tanpa I/O server, data di cookie bertanda tangan SECRET_KEY
+#                    (logout tidak bisa mencabut cookie lama yang sudah disalin)
+# State checkout di session dibuat kecil agar muat di cookie (products/checkout_session.py)
+_SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'cache': 'django.contrib.sessions.backends.cache',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SESSION_BACKEND = config('SESSION_BACKEND', default='db')
+if SESSION_BACKEND not in _SESSION_ENGINES:
+    raise ImproperlyConfigured(
+        f"SESSION_BACKEND harus salah satu dari: {', '.join(_SESSION_ENGINES)}"
+    )
+SESSION_ENGINE = _SESSION_ENGINES[SESSION_BACKEND]
 
 # ==================== SECURITY SETTINGS ====================
 if IS_VERCEL:
@@ -188,15 +387,8 @@ LOGIN_REDIRECT_URL = 'profile'
 LOGOUT_REDIRECT_URL = 'home'
 
 # ==================== EMAIL CONFIGURATION ====================
-# Fix SSL untuk Python
-os.environ['SSL_CERT_FILE'] = certifi.where()
-os.environ['REQUESTS_CA_BUNDLE'] = certifi.where()
-
-_ssl_context = ssl.create_default_context(cafile=certifi.where())
-_ssl_context.check_hostname = False
-_ssl_context.verify_mode = ssl.CERT_NONE
-
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+# SMTP dengan SSL context certifi, dibuat saat email pertama dikirim (products/mail.py)
+EMAIL_BACKEND = 'products.mail.SSLContextEmailBackend'
 EMAIL_HOST = 'smtp.gmail.com'
 EMAIL_PORT = 587
 EMAIL_USE_TLS = True
@@ -206,37 +398,24 @@ EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
 DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default=f'MancingMo <{config("EMAIL_HOST_USER", default="")}>')
 EMAIL_TIMEOUT = 30
 
-# Monkey patch untuk email SSL
-import django.core.mail.backends.smtp
-import smtplib
-
-original_starttls = django.core.mail.backends.smtp.EmailBackend.open
-
-def patched_open(self):
-    """Patched open method dengan custom SSL context"""
-    try:
-        if self.connection:
-            return False
-        connection_params = {'host': self.host, 'port': self.port}
-        if self.timeout is not None:
-            connection_params['timeout'] = self.timeout
-        if self.use_ssl:
-            connection_params['context'] = _ssl_context
-        try:
-            self.connection = self.connection_class(**connection_params)
-            if not self.use_ssl and self.use_tls:
-                self.connection.starttls(context=_ssl_context)
-            if self.username and self.password:
-                self.connection.login(self.username, self.password)
-            return True
-        except (OSError, smtplib.SMTPException):
-            if not self.fail_silently:
-                raise
-            return False
-    except Exception:
-        return original_starttls(self)
-
-django.core.mail.backends.smtp.EmailBackend.open = patched_open
+# Email perubahan status pesanan dikirim oleh: python manage.py send_order_notifications
+# (cron/worker). > 0 = kirim sebagian langsung setelah commit di thread latar; jangan
+# dipakai di serverless (thread bisa dihentikan setelah response, email yang sudah
+# diklaim baru dikirim ulang setelah ORDER_NOTIFICATION_CLAIM_TIMEOUT)
+ORDER_NOTIFICATION_INLINE_BATCH = config('ORDER_NOTIFICATION_INLINE_BATCH', default=0, cast=int)
+# Vercel (tanpa worker): crons di vercel.json memanggil /cron/send-order-notifications/
+# tiap 5 menit dengan Authorization: Bearer <CRON_SECRET> (set CRON_SECRET di env Vercel;
+# jadwal per 5 menit butuh plan Pro, plan Hobby hanya sekali sehari)
+CRON_SECRET = config('CRON_SECRET', default='')
+ORDER_NOTIFICATION_CRON_BATCH = 20            # Email per panggilan cron (batas durasi function)
+# Klaim antrian yang belum selesai setelah ini (proses mati saat kirim) dikirim ulang
+ORDER_NOTIFICATION_CLAIM_TIMEOUT = 15 * 60    # detik
+
+# LAZY_STARTUP=False: siapkan email & Midtrans saat startup (lihat STARTUP)
+if not LAZY_STARTUP:
+    from products.mail import ssl_context
+    ssl_context()
+    import midtransclient  # noqa: F401
 
 # ==================== MIDTRANS CONFIGURATION ====================
 MIDTRANS_SERVER_KEY = config('MIDTRANS_SERVER_KEY', default='')
@@ -255,22 +434,17 @@ def environment_callback(request):
 def dashboard_callback(request, context):
     """Callback untuk custom dashboard stats"""
     try:
-        from products.models import Order, Product
-        from django.db.models import Sum
+        from products.badges import get_dashboard_stats
         
-        total_orders = Order.objects.count()
-        total_revenue = Order.objects.filter(
-            status='delivered'
-        ).aggregate(total=Sum('total'))['total'] or 0
-        total_products = Product.objects.count()
-        pending_orders = Order.objects.filter(status='pending').count()
+        # Satu query ke tabel ringkasan (lihat products.models.DashboardStats)
+        stats = get_dashboard_stats(request)
         
         context.update({
             "custom_stats": {
-                "total_orders": total_orders,
-                "total_revenue": total_revenue,
-                "total_products": total_products,
-                "pending_orders": pending_orders,
+                "total_orders": stats.total_orders,
+                "total_revenue": stats.total_revenue,
+                "total_products": stats.total_products,
+                "pending_orders": stats.pending_orders,
             }
         })
     except Exception as e:
@@ -367,12 +541,18 @@ UNFOLD = {
                         "title": "Pesanan",
                         "icon": "shopping_bag",
                         "link": lambda request: "/admin/products/order/",
+                        "badge": "products.badges.order_badge",
                     },
                     {
                         "title": "Keranjang",
                         "icon": "shopping_cart",
                         "link": lambda request: "/admin/products/cart/",
                     },
+                    {
+                        "title": "Laporan Penjualan",
+                        "icon": "bar_chart",
+                        "link": lambda request: "/admin/products/dailysales/",
+                    },
                 ],
             },
             {
@@ -420,6 +600,7 @@ UNFOLD = {
                         "title": "Pesan Kontak",
                         "icon": "email",
                         "link": lambda request: "/admin/products/contactmessage/",
+                        "badge": "products.badges.message_badge",
                     },
                 ],
             },
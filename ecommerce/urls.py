@@ -11,9 +11,18 @@ urlpatterns = [
     path('accounts/', include('django.contrib.auth.urls')),
 ]
 
+
+def serve_static(request, path, document_root=None):
+    """Serve static files; bundle ber-hash aman di-cache selamanya"""
+    response = serve(request, path, document_root=document_root)
+    if path.startswith('bundles/'):
+        response['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
+
 # Manual static files serving untuk production
 urlpatterns += [
-    re_path(r'^static/(?P<path>.*)$', serve, {
+    re_path(r'^static/(?P<path>.*)$', serve_static, {
         'document_root': settings.STATIC_ROOT,
     }),
 ]
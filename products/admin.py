@@ -1,21 +1,45 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.models import User, Group
 from django.utils.html import format_html
+from django.utils import timezone
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
 from django import forms
+from django.template.response import TemplateResponse
 from unfold.admin import ModelAdmin as UnfoldModelAdmin
 
 # ✅ Import semua model sekaligus
 from .models import (
     Category, Product, ProductImage, UserProfile, ShippingAddress,
     Cart, CartItem, Order, OrderItem, ContactMessage, ProductReview,
-    AdminUser, CustomerUser, EmailVerification, Voucher, ShippingCost
+    AdminUser, CustomerUser, EmailVerification, Voucher, ShippingCost,
+    DashboardStats, DailySales, OrderStatusLog
 )
+from .order_export import streaming_export_response
+from .order_status import can_transition, resolve_target, transition_order, transition_orders
+from .sales_report import get_sales_report
 
 # ==================== UNREGISTER DEFAULT USER & GROUP ====================
 admin.site.unregister(User)
 admin.site.unregister(Group)
 
+
+def count_subquery(queryset, field):
+    """
+    COUNT baris terkait sebagai subquery per baris changelist
+    (tanpa JOIN sehingga beberapa hitungan tidak saling menggandakan)
+    """
+    counts = (
+        queryset.filter(**{field: OuterRef('pk')})
+        .order_by()
+        .values(field)
+        .annotate(count=Count('*'))
+        .values('count')
+    )
+    return Coalesce(Subquery(counts), 0)
+
 # ==================== ADMIN USER ADMIN ====================
 
 @admin.register(AdminUser)
@@ -54,7 +78,7 @@ class AdminUserAdmin(UnfoldModelAdmin, BaseUserAdmin):
     
     def get_queryset(self, request):
         qs = super().get_queryset(request)
-        return qs.filter(is_staff=True)
+        return qs.filter(is_staff=True).select_related('profile')
     
     def save_model(self, request, obj, form, change):
         if not change:
@@ -125,7 +149,9 @@ class CustomerUserAdmin(UnfoldModelAdmin, BaseUserAdmin):
     
     def get_queryset(self, request):
         qs = super().get_queryset(request)
-        return qs.filter(is_staff=False)
+        return qs.filter(is_staff=False).select_related('profile').annotate(
+            _total_orders=count_subquery(Order.objects, 'user'),
+        )
     
     def save_model(self, request, obj, form, change):
         if not change:
@@ -155,11 +181,12 @@ class CustomerUserAdmin(UnfoldModelAdmin, BaseUserAdmin):
     city_display.short_description = 'Kota'
     
     def total_orders(self, obj):
-        count = obj.orders.count()
+        count = obj._total_orders
         if count > 0:
             return format_html('<span style="color: green; font-weight: bold;">{} Pesanan</span>', count)
         return format_html('<span style="color: gray;">0 Pesanan</span>')
     total_orders.short_description = 'Total Pesanan'
+    total_orders.admin_order_field = '_total_orders'
 
 # ==================== GROUP ADMIN ====================
 
@@ -169,15 +196,22 @@ class GroupAdmin(UnfoldModelAdmin):
     search_fields = ['name']
     filter_horizontal = ['permissions']
     
+    def get_queryset(self, request):
+        qs = super().get_queryset(request)
+        return qs.annotate(
+            _total_users=count_subquery(User.groups.through.objects, 'group'),
+            _permissions_count=count_subquery(Group.permissions.through.objects, 'group'),
+        )
+    
     def total_users(self, obj):
-        count = obj.user_set.count()
-        return f"{count} user(s)"
+        return f"{obj._total_users} user(s)"
     total_users.short_description = 'Total Users'
+    total_users.admin_order_field = '_total_users'
     
     def permissions_count(self, obj):
-        count = obj.permissions.count()
-        return f"{count} permission(s)"
+        return f"{obj._permissions_count} permission(s)"
     permissions_count.short_description = 'Permissions'
+    permissions_count.admin_order_field = '_permissions_count'
 
 # ==================== CATEGORY ADMIN ====================
 
@@ -200,10 +234,14 @@ class CategoryAdmin(UnfoldModelAdmin):
     )
     readonly_fields = ['created_at']
     
+    def get_queryset(self, request):
+        qs = super().get_queryset(request)
+        return qs.annotate(_total_products=count_subquery(Product.objects, 'category'))
+    
     def total_products(self, obj):
-        count = obj.products.count()
-        return f"{count} produk"
+        return f"{obj._total_products} produk"
     total_products.short_description = 'Total Produk'
+    total_products.admin_order_field = '_total_products'
 
 # ==================== PRODUCT FORM (CUSTOM) ====================
 
@@ -395,16 +433,24 @@ class CartAdmin(UnfoldModelAdmin):
     readonly_fields = ['created_at', 'updated_at']
     
     def total_items_display(self, obj):
-        return f"{obj.total_items} item"
+        return f"{obj._total_items} item"
     total_items_display.short_description = 'Total Items'
+    total_items_display.admin_order_field = '_total_items'
     
     def total_price_display(self, obj):
-        return "Rp {:,.0f}".format(obj.total_price)
+        return "Rp {:,.0f}".format(obj._total_price)
     total_price_display.short_description = 'Total Price'
+    total_price_display.admin_order_field = '_total_price'
     
     def get_queryset(self, request):
         qs = super().get_queryset(request)
-        return qs.select_related('user').prefetch_related('items')
+        return qs.select_related('user').annotate(
+            _total_items=Coalesce(Sum('items__quantity'), 0),
+            _total_price=Coalesce(
+                Sum(F('items__quantity') * F('items__product__price'), output_field=DecimalField()),
+                Value(0, output_field=DecimalField()),
+            ),
+        )
 
 # ==================== ORDER ADMIN ====================
 
@@ -416,14 +462,49 @@ class OrderItemInline(admin.TabularInline):
     verbose_name = "Item Pesanan"
     verbose_name_plural = "Item Pesanan"
 
+class OrderStatusLogInline(admin.TabularInline):
+    model = OrderStatusLog
+    extra = 0
+    fields = ['created_at', 'from_status', 'to_status', 'source', 'changed_by', 'note', 'notified_at']
+    readonly_fields = fields
+    can_delete = False
+    verbose_name = "Riwayat Status"
+    verbose_name_plural = "Riwayat Status"
+    
+    def has_add_permission(self, request, obj=None):
+        return False
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('changed_by')
+
+class OrderAdminForm(forms.ModelForm):
+    """Validasi perubahan status (form edit & list_editable) sesuai state machine"""
+    
+    class Meta:
+        model = Order
+        fields = '__all__'
+    
+    def clean_status(self):
+        status = self.cleaned_data['status']
+        old_status = self.initial.get('status')
+        if self.instance.pk and old_status and status != old_status:
+            target = resolve_target(status, self.cleaned_data.get('shipping_method', self.instance.shipping_method))
+            if target != old_status and not can_transition(old_status, status):
+                labels = dict(Order.STATUS_CHOICES)
+                raise forms.ValidationError(
+                    f'Status tidak bisa diubah dari "{labels[old_status]}" ke "{labels[status]}".'
+                )
+        return status
+
 @admin.register(Order)
 class OrderAdmin(UnfoldModelAdmin):
+    form = OrderAdminForm
     list_display = ['order_number', 'user', 'shipping_name', 'status', 'payment_method', 'total_display', 'created_at']
     list_filter = ['status', 'payment_method', 'created_at', 'updated_at']
     search_fields = ['order_number', 'user__username', 'user__email', 'shipping_name', 'shipping_phone']
     list_editable = ['status']
     ordering = ['-created_at']
-    inlines = [OrderItemInline]
+    inlines = [OrderItemInline, OrderStatusLogInline]
     date_hierarchy = 'created_at'
     
     fieldsets = (
@@ -459,33 +540,65 @@ class OrderAdmin(UnfoldModelAdmin):
         qs = super().get_queryset(request)
         return qs.select_related('user').prefetch_related('items')
     
-    actions = ['mark_as_paid', 'mark_as_processing', 'mark_as_shipped', 'mark_as_delivered', 'mark_as_cancelled']
+    actions = [
+        'mark_as_paid', 'mark_as_processing', 'mark_as_shipped', 'mark_as_delivered', 'mark_as_cancelled',
+        'export_csv', 'export_xlsx',
+    ]
+    
+    def get_changelist_form(self, request, **kwargs):
+        kwargs.setdefault('form', OrderAdminForm)
+        return super().get_changelist_form(request, **kwargs)
+    
+    def save_model(self, request, obj, form, change):
+        if not change or 'status' not in form.changed_data:
+            return super().save_model(request, obj, form, change)
+        # Simpan field lain dengan status lama, lalu ubah status lewat state machine
+        new_status = obj.status
+        obj.status = form.initial['status']
+        super().save_model(request, obj, form, change)
+        transition_order(obj, new_status, source='admin', changed_by=request.user)
+    
+    def _update_status(self, request, queryset, status, label):
+        result = transition_orders(queryset, status, source='admin', changed_by=request.user)
+        self.message_user(request, f'{result["updated"]} order(s) berhasil ditandai sebagai "{label}".')
+        if result['restocked']:
+            units = sum(result['restocked'].values())
+            self.message_user(request, f'Stock {units} unit dari {len(result["restocked"])} produk telah dikembalikan.')
+        if result['skipped']:
+            self.message_user(
+                request,
+                f'{result["skipped"]} order(s) dilewati karena sudah berstatus "{label}" atau status tidak bisa diubah.',
+                level=messages.WARNING,
+            )
     
     @admin.action(description='✅ Tandai sebagai Sudah Dibayar')
     def mark_as_paid(self, request, queryset):
-        from django.utils import timezone
-        updated = queryset.update(status='paid', paid_at=timezone.now())
-        self.message_user(request, f'{updated} order(s) berhasil ditandai sebagai "Sudah Dibayar".')
+        self._update_status(request, queryset, 'paid', 'Sudah Dibayar')
     
     @admin.action(description='🔄 Tandai sebagai Sedang Diproses')
     def mark_as_processing(self, request, queryset):
-        updated = queryset.update(status='processing')
-        self.message_user(request, f'{updated} order(s) berhasil ditandai sebagai "Sedang Diproses".')
+        self._update_status(request, queryset, 'processing', 'Sedang Diproses')
     
     @admin.action(description='🚚 Tandai sebagai Dikirim')
     def mark_as_shipped(self, request, queryset):
-        updated = queryset.update(status='shipped')
-        self.message_user(request, f'{updated} order(s) berhasil ditandai sebagai "Dikirim".')
+        self._update_status(request, queryset, 'shipped', 'Dikirim')
     
     @admin.action(description='✨ Tandai sebagai Terkirim')
     def mark_as_delivered(self, request, queryset):
-        updated = queryset.update(status='delivered')
-        self.message_user(request, f'{updated} order(s) berhasil ditandai sebagai "Terkirim".')
+        self._update_status(request, queryset, 'delivered', 'Terkirim')
     
     @admin.action(description='❌ Tandai sebagai Dibatalkan')
     def mark_as_cancelled(self, request, queryset):
-        updated = queryset.update(status='cancelled')
-        self.message_user(request, f'{updated} order(s) berhasil ditandai sebagai "Dibatalkan".')
+        self._update_status(request, queryset, 'cancelled', 'Dibatalkan')
+    
+    # Filter tanggal/status di changelist ikut terbawa; pilih "semua" untuk export seluruh hasil filter
+    @admin.action(description='📄 Export CSV (pesanan + item)')
+    def export_csv(self, request, queryset):
+        return streaming_export_response(queryset, 'csv')
+    
+    @admin.action(description='📊 Export XLSX (pesanan + item)')
+    def export_xlsx(self, request, queryset):
+        return streaming_export_response(queryset, 'xlsx')
 
 # ==================== CONTACT MESSAGE ADMIN ====================
 
@@ -525,14 +638,22 @@ class ContactMessageAdmin(UnfoldModelAdmin):
     
     actions = ['mark_as_read', 'mark_as_unread']
     
+    def _update_read(self, queryset, is_read):
+        """Bulk update is_read + sesuaikan DashboardStats (update() tidak memicu signal)"""
+        with transaction.atomic():
+            delta = DashboardStats.message_read_delta(queryset, is_read)
+            updated = queryset.update(is_read=is_read)
+            DashboardStats.apply_delta(**delta)
+        return updated
+    
     @admin.action(description='✅ Tandai sebagai Sudah Dibaca')
     def mark_as_read(self, request, queryset):
-        updated = queryset.update(is_read=True)
+        updated = self._update_read(queryset, True)
         self.message_user(request, f'{updated} pesan berhasil ditandai sebagai sudah dibaca.')
     
     @admin.action(description='📧 Tandai sebagai Belum Dibaca')
     def mark_as_unread(self, request, queryset):
-        updated = queryset.update(is_read=False)
+        updated = self._update_read(queryset, False)
         self.message_user(request, f'{updated} pesan berhasil ditandai sebagai belum dibaca.')
 
 # ==================== PRODUCT REVIEW ADMIN ====================
@@ -557,6 +678,10 @@ class ProductReviewAdmin(UnfoldModelAdmin):
             'classes': ('collapse',)
         }),
     )
+    
+    def get_queryset(self, request):
+        qs = super().get_queryset(request)
+        return qs.select_related('user', 'product')
 
 # ==================== SHIPPING ADDRESS ADMIN ====================
 
@@ -674,6 +799,63 @@ class ShippingCostAdmin(UnfoldModelAdmin):
     )
     readonly_fields = ['created_at', 'updated_at']
 
+# ==================== SALES REPORT ADMIN ====================
+
+@admin.register(DailySales)
+class SalesReportAdmin(UnfoldModelAdmin):
+    """
+    Halaman laporan penjualan (read-only) yang hanya membaca tabel rollup
+    Data diperbarui oleh: python manage.py refresh_sales_rollups
+    """
+    PERIOD_CHOICES = [7, 30, 90, 365]
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def has_delete_permission(self, request, obj=None):
+        return False
+    
+    def _ranking_table(self, rows, name_field):
+        return {
+            'headers': ['Nama', 'Pesanan', 'Unit', 'Pendapatan', 'Rata-rata Keranjang', 'Diskon Voucher'],
+            'rows': [
+                [
+                    row[name_field],
+                    row['total_orders'],
+                    row['total_units'],
+                    "Rp {:,.0f}".format(row['total_revenue']),
+                    "Rp {:,.0f}".format(row['average_basket']),
+                    "Rp {:,.0f}".format(row['total_voucher']),
+                ]
+                for row in rows
+            ],
+        }
+    
+    def changelist_view(self, request, extra_context=None):
+        try:
+            days = int(request.GET.get('days', 30))
+        except ValueError:
+            days = 30
+        if days not in self.PERIOD_CHOICES:
+            days = 30
+        
+        report = get_sales_report(days=days)
+        context = {
+            **self.admin_site.each_context(request),
+            'title': 'Laporan Penjualan',
+            'opts': self.model._meta,
+            'days': days,
+            'period_choices': self.PERIOD_CHOICES,
+            'report': report,
+            'product_table': self._ranking_table(report['top_products'], 'product__name'),
+            'category_table': self._ranking_table(report['top_categories'], 'category__name'),
+            **(extra_context or {}),
+        }
+        return TemplateResponse(request, 'admin/products/sales_report.html', context)
+
 # ==================== ADMIN SITE CUSTOMIZATION ====================
 
 admin.site.site_header = 'MancingMo Admin'
@@ -0,0 +1,238 @@
+# products/assets.py
+"""
+Bundling CSS/JS per halaman
+
+Bundle didefinisikan di settings.ASSET_BUNDLES, dibangun saat collectstatic
+(lihat OptimizedStaticFilesStorage.post_process) menjadi file ter-minify
+dengan hash di nama file, sehingga aman di-cache browser selamanya.
+"""
+
+import hashlib
+import os
+import re
+
+from django.conf import settings
+
+BUNDLE_DIR = 'bundles'
+BUNDLE_KINDS = ('css', 'js')
+
+# Komentar dan string CSS; whitespace di dalam string tidak boleh diubah
+_CSS_TOKEN_RE = re.compile(r'''(/\*.*?\*/|"(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')''', re.S)
+_CSS_SPACE_RE = re.compile(r'\s+')
+_CSS_PUNCT_RE = re.compile(r'\s*([{};,])\s*')
+_CSS_COLON_RE = re.compile(r':\s+')
+
+
+def _minify_css_code(code):
+    code = _CSS_SPACE_RE.sub(' ', code)
+    code = _CSS_PUNCT_RE.sub(r'\1', code)
+    code = _CSS_COLON_RE.sub(':', code)
+    return code.replace(';}', '}')
+
+
+def minify_css(source):
+    """Minify CSS secara konservatif (hapus komentar & whitespace di luar string)"""
+    # Buang komentar dulu agar whitespace di sekitarnya ikut dirapikan
+    source = _CSS_TOKEN_RE.sub(lambda match: '' if match.group(0).startswith('/*') else match.group(0), source)
+    parts = _CSS_TOKEN_RE.split(source)
+    for index in range(0, len(parts), 2):
+        parts[index] = _minify_css_code(parts[index])
+    return ''.join(parts).strip()
+
+
+# Token sebelum "/" yang berarti awal regex literal, bukan operator pembagian
+_JS_REGEX_KEYWORDS = {'return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'void', 'delete', 'new', 'throw'}
+_JS_WORD_RE = re.compile(r'[\w$]+$')
+_JS_LINE_SPACE_RE = re.compile(r'[ \t]*\n\s*')
+
+
+def _regex_allowed(code, default):
+    """Apakah "/" setelah potongan kode ini memulai regex literal"""
+    code = code.rstrip()
+    if not code:
+        return default
+    word = _JS_WORD_RE.search(code)
+    if word:
+        return word.group(0) in _JS_REGEX_KEYWORDS
+    return code[-1] not in ')]'
+
+
+def _scan_quoted(source, start, quote):
+    """Index setelah string yang dimulai di start (berhenti di akhir baris jika tidak ditutup)"""
+    i = start + 1
+    while i < len(source) and source[i] != quote and source[i] != '\n':
+        i += 2 if source[i] == '\\' else 1
+    return min(i + 1, len(source))
+
+
+def _scan_template(source, start):
+    """Return (index setelah potongan template, True jika berhenti di ${)"""
+    i = start + 1
+    while i < len(source):
+        if source[i] == '\\':
+            i += 2
+        elif source[i] == '`':
+            return i + 1, False
+        elif source.startswith('${', i):
+            return i + 2, True
+        else:
+            i += 1
+    return len(source), False
+
+
+def _scan_regex(source, start):
+    i = start + 1
+    in_class = False
+    while i < len(source) and source[i] != '\n':
+        char = source[i]
+        if char == '\\':
+            i += 2
+            continue
+        if char == '[':
+            in_class = True
+        elif char == ']':
+            in_class = False
+        elif char == '/' and not in_class:
+            break
+        i += 1
+    i += 1
+    while i < len(source) and source[i].isalpha():
+        i += 1
+    return min(i, len(source))
+
+
+def _js_tokens(source):
+    """
+    Pecah source JS menjadi (jenis, teks) dengan jenis 'code', 'literal'
+    (string, template literal, regex) atau 'comment'. Template literal dengan
+    ${...} bersarang dan regex literal dikenali agar isinya tidak diubah.
+    """
+    i = code_start = 0
+    regex_allowed = True
+    # Kedalaman kurung kurawal untuk setiap ${ yang sedang terbuka
+    template_braces = []
+
+    while i < len(source):
+        char = source[i]
+        if char in '"\'`' or (char == '}' and template_braces and template_braces[-1] == 0):
+            yield 'code', source[code_start:i]
+            if char in '"\'':
+                end = _scan_quoted(source, i, char)
+                regex_allowed = False
+            else:
+                # Awal template literal, atau lanjutan setelah ${...}
+                if char == '}':
+                    template_braces.pop()
+                end, opens_expression = _scan_template(source, i)
+                if opens_expression:
+                    template_braces.append(0)
+                regex_allowed = opens_expression
+            yield 'literal', source[i:end]
+            i = code_start = end
+        elif source.startswith('//', i) or source.startswith('/*', i):
+            yield 'code', source[code_start:i]
+            if source[i + 1] == '/':
+                end = source.find('\n', i)
+                end = len(source) if end == -1 else end
+            else:
+                end = source.find('*/', i + 2)
+                end = len(source) if end == -1 else end + 2
+            yield 'comment', source[i:end]
+            i = code_start = end
+        elif char == '/' and _regex_allowed(source[code_start:i], regex_allowed):
+            yield 'code', source[code_start:i]
+            end = _scan_regex(source, i)
+            yield 'literal', source[i:end]
+            regex_allowed = False
+            i = code_start = end
+        else:
+            if template_braces and char == '{':
+                template_braces[-1] += 1
+            elif template_braces and char == '}':
+                template_braces[-1] -= 1
+            if not char.isspace():
+                regex_allowed = _regex_allowed(char, regex_allowed)
+            i += 1
+    yield 'code', source[code_start:]
+
+
+def minify_js(source):
+    """
+    Minify JS secara konservatif: hanya hapus komentar, indentasi dan baris
+    kosong di luar string/template literal/regex. Tidak mengubah isi statement.
+    """
+    parts = []
+    code = []
+
+    def flush():
+        # Baris baru dipertahankan (automatic semicolon insertion)
+        parts.append(_JS_LINE_SPACE_RE.sub('\n', ''.join(code)))
+        code.clear()
+
+    for kind, text in _js_tokens(source):
+        if kind == 'code':
+            code.append(text)
+        elif kind == 'comment':
+            code.append('\n' if '\n' in text or text.startswith('//') else ' ')
+        else:
+            flush()
+            parts.append(text)
+    flush()
+    return ''.join(parts).strip()
+
+
+_CSS_URL_DECLARATION_RE = re.compile(r'([\w-]+)\s*:([^;{}]*\burl\([^;{}]*?)(;|(?=\}))')
+_CSS_URL_RE = re.compile(r'''url\(\s*(['"]?)(.*?)\1\s*\)''')
+
+IMAGE_MIME_TYPES = {'.png': 'image/png', '.jpg': 'image/jpeg', '.jpeg': 'image/jpeg'}
+
+
+def add_webp_image_set(source, webp_url_for):
+    """
+    Tambahkan versi image-set() WebP untuk deklarasi CSS yang memakai url() gambar
+
+    webp_url_for(url) -> url WebP (teks seperti di CSS) atau None jika tidak ada.
+    Deklarasi asli tetap ada sebagai fallback: browser tanpa dukungan
+    image-set()/type() membuang deklarasi kedua dan memakai PNG/JPEG.
+    """
+    def image_set(match):
+        quote, url = match.group(1), match.group(2)
+        webp_url = webp_url_for(url)
+        mime_type = IMAGE_MIME_TYPES.get(os.path.splitext(url)[1].lower())
+        if not webp_url or not mime_type:
+            return match.group(0)
+        return (
+            f"image-set(url({quote}{webp_url}{quote}) type('image/webp'), "
+            f"url({quote}{url}{quote}) type('{mime_type}'))"
+        )
+
+    def declaration(match):
+        prop, value, end = match.groups()
+        webp_value = _CSS_URL_RE.sub(image_set, value)
+        if webp_value == value:
+            return match.group(0)
+        return f'{prop}:{value};\n{prop}:{webp_value}{end}'
+
+    return _CSS_URL_DECLARATION_RE.sub(declaration, source)
+
+
+MINIFIERS = {
+    'css': minify_css,
+    'js': minify_js,
+}
+
+
+def get_bundles():
+    return getattr(settings, 'ASSET_BUNDLES', {})
+
+
+def build_bundle(name, kind, sources):
+    """
+    Gabungkan dan minify isi file sumber
+    Return (nama file bundle dengan hash, isi bundle dalam bytes)
+    """
+    minify = MINIFIERS[kind]
+    separator = '\n' if kind == 'css' else ';\n'
+    content = separator.join(minify(source) for source in sources).encode('utf-8')
+    digest = hashlib.md5(content).hexdigest()[:12]
+    return f'{BUNDLE_DIR}/{name}.{digest}.min.{kind}', content
@@ -1,14 +1,24 @@
 """
 Badges untuk menampilkan notifikasi di sidebar admin Unfold
 ✅ DIPERBAIKI: Gunakan nama model yang benar
+Angka dibaca dari tabel ringkasan DashboardStats (satu query per request)
 """
 
+def get_dashboard_stats(request):
+    """
+    DashboardStats untuk request ini (dipakai bersama oleh badge & dashboard)
+    """
+    from products.models import DashboardStats
+    if not hasattr(request, '_dashboard_stats'):
+        request._dashboard_stats = DashboardStats.get_current()
+    return request._dashboard_stats
+
+
 def order_badge(request):
     """
     Badge untuk menampilkan jumlah pesanan pending
     """
-    from products.models import Order
-    count = Order.objects.filter(status='pending').count()
+    count = get_dashboard_stats(request).pending_orders
     if count > 0:
         return f"{count} baru"
     return ""
@@ -18,8 +28,7 @@ def message_badge(request):
     """
     Badge untuk menampilkan jumlah pesan yang belum dibaca
     """
-    from products.models import ContactMessage
-    count = ContactMessage.objects.filter(is_read=False).count()
+    count = get_dashboard_stats(request).unread_messages
     if count > 0:
         return f"{count} baru"
-    return ""
\ No newline at end of file
+    return ""
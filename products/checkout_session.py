@@ -0,0 +1,144 @@
+# products/checkout_session.py
+"""
+State checkout di session dalam satu key kecil berversi
+
+Sebelumnya session menyimpan tiga key terpisah: `applied_voucher` (dict enam
+field float termasuk nominal diskon), `buy_now_data` dan `selected_items`.
+Sekarang hanya satu key:
+
+    session['co'] = {'v': 1, 'vc': 'KODE', 'bn': [product_id, qty], 'si': [cart_item_id, ...]}
+
+- yang disimpan hanya identitas (kode voucher, id), bukan harga/diskon;
+  diskon selalu dihitung ulang dari Voucher & subtotal saat dibaca (price_voucher)
+- payload divalidasi setiap dibaca; versi/format yang tidak dikenal dibuang
+- session hanya ditulis jika isinya benar-benar berubah, sehingga request
+  biasa tidak menulis session sama sekali
+- payload cukup kecil untuk SESSION_BACKEND=signed_cookies (lihat settings)
+"""
+
+from decimal import Decimal
+
+from .models import Voucher
+
+SESSION_KEY = 'co'
+VERSION = 1
+
+MAX_SELECTED_ITEMS = 100
+MAX_VOUCHER_CODE_LENGTH = 50
+
+# Key lama sebelum versi 1, dikonversi sekali saat dibaca
+LEGACY_KEYS = ('applied_voucher', 'buy_now_data', 'selected_items')
+
+
+def _positive_int(value):
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        return None
+    return value if value > 0 else None
+
+
+def _clean(payload):
+    """Return state yang valid: {'voucher', 'buy_now', 'items'}"""
+    state = {'voucher': None, 'buy_now': None, 'items': []}
+    if not isinstance(payload, dict) or payload.get('v') != VERSION:
+        return state
+
+    code = payload.get('vc')
+    if isinstance(code, str) and 0 < len(code) <= MAX_VOUCHER_CODE_LENGTH:
+        state['voucher'] = code
+
+    buy_now = payload.get('bn')
+    if isinstance(buy_now, list) and len(buy_now) == 2:
+        product_id, quantity = (_positive_int(value) for value in buy_now)
+        if product_id and quantity:
+            state['buy_now'] = (product_id, quantity)
+
+    items = payload.get('si')
+    if isinstance(items, list):
+        state['items'] = [item for item in map(_positive_int, items[:MAX_SELECTED_ITEMS]) if item]
+    return state
+
+
+def _dump(state):
+    payload = {'v': VERSION}
+    if state['voucher']:
+        payload['vc'] = state['voucher']
+    if state['buy_now']:
+        payload['bn'] = list(state['buy_now'])
+    if state['items']:
+        payload['si'] = state['items']
+    return payload
+
+
+def _from_legacy(session):
+    voucher = session.get('applied_voucher')
+    buy_now = session.get('buy_now_data')
+    return {
+        'v': VERSION,
+        'vc': voucher.get('code') if isinstance(voucher, dict) else None,
+        'bn': [buy_now.get('product_id'), buy_now.get('quantity')] if isinstance(buy_now, dict) else None,
+        'si': session.get('selected_items'),
+    }
+
+
+def load_checkout_state(session):
+    """State checkout tervalidasi dari session (tidak menulis session kecuali ada key lama)"""
+    if any(key in session for key in LEGACY_KEYS):
+        state = _clean(_from_legacy(session))
+        for key in LEGACY_KEYS:
+            session.pop(key, None)
+        _store(session, state)
+        return state
+    return _clean(session.get(SESSION_KEY))
+
+
+def _store(session, state):
+    payload = _dump(state)
+    if len(payload) == 1:
+        # Tidak ada state, hapus key (pop tidak menandai session berubah jika key tidak ada)
+        session.pop(SESSION_KEY, None)
+    elif session.get(SESSION_KEY) != payload:
+        session[SESSION_KEY] = payload
+
+
+def update_checkout_state(session, **changes):
+    """
+    Ubah sebagian state: voucher='KODE', buy_now=(product_id, qty), items=[id, ...]
+    Nilai None/kosong menghapus bagian itu. Session hanya ditulis jika berubah.
+    """
+    state = load_checkout_state(session)
+    for part, value in changes.items():
+        if part not in state:
+            raise KeyError(part)
+        if part == 'items':
+            value = list(value or [])
+        state[part] = value or ([] if part == 'items' else None)
+    _store(session, _clean(_dump(state)))
+
+
+def clear_checkout_state(session, *parts):
+    """Hapus bagian state tertentu (atau semuanya jika parts kosong)"""
+    update_checkout_state(session, **{part: None for part in parts or ('voucher', 'buy_now', 'items')})
+
+
+def price_voucher(code, subtotal):
+    """
+    Hitung ulang voucher untuk subtotal saat ini
+    Return None jika voucher tidak ada / tidak aktif / kadaluarsa / habis.
+    Voucher yang hanya kurang minimum belanja tetap dikembalikan (diskon 0)
+    agar checkout bisa menampilkan pesan minimum pembelian.
+    """
+    if not code:
+        return None
+    voucher = Voucher.objects.filter(code=code).first()
+    if voucher is None or not voucher.is_valid(max(Decimal(subtotal), voucher.min_purchase_amount)):
+        return None
+    return {
+        'voucher': voucher,
+        'code': voucher.code,
+        'discount_type': voucher.discount_type,
+        'discount_value': voucher.discount_value,
+        'discount_amount': Decimal(voucher.calculate_discount(Decimal(subtotal))),
+        'min_purchase_amount': voucher.min_purchase_amount,
+    }
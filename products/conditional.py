@@ -0,0 +1,225 @@
+# products/conditional.py
+"""
+Conditional GET (ETag / Last-Modified) untuk halaman produk, detail pesanan
+dan endpoint jumlah keranjang
+
+Fungsi versi di sini hanya menjalankan query kecil (timestamp & agregat),
+sehingga request dengan If-None-Match / If-Modified-Since yang cocok langsung
+dijawab 304 sebelum view menjalankan query berat dan render template.
+Halaman produk yang dilayani cache halaman memakai versi tag page_cache
+sebagai ETag, tanpa query database sama sekali.
+"""
+
+import hashlib
+import json
+from datetime import datetime, timezone
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.db.models import Count, Max, Q
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from .models import Cart, Order, Product, ProductReview
+from .page_cache import (
+    RECOMMENDATION_TAG, get_tag_versions, is_cacheable_request, patch_page_cache_headers, product_page_tags,
+)
+from .storage import get_bundle_manifest
+
+
+def _build_version():
+    """Berubah setiap kali bundle CSS/JS berubah (deploy baru)"""
+    return hashlib.md5(
+        json.dumps(get_bundle_manifest(), sort_keys=True).encode('utf-8')
+    ).hexdigest()[:12]
+
+
+def _cart_updated_at(user):
+    return Cart.objects.filter(user=user).values_list('updated_at', flat=True).first()
+
+
+def _make_etag(*parts):
+    raw = '|'.join(str(part) for part in parts)
+    return hashlib.md5(raw.encode('utf-8')).hexdigest()
+
+
+def _latest(*timestamps):
+    timestamps = [timestamp for timestamp in timestamps if timestamp]
+    return max(timestamps) if timestamps else None
+
+
+def _user_parts(request):
+    """
+    Bagian yang membuat HTML berbeda per user (header, token CSRF)
+    Return (list bagian ETag, timestamp keranjang)
+    """
+    if not request.user.is_authenticated:
+        return ['anon'], None
+    cart_updated_at = _cart_updated_at(request.user)
+    parts = [
+        request.user.pk,
+        request.COOKIES.get(settings.CSRF_COOKIE_NAME, ''),
+        cart_updated_at,
+    ]
+    return parts, cart_updated_at
+
+
+def _memoize_on_request(func):
+    """Hitung versi sekali per request (dipakai oleh etag & last_modified)"""
+    attr = f'_conditional_{func.__name__}'
+
+    @wraps(func)
+    def wrapper(request, *args, **kwargs):
+        if not hasattr(request, attr):
+            setattr(request, attr, func(request, *args, **kwargs))
+        return getattr(request, attr)
+    return wrapper
+
+
+# ==================== PRODUCT DETAIL ====================
+
+def _has_validators(request):
+    return 'HTTP_IF_NONE_MATCH' in request.META or 'HTTP_IF_MODIFIED_SINCE' in request.META
+
+
+def _tag_time(version):
+    """Versi tag page_cache = waktu invalidasi terakhir (time_ns)"""
+    return datetime.fromtimestamp(int(version) / 1e9, tz=timezone.utc)
+
+
+@_memoize_on_request
+def product_detail_state(request, slug):
+    """Return (etag, last_modified) atau None jika harus render penuh"""
+    # Flash message hanya tampil di render berikutnya, jangan dijawab 304
+    if len(get_messages(request)):
+        return None
+
+    if is_cacheable_request(request):
+        # HTML dari cache halaman tidak bergantung pada user dan hanya berubah jika
+        # versi tag berubah: ETag dari versi tag, tanpa query database
+        versions = get_tag_versions(product_page_tags(slug))
+        etag = _make_etag('product', _build_version(), slug, *versions)
+        return etag, max(_tag_time(version) for version in versions)
+
+    # Render per user (cache halaman nonaktif): versi dari query, hanya jika
+    # browser mengirim validator yang bisa dijawab 304
+    if not _has_validators(request):
+        return None
+
+    product = Product.objects.filter(slug=slug, is_active=True).values(
+        'id', 'updated_at', 'category_id'
+    ).first()
+    if product is None:
+        return None
+
+    reviews = ProductReview.objects.filter(product_id=product['id']).aggregate(
+        total=Count('id'), latest=Max('updated_at')
+    )
+    # Produk terkait: rekomendasi + produk satu kategori (lihat products/recommendations.py)
+    related_latest = Product.objects.filter(
+        Q(category_id=product['category_id']) | Q(recommended_by__product_id=product['id']),
+        is_active=True,
+    ).aggregate(latest=Max('updated_at'))['latest']
+    # Versi tag = waktu build_recommendations terakhir
+    recommendations_version = get_tag_versions([RECOMMENDATION_TAG])[0]
+
+    parts = [
+        product['id'], product['updated_at'],
+        reviews['total'], reviews['latest'], related_latest, recommendations_version,
+    ]
+    timestamps = [product['updated_at'], reviews['latest'], related_latest, _tag_time(recommendations_version)]
+
+    if request.user.is_authenticated:
+        # Status pembelian menentukan form review
+        orders_latest = Order.objects.filter(user=request.user).aggregate(
+            latest=Max('updated_at')
+        )['latest']
+        parts.append(orders_latest)
+        timestamps.append(orders_latest)
+
+    user_parts, cart_updated_at = _user_parts(request)
+    etag = _make_etag('product', _build_version(), *parts, *user_parts)
+    return etag, _latest(*timestamps, cart_updated_at)
+
+
+# ==================== ORDER DETAIL ====================
+
+@_memoize_on_request
+def order_detail_state(request, order_id):
+    if not request.user.is_authenticated or len(get_messages(request)):
+        return None
+
+    order = Order.objects.filter(id=order_id, user=request.user).values(
+        'updated_at', 'status', 'payment_method', 'midtrans_order_id'
+    ).first()
+    if order is None:
+        return None
+
+    # Order pending Midtrans dicek real-time di view, selalu render penuh
+    if order['status'] == 'pending' and order['payment_method'] == 'midtrans' and order['midtrans_order_id']:
+        return None
+
+    user_parts, cart_updated_at = _user_parts(request)
+    etag = _make_etag('order', _build_version(), order_id, order['updated_at'], *user_parts)
+    return etag, _latest(order['updated_at'], cart_updated_at)
+
+
+# ==================== CART COUNT ====================
+
+@_memoize_on_request
+def cart_count_state(request):
+    if not request.user.is_authenticated:
+        return None
+    cart_updated_at = _cart_updated_at(request.user)
+    etag = _make_etag('cart-count', request.user.pk, cart_updated_at)
+    return etag, cart_updated_at
+
+
+# ==================== DECORATOR ====================
+
+def conditional_page(state_func):
+    """
+    Bungkus view dengan django.views.decorators.http.condition memakai
+    state_func(request, *args, **kwargs) -> (etag, last_modified) | None
+
+    Response tanpa Cache-Control diberi `private, no-cache` agar browser
+    selalu revalidasi (dan mendapat 304 jika tidak ada perubahan). Untuk
+    pengunjung anonim dipakai header yang sama dengan cache halaman publik.
+    """
+    def etag_func(request, *args, **kwargs):
+        state = state_func(request, *args, **kwargs)
+        return state[0] if state else None
+
+    def last_modified_func(request, *args, **kwargs):
+        state = state_func(request, *args, **kwargs)
+        return state[1] if state else None
+
+    def patch_headers(request, response, user):
+        if request.method in ('GET', 'HEAD') and not response.has_header('Cache-Control'):
+            if user.is_authenticated:
+                patch_cache_control(response, private=True, no_cache=True)
+            else:
+                patch_page_cache_headers(request, response)
+        return response
+
+    def decorator(view_func):
+        conditional_view = condition(etag_func=etag_func, last_modified_func=last_modified_func)(view_func)
+
+        if iscoroutinefunction(view_func):
+            # condition() memanggil etag_func secara sync; hitung state (query) di thread
+            # lebih dulu, hasilnya di-memoize di request sehingga tidak ada query di event loop
+            @wraps(view_func)
+            async def async_wrapper(request, *args, **kwargs):
+                await sync_to_async(state_func)(request, *args, **kwargs)
+                response = await conditional_view(request, *args, **kwargs)
+                return patch_headers(request, response, await request.auser())
+            return async_wrapper
+
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+            return patch_headers(request, response, request.user)
+        return wrapper
+    return decorator
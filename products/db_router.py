@@ -0,0 +1,185 @@
+# products/db_router.py
+"""
+Routing baca katalog & laporan ke database replica
+
+Aktif jika DATABASE_REPLICA_URLS diisi (lihat settings). Aturannya:
+
+- hanya model katalog & laporan (REPLICA_MODELS) yang dibaca dari replica;
+  model lain (user, session, keranjang, pesanan) selalu ke primary
+- semua tulis, dan semua baca di dalam transaksi primary, ke primary
+- read-your-writes: request yang mengubah data (POST, PUT, PATCH, DELETE)
+  memakai primary sepenuhnya dan men-set cookie sehingga request browser
+  yang sama tetap membaca primary selama DATABASE_REPLICA_STICKY_SECONDS
+- replica dicek berkala (koneksi + lag replikasi); replica yang mati atau
+  tertinggal lebih dari DATABASE_REPLICA_MAX_LAG detik dilewati, dan jika
+  tidak ada replica sehat baca kembali ke primary
+
+Uji lokal dengan dua SQLite:
+    cp db.sqlite3 replica.sqlite3
+    DATABASE_REPLICA_URLS=sqlite:///replica.sqlite3 python manage.py runserver
+"""
+
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.utils.decorators import sync_and_async_middleware
+
+# app_label.model_name yang boleh dibaca dari replica
+REPLICA_MODELS = {
+    'products.category',
+    'products.product',
+    'products.productimage',
+    'products.productreview',
+    'products.productfacet',
+    'products.producttrigram',
+    'products.productrecommendation',
+    'products.shippingcost',
+    'products.dailysales',
+    'products.dailyproductsales',
+    'products.dailycategorysales',
+    'products.dashboardstats',
+}
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_use_primary = ContextVar('use_primary', default=False)
+
+# alias -> (waktu cek, sehat); per proses
+_health = {}
+_health_lock = threading.Lock()
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def replica_aliases():
+    return [alias for alias in settings.DATABASES if alias.startswith('replica_')]
+
+
+@contextmanager
+def use_primary():
+    """Paksa semua baca di blok ini ke primary"""
+    token = _use_primary.set(True)
+    try:
+        yield
+    finally:
+        _use_primary.reset(token)
+
+
+# ==================== HEALTH CHECK ====================
+
+def _replication_lag(alias):
+    """Lag replikasi dalam detik (0 jika tidak diketahui, mis. SQLite)"""
+    connection = connections[alias]
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                'SELECT COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)'
+            )
+        else:
+            # Tanpa info lag; pastikan replica berisi skema (SQLite membuat file kosong jika tidak ada)
+            cursor.execute('SELECT 0 FROM django_migrations LIMIT 1')
+        row = cursor.fetchone()
+        return float(row[0]) if row else 0.0
+
+
+def is_replica_healthy(alias):
+    interval = _setting('DATABASE_REPLICA_HEALTH_INTERVAL', 5)
+    now = time.monotonic()
+    checked = _health.get(alias)
+    if checked and now - checked[0] < interval:
+        return checked[1]
+
+    with _health_lock:
+        try:
+            healthy = _replication_lag(alias) <= _setting('DATABASE_REPLICA_MAX_LAG', 5)
+        except DatabaseError:
+            healthy = False
+            connections[alias].close()
+        if not healthy and (not checked or checked[1]):
+            print(f"⚠️ Replica {alias} dilewati (mati atau lag), baca ke primary")
+        _health[alias] = (now, healthy)
+    return healthy
+
+
+# ==================== ROUTER ====================
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if model._meta.label_lower not in REPLICA_MODELS or _use_primary.get():
+            return DEFAULT_DB_ALIAS
+        # Baca di dalam transaksi tulis harus melihat data transaksi itu sendiri
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        healthy = [alias for alias in replica_aliases() if is_replica_healthy(alias)]
+        return random.choice(healthy) if healthy else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replica berisi data yang sama dengan primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+# ==================== STICKINESS MIDDLEWARE ====================
+
+@sync_and_async_middleware
+def replica_stickiness_middleware(get_response):
+    """
+    Request yang mengubah data, dan request berikutnya dari browser yang sama
+    selama beberapa detik, hanya membaca primary (read-your-writes)
+    """
+    name = _setting('DATABASE_REPLICA_STICKY_COOKIE', 'mm_primary')
+
+    def needs_primary(request):
+        try:
+            sticky_until = float(request.COOKIES.get(name, 0))
+        except ValueError:
+            sticky_until = 0
+        return request.method not in SAFE_METHODS or sticky_until > time.time()
+
+    def process_response(request, response):
+        if request.method not in SAFE_METHODS:
+            seconds = _setting('DATABASE_REPLICA_STICKY_SECONDS', 10)
+            response.set_cookie(
+                name, str(int(time.time() + seconds)),
+                max_age=seconds,
+                secure=settings.SESSION_COOKIE_SECURE,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+    # ContextVar use_primary ikut terbawa ke sync_to_async, jadi berlaku juga untuk view async
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            if not replica_aliases():
+                return await get_response(request)
+            if needs_primary(request):
+                with use_primary():
+                    response = await get_response(request)
+            else:
+                response = await get_response(request)
+            return process_response(request, response)
+    else:
+        def middleware(request):
+            if not replica_aliases():
+                return get_response(request)
+            if needs_primary(request):
+                with use_primary():
+                    response = get_response(request)
+            else:
+                response = get_response(request)
+            return process_response(request, response)
+    return middleware
@@ -0,0 +1,202 @@
+# products/facets.py
+"""
+Navigasi facet halaman shop: kategori, rentang harga, stok tersedia, rating
+
+Filter dibaca dari query string: category=<slug>, price=<band> (boleh lebih
+dari satu), stock=1, rating=<N> (N bintang ke atas).
+
+Jumlah produk per opsi facet tidak dihitung dengan satu COUNT per opsi.
+Satu query GROUP BY di tabel ProductFacet menghasilkan "kubus"
+(kategori x rentang harga x stok x rating -> jumlah) yang hanya difilter
+hasil pencarian (products/fuzzy_search.py); semua jumlah facet dijumlahkan
+dari kubus itu di Python.
+Setiap facet dihitung dengan filter facet lain tetapi tanpa filter dirinya
+sendiri, sehingga angka = jumlah hasil jika opsi itu dipilih. Kubus di-cache
+per kata pencarian + versi FACET_TAG, sehingga jumlah query halaman shop
+tetap sama untuk kombinasi filter apa pun.
+"""
+
+import hashlib
+from urllib.parse import urlencode
+
+from django.core.cache import cache
+from django.db.models import Count
+
+from .models import ProductFacet
+from .page_cache import FACET_TAG, get_tag_versions
+
+FILTER_PARAMS = ('price', 'stock', 'rating')
+
+# Pilihan "N bintang ke atas"
+RATING_OPTIONS = [4, 3, 2, 1]
+
+CUBE_CACHE_TIMEOUT = 60 * 60
+
+
+def _rupiah(value):
+    return f'Rp{value:,}'.replace(',', '.')
+
+
+def price_band_label(band):
+    bands = ProductFacet.PRICE_BANDS
+    if band == 0:
+        return f'Di bawah {_rupiah(bands[1])}'
+    if band == len(bands) - 1:
+        return f'{_rupiah(bands[band])} ke atas'
+    return f'{_rupiah(bands[band])} – {_rupiah(bands[band + 1])}'
+
+
+def _int_choices(values, choices):
+    selected = set()
+    for value in values:
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            continue
+        if value in choices:
+            selected.add(value)
+    return selected
+
+
+def parse_filters(params, category_slug=None):
+    """Filter facet tervalidasi dari request.GET (nilai tidak dikenal diabaikan)"""
+    ratings = _int_choices([params.get('rating')], RATING_OPTIONS)
+    return {
+        'category': category_slug or params.get('category') or None,
+        'price': _int_choices(params.getlist('price'), range(len(ProductFacet.PRICE_BANDS))),
+        'stock': params.get('stock') == '1',
+        'rating': max(ratings) if ratings else None,
+    }
+
+
+def filter_products(products, filters, category_id):
+    """
+    Terapkan filter facet ke queryset Product aktif
+    category_id None dengan filters['category'] terisi = slug tidak dikenal (hasil kosong)
+    """
+    if filters['category']:
+        if category_id is None:
+            return products.none()
+        products = products.filter(category_id=category_id)
+    if filters['price']:
+        products = products.filter(facet__price_band__in=filters['price'])
+    if filters['stock']:
+        products = products.filter(facet__in_stock=True)
+    if filters['rating']:
+        products = products.filter(facet__rating_band__gte=filters['rating'])
+    return products
+
+
+def facet_cube(search, product_ids=None):
+    """
+    [(category_id, price_band, in_stock, rating_band, jumlah)] untuk kata pencarian ini
+    product_ids = hasil search_product_ids(search) jika ada kata pencarian
+    """
+    version = get_tag_versions([FACET_TAG])[0]
+    key = f'facets:cube:{hashlib.md5(search.encode("utf-8")).hexdigest()}:{version}'
+
+    def build():
+        facets = ProductFacet.objects.all()
+        if search:
+            facets = facets.filter(product_id__in=product_ids)
+        return list(
+            facets.values_list('category_id', 'price_band', 'in_stock', 'rating_band')
+            .annotate(count=Count('pk'))
+            .order_by()
+        )
+    return cache.get_or_set(key, build, CUBE_CACHE_TIMEOUT)
+
+
+def _matches(row, filters, category_id, skip):
+    row_category, price_band, in_stock, rating_band, _ = row
+    if skip != 'category' and filters['category'] and row_category != category_id:
+        return False
+    if skip != 'price' and filters['price'] and price_band not in filters['price']:
+        return False
+    if skip != 'stock' and filters['stock'] and not in_stock:
+        return False
+    if skip != 'rating' and filters['rating'] and rating_band < filters['rating']:
+        return False
+    return True
+
+
+def facet_counts(cube, filters, category_id):
+    """Jumlah per opsi setiap facet (tanpa filter facet itu sendiri) dan total hasil"""
+    counts = {'category': {}, 'price': {}, 'stock': 0, 'rating': dict.fromkeys(RATING_OPTIONS, 0), 'total': 0}
+    for row in cube:
+        row_category, price_band, in_stock, rating_band, count = row
+        if _matches(row, filters, category_id, skip='category'):
+            counts['category'][row_category] = counts['category'].get(row_category, 0) + count
+        if _matches(row, filters, category_id, skip='price'):
+            counts['price'][price_band] = counts['price'].get(price_band, 0) + count
+        if _matches(row, filters, category_id, skip='stock') and in_stock:
+            counts['stock'] += count
+        if _matches(row, filters, category_id, skip='rating'):
+            for rating in RATING_OPTIONS:
+                if rating_band >= rating:
+                    counts['rating'][rating] += count
+        if _matches(row, filters, category_id, skip=None):
+            counts['total'] += count
+    return counts
+
+
+def query_params(filters, search, **changes):
+    """Pasangan (nama, nilai) query string untuk filter saat ini dengan perubahan tertentu"""
+    state = dict(filters, search=search, **changes)
+    params = []
+    if state['search']:
+        params.append(('search', state['search']))
+    if state['category']:
+        params.append(('category', state['category']))
+    params.extend(('price', band) for band in sorted(state['price']))
+    if state['stock']:
+        params.append(('stock', 1))
+    if state['rating']:
+        params.append(('rating', state['rating']))
+    return params
+
+
+def _url(base_url, filters, search, **changes):
+    params = query_params(filters, search, **changes)
+    return f'{base_url}?{urlencode(params)}' if params else base_url
+
+
+def build_facets(base_url, categories, filters, search, category_id, product_ids=None):
+    """Struktur facet untuk template: label, jumlah, status terpilih dan URL toggle setiap opsi"""
+    counts = facet_counts(facet_cube(search, product_ids), filters, category_id)
+    return {
+        'total': counts['total'],
+        'categories': [
+            {
+                'label': category.name,
+                'count': counts['category'].get(category.id, 0),
+                'selected': filters['category'] == category.slug,
+                'url': _url(base_url, filters, search, category=category.slug),
+            }
+            for category in categories
+        ],
+        'all_categories_url': _url(base_url, filters, search, category=None),
+        'prices': [
+            {
+                'label': price_band_label(band),
+                'count': counts['price'].get(band, 0),
+                'selected': band in filters['price'],
+                'url': _url(base_url, filters, search, price=filters['price'] ^ {band}),
+            }
+            for band in range(len(ProductFacet.PRICE_BANDS))
+        ],
+        'stock': {
+            'count': counts['stock'],
+            'selected': filters['stock'],
+            'url': _url(base_url, filters, search, stock=not filters['stock']),
+        },
+        'ratings': [
+            {
+                'stars': rating,
+                'count': counts['rating'][rating],
+                'selected': filters['rating'] == rating,
+                'url': _url(base_url, filters, search, rating=None if filters['rating'] == rating else rating),
+            }
+            for rating in RATING_OPTIONS
+        ],
+    }
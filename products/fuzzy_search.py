@@ -0,0 +1,201 @@
+# products/fuzzy_search.py
+"""
+Pencarian nama produk yang tahan salah ketik ("jorang" -> "Joran ...")
+
+Hasil pencarian = gabungan:
+- kecocokan persis (name icontains) kata pencarian atau sinonimnya, selalu
+  di atas hasil fuzzy
+- kecocokan fuzzy trigram: kemiripan kata (word similarity) kata pencarian
+  dengan bagian nama produk >= FUZZY_SEARCH_THRESHOLD. Hanya dicari jika
+  kecocokan persis belum mencapai FUZZY_SEARCH_MAX_RESULTS (kata yang salah
+  ketik biasanya tidak punya kecocokan persis), dan hanya untuk kata yang
+  diketik (sinonim sudah ditangani kecocokan persis)
+
+Kemiripan trigram dihitung di database:
+- PostgreSQL: pg_trgm (operator %> dengan index GIN product_name_trgm_idx)
+- SQLite: tabel ProductTrigram; kemiripan = proporsi trigram kata pencarian
+  yang ada di nama produk (pendekatan word_similarity pg_trgm)
+
+Latensi dibatasi: paling banyak FUZZY_SEARCH_MAX_RESULTS kandidat, dan query
+fuzzy dihentikan setelah FUZZY_SEARCH_TIMEOUT_MS (statement_timeout di
+PostgreSQL, progress handler di SQLite); jika terlewati hasil fuzzy
+dilewati dan hanya kecocokan persis yang dipakai.
+"""
+
+import math
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DatabaseError, connections, router, transaction
+from django.db.models import Case, Count, IntegerField, Q, When
+
+from .models import Product, ProductTrigram
+from .search_index import normalize
+
+# Kelompok istilah pancing yang setara (boleh lebih dari satu kata)
+# Ganti/tambah lewat settings.FUZZY_SEARCH_SYNONYMS
+SYNONYMS = [
+    ('joran', 'rod', 'tongkat pancing'),
+    ('reel', 'gulungan'),
+    ('senar', 'line', 'tali pancing', 'benang pancing'),
+    ('kail', 'mata pancing', 'hook'),
+    ('umpan', 'bait', 'lure'),
+    ('pelampung', 'float', 'kambang', 'bobber'),
+    ('timah', 'pemberat', 'sinker', 'ladung'),
+    ('swivel', 'kili kili'),
+    ('braid', 'braided'),
+    ('jaring', 'net', 'serokan', 'tangguk'),
+    ('tas', 'bag'),
+    ('pancing', 'mancing', 'fishing'),
+]
+
+# Skor tambahan kecocokan persis, lebih besar dari kemiripan maksimum (1.0)
+EXACT_BOOST = 1.0
+# Kecocokan persis lewat sinonim sedikit di bawah kata yang diketik user
+SYNONYM_WEIGHT = 0.9
+# Jumlah bentuk kata pencarian (asli + sinonim) yang dicari persis
+MAX_VARIANTS = 4
+# Kata pencarian lebih pendek dari ini tidak dicari fuzzy (trigram terlalu sedikit)
+MIN_FUZZY_LENGTH = 3
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def expand_synonyms(query):
+    """
+    Kata pencarian ternormalisasi diikuti bentuk dengan satu istilah diganti
+    sinonimnya, mis. "joran laut" -> ["joran laut", "rod laut", ...]
+    """
+    base = normalize(query)
+    if not base:
+        return []
+
+    variants = [base]
+    padded = f' {base} '
+    for group in _setting('FUZZY_SEARCH_SYNONYMS', SYNONYMS):
+        for term in group:
+            if f' {term} ' not in padded:
+                continue
+            before, after = padded.split(f' {term} ', 1)
+            for synonym in group:
+                rest = after.split()
+                # "senar pancing" -> "tali pancing", bukan "tali pancing pancing"
+                if rest and rest[0] == synonym.split()[-1]:
+                    rest = rest[1:]
+                variant = ' '.join([*before.split(), synonym, *rest])
+                if variant not in variants:
+                    variants.append(variant)
+    return variants[:MAX_VARIANTS]
+
+
+@contextmanager
+def _time_budget(alias):
+    """Hentikan query di blok ini setelah FUZZY_SEARCH_TIMEOUT_MS (DatabaseError)"""
+    timeout_ms = _setting('FUZZY_SEARCH_TIMEOUT_MS', 200)
+    connection = connections[alias]
+    if connection.vendor == 'postgresql':
+        # SET LOCAL: aman untuk PgBouncer transaction mode
+        with transaction.atomic(using=alias):
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT set_config('statement_timeout', %s, true)", [str(timeout_ms)])
+                cursor.execute(
+                    "SELECT set_config('pg_trgm.word_similarity_threshold', %s, true)",
+                    [str(_setting('FUZZY_SEARCH_THRESHOLD', 0.6))],
+                )
+            yield
+    elif connection.vendor == 'sqlite':
+        connection.ensure_connection()
+        deadline = time.monotonic() + timeout_ms / 1000
+        connection.connection.set_progress_handler(lambda: time.monotonic() > deadline, 1000)
+        try:
+            yield
+        finally:
+            connection.connection.set_progress_handler(None, 0)
+    else:
+        yield
+
+
+def _fuzzy_scores_postgres(alias, text, limit):
+    from django.contrib.postgres.search import TrigramWordSimilarity
+
+    rows = (
+        Product.objects.using(alias)
+        .filter(name__trigram_word_similar=text, is_active=True)
+        .annotate(similarity=TrigramWordSimilarity(text, 'name'))
+        .order_by('-similarity')
+        .values_list('id', 'similarity')[:limit]
+    )
+    return dict(rows)
+
+
+def _fuzzy_scores_trigram_table(alias, text, limit):
+    grams = ProductTrigram.trigrams(text)
+    rows = (
+        ProductTrigram.objects.using(alias)
+        .filter(trigram__in=grams)
+        .values('product_id')
+        .annotate(hits=Count('product_id'))
+        .filter(hits__gte=math.ceil(_setting('FUZZY_SEARCH_THRESHOLD', 0.6) * len(grams)))
+        .order_by('-hits')
+        .values_list('product_id', 'hits')[:limit]
+    )
+    return {product_id: hits / len(grams) for product_id, hits in rows}
+
+
+def fuzzy_scores(text, limit):
+    """{product_id: kemiripan} produk aktif yang namanya mirip teks (ternormalisasi)"""
+    if len(text) < MIN_FUZZY_LENGTH:
+        return {}
+
+    alias = router.db_for_read(ProductTrigram)
+    try:
+        with _time_budget(alias):
+            if connections[alias].vendor == 'postgresql':
+                return _fuzzy_scores_postgres(alias, text, limit)
+            return _fuzzy_scores_trigram_table(alias, text, limit)
+    except DatabaseError as e:
+        print(f"⚠️ Pencarian fuzzy dilewati ({e}), hanya kecocokan persis")
+        return {}
+
+
+def search_product_ids(query):
+    """
+    ID produk aktif yang cocok dengan kata pencarian, urut dari yang paling relevan
+    (maksimal FUZZY_SEARCH_MAX_RESULTS)
+    """
+    variants = expand_synonyms(query)
+    if not variants:
+        return []
+    limit = _setting('FUZZY_SEARCH_MAX_RESULTS', 200)
+
+    typed = query.strip().lower()
+    exact = Q()
+    for term in dict.fromkeys([typed, *variants]):
+        exact |= Q(name__icontains=term)
+    exact_rows = list(
+        Product.objects.filter(exact, is_active=True).order_by('-created_at').values_list('id', 'name')[:limit]
+    )
+
+    scores = {}
+    for product_id, name in exact_rows:
+        matches_typed = typed in name.lower() or variants[0] in normalize(name)
+        scores[product_id] = EXACT_BOOST * (1 if matches_typed else SYNONYM_WEIGHT)
+    if len(exact_rows) < limit:
+        for product_id, similarity in fuzzy_scores(variants[0], limit).items():
+            scores[product_id] = scores.get(product_id, 0) + similarity
+
+    # Skor sama: produk terbaru dulu (seperti urutan halaman shop)
+    ranked = sorted(scores, key=lambda product_id: (-scores[product_id], -product_id))
+    return ranked[:limit]
+
+
+def order_by_ids(queryset, ids):
+    """Urutkan queryset mengikuti urutan ids"""
+    if not ids:
+        return queryset
+    return queryset.order_by(
+        Case(*[When(pk=pk, then=position) for position, pk in enumerate(ids)], output_field=IntegerField())
+    )
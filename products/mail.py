@@ -0,0 +1,79 @@
+# products/mail.py
+"""
+Backend email SMTP dengan SSL context certifi
+
+Menggantikan monkey patch EmailBackend.open yang dulu ada di settings.
+SSL context (dan env var certifi) baru dibuat saat email pertama dikirim,
+bukan saat settings di-import, sehingga cold start tidak membayarnya.
+
+asend_mail() adalah send_mail untuk view async (lihat ecommerce/asgi.py).
+"""
+
+import os
+import ssl
+from functools import cache
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.mail import EmailMessage
+from django.core.mail.backends.smtp import EmailBackend
+from django.utils.module_loading import import_string
+
+
+@cache
+def ssl_context():
+    import certifi
+
+    os.environ['SSL_CERT_FILE'] = certifi.where()
+    os.environ['REQUESTS_CA_BUNDLE'] = certifi.where()
+
+    context = ssl.create_default_context(cafile=certifi.where())
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+    return context
+
+
+class SSLContextEmailBackend(EmailBackend):
+    """
+    EmailBackend SMTP yang memakai ssl_context() untuk SSL/STARTTLS
+    (open() bawaan Django memakai self.ssl_context untuk keduanya)
+    """
+
+    @property
+    def ssl_context(self):
+        if self.ssl_certfile or self.ssl_keyfile:
+            return super().ssl_context
+        return ssl_context()
+
+
+async def asend_mail(subject, message, from_email, recipient_list, fail_silently=False):
+    """
+    send_mail versi async. Dengan backend SMTP di atas email dikirim lewat
+    aiosmtplib sehingga event loop tidak tertahan menunggu server SMTP;
+    backend lain (locmem saat test, console) dipanggil lewat sync_to_async.
+    """
+    email = EmailMessage(subject, message, from_email, recipient_list)
+    if not issubclass(import_string(settings.EMAIL_BACKEND), SSLContextEmailBackend):
+        return await sync_to_async(email.send, thread_sensitive=False)(fail_silently)
+
+    import aiosmtplib
+
+    try:
+        await aiosmtplib.send(
+            email.message(),
+            sender=email.from_email,
+            recipients=email.recipients(),
+            hostname=settings.EMAIL_HOST,
+            port=settings.EMAIL_PORT,
+            username=settings.EMAIL_HOST_USER or None,
+            password=settings.EMAIL_HOST_PASSWORD or None,
+            use_tls=settings.EMAIL_USE_SSL,
+            start_tls=settings.EMAIL_USE_TLS,
+            tls_context=ssl_context(),
+            timeout=settings.EMAIL_TIMEOUT,
+        )
+    except (OSError, aiosmtplib.SMTPException):
+        if not fail_silently:
+            raise
+        return 0
+    return 1
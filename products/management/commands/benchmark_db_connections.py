@@ -0,0 +1,99 @@
+import statistics
+import time
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.core.signals import request_finished, request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+ALIAS = 'connection_benchmark'
+
+
+def _variants(database):
+    """(label, settings database) yang dibandingkan, diturunkan dari database default"""
+    base = {key: value for key, value in database.items() if key not in ('CONN_MAX_AGE', 'CONN_HEALTH_CHECKS')}
+    options = {key: value for key, value in database.get('OPTIONS', {}).items() if key != 'pool'}
+    variants = [
+        ('Koneksi baru setiap request (CONN_MAX_AGE=0)', dict(
+            base, CONN_MAX_AGE=0, CONN_HEALTH_CHECKS=False, OPTIONS=options,
+        )),
+        ('Persistent (CONN_MAX_AGE=600 + health check)', dict(
+            base, CONN_MAX_AGE=600, CONN_HEALTH_CHECKS=True, OPTIONS=options,
+        )),
+    ]
+    if database['ENGINE'] == 'django.db.backends.postgresql':
+        try:
+            import psycopg_pool  # noqa: F401
+        except ImportError:
+            pass
+        else:
+            variants.append(('Pool psycopg 3 (max_size=4)', dict(
+                base, CONN_MAX_AGE=0, CONN_HEALTH_CHECKS=False,
+                OPTIONS=dict(options, pool={'min_size': 0, 'max_size': 4}),
+            )))
+    return variants
+
+
+class Command(BaseCommand):
+    help = (
+        'Ukur biaya koneksi database per request: setiap iterasi mensimulasikan satu '
+        'request (signal request_started/request_finished seperti handler WSGI) yang '
+        'menjalankan satu query, untuk beberapa mode koneksi'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Jumlah request per mode (default 200)')
+
+    def handle(self, *args, **options):
+        database = connections.settings['default']
+        count = options['requests']
+        self.stdout.write(
+            f'\n🔌 Benchmark koneksi {database["ENGINE"].rsplit(".", 1)[-1]} '
+            f'({database.get("HOST") or database["NAME"]}), {count} request per mode\n'
+        )
+
+        for label, variant in _variants(database):
+            durations, opened = self._run(variant, count)
+            self.stdout.write(self.style.MIGRATE_HEADING(label))
+            self.stdout.write(f'   Koneksi dibuka       : {opened}')
+            self.stdout.write(f'   Waktu per request    : p50 {statistics.median(durations) * 1000:.2f} ms, '
+                              f'p95 {sorted(durations)[int(len(durations) * 0.95) - 1] * 1000:.2f} ms')
+            self.stdout.write(f'   Request pertama      : {durations[0] * 1000:.2f} ms')
+            self.stdout.write('')
+
+        self.stdout.write(self.style.SUCCESS('✅ Benchmark selesai'))
+
+    def _run(self, database, count):
+        opened = []
+
+        def count_connection(sender, connection, **kwargs):
+            if connection.alias == ALIAS:
+                opened.append(connection)
+
+        connections.settings[ALIAS] = database
+        connection_created.connect(count_connection)
+        durations = []
+        try:
+            for _ in range(count):
+                started = time.perf_counter()
+                # Handler WSGI: close_old_connections di awal & akhir request
+                request_started.send(sender=WSGIHandler)
+                with connections[ALIAS].cursor() as cursor:
+                    cursor.execute('SELECT 1')
+                    cursor.fetchone()
+                request_finished.send(sender=WSGIHandler)
+                durations.append(time.perf_counter() - started)
+            # Dengan pool, connection_created tetap dikirim setiap koneksi diambil dari pool
+            pool = getattr(connections[ALIAS], 'pool', None)
+            if pool is not None:
+                opened = [None] * pool.get_stats().get('connections_num', 0)
+        finally:
+            connection_created.disconnect(count_connection)
+            connection = connections[ALIAS]
+            connection.close()
+            if hasattr(connection, 'close_pool'):
+                connection.close_pool()
+            del connections[ALIAS]
+            del connections.settings[ALIAS]
+        return durations, len(opened)
@@ -0,0 +1,112 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.management.base import BaseCommand
+
+from products.midtrans_utils import AsyncMidtransPayment, MidtransPayment, aclose_async_clients
+
+
+class _FakeGateway(ThreadingHTTPServer):
+    """Server lokal yang meniru endpoint status Midtrans dengan latensi tetap"""
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, delay):
+        super().__init__(('127.0.0.1', 0), _GatewayHandler)
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.peak = 0
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server_address[1]}'
+
+    def reset(self):
+        self.in_flight = self.peak = 0
+
+
+class _GatewayHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.in_flight += 1
+            server.peak = max(server.peak, server.in_flight)
+        time.sleep(server.delay)
+        with server.lock:
+            server.in_flight -= 1
+
+        body = json.dumps({'status_code': '201', 'transaction_status': 'pending'}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Bandingkan jumlah request gateway yang bisa in-flight bersamaan dalam satu worker: '
+        'MidtransPayment (sync, satu thread seperti worker gunicorn sync) vs '
+        'AsyncMidtransPayment (satu event loop seperti worker uvicorn). Memakai gateway '
+        'tiruan lokal dengan latensi tetap, tidak menghubungi Midtrans.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50, help='Jumlah cek status (default 50)')
+        parser.add_argument('--latency', type=float, default=0.2, help='Latensi gateway tiruan dalam detik (default 0.2)')
+
+    def handle(self, *args, **options):
+        count = options['requests']
+        gateway = _FakeGateway(options['latency'])
+        threading.Thread(target=gateway.serve_forever, daemon=True).start()
+        self.stdout.write(
+            f'\n🌐 Benchmark gateway: {count} cek status, latensi gateway {options["latency"] * 1000:.0f} ms\n'
+        )
+
+        try:
+            for label, run in [
+                ('Sync (MidtransPayment, 1 thread)', self._run_sync),
+                ('Async (AsyncMidtransPayment, 1 event loop)', self._run_async),
+            ]:
+                gateway.reset()
+                started = time.perf_counter()
+                results = run(gateway.url, count)
+                elapsed = time.perf_counter() - started
+
+                self.stdout.write(self.style.MIGRATE_HEADING(label))
+                self.stdout.write(f'   Berhasil            : {sum(result["success"] for result in results)}/{count}')
+                self.stdout.write(f'   In-flight maksimum  : {gateway.peak}')
+                self.stdout.write(f'   Total waktu         : {elapsed * 1000:.0f} ms')
+                self.stdout.write(f'   Throughput          : {count / elapsed:.1f} request/detik')
+                self.stdout.write('')
+        finally:
+            gateway.shutdown()
+            gateway.server_close()
+
+        self.stdout.write(self.style.SUCCESS('✅ Benchmark selesai'))
+
+    def _run_sync(self, url, count):
+        midtrans = MidtransPayment()
+        # Atribut instance menimpa URL bawaan midtransclient (hanya untuk objek ini)
+        midtrans.snap.api_config.CORE_SANDBOX_BASE_URL = url
+        midtrans.snap.api_config.CORE_PRODUCTION_BASE_URL = url
+        return [midtrans.check_transaction_status(f'BENCH-{i}') for i in range(count)]
+
+    def _run_async(self, url, count):
+        midtrans = AsyncMidtransPayment(core_base_url=url)
+
+        async def run():
+            try:
+                return await asyncio.gather(*[
+                    midtrans.check_transaction_status(f'BENCH-{i}') for i in range(count)
+                ])
+            finally:
+                await aclose_async_clients()
+        return asyncio.run(run())
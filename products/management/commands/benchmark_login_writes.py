@@ -0,0 +1,88 @@
+from collections import Counter
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models.signals import post_save
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from products.models import save_user_profile
+
+WRITE_PREFIXES = ('INSERT', 'UPDATE', 'DELETE')
+PASSWORD = 'benchmark-login-123'
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _legacy_save_user_profile(sender, instance, **kwargs):
+    """Perilaku lama: profile selalu disimpan ulang setiap User disimpan"""
+    if hasattr(instance, 'profile'):
+        instance.profile.save()
+
+
+def _table(sql):
+    # UPDATE "tabel" SET ... / INSERT INTO "tabel" ... / DELETE FROM "tabel" ...
+    words = sql.replace('INTO ', '').replace('FROM ', '').split()
+    return words[1].strip('"`') if len(words) > 1 else '?'
+
+
+class Command(BaseCommand):
+    help = (
+        'Hitung query tulis (INSERT/UPDATE/DELETE) per login, membandingkan sinkronisasi '
+        'profile lama (selalu save) dengan yang sekarang (hanya field yang berubah). '
+        'Semua data benchmark di-rollback.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins', type=int, default=20, help='Jumlah login per mode (default 20)')
+
+    def handle(self, *args, **options):
+        logins = options['logins']
+        self.stdout.write(f'\n🔐 Benchmark query tulis saat login ({logins}x per mode)\n')
+
+        results = {}
+        for label, legacy in [('Sebelum (profile.save() setiap login)', True), ('Sesudah (dirty fields)', False)]:
+            if legacy:
+                post_save.disconnect(save_user_profile, sender=User)
+                post_save.connect(_legacy_save_user_profile, sender=User)
+            try:
+                results[label] = self._run(logins)
+            finally:
+                if legacy:
+                    post_save.disconnect(_legacy_save_user_profile, sender=User)
+                    post_save.connect(save_user_profile, sender=User)
+
+        for label, (queries, writes) in results.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(label))
+            self.stdout.write(f'   Query per login      : {queries / logins:.1f}')
+            self.stdout.write(f'   Query tulis per login: {sum(writes.values()) / logins:.1f}')
+            for table, count in sorted(writes.items()):
+                self.stdout.write(f'      {table}: {count / logins:.1f}')
+            self.stdout.write('')
+
+        self.stdout.write(self.style.SUCCESS('✅ Benchmark selesai (data di-rollback)'))
+
+    def _run(self, logins):
+        """Return (total query, Counter tabel -> jumlah query tulis) untuk `logins` kali login"""
+        writes = Counter()
+        total = 0
+        try:
+            with transaction.atomic():
+                user = User.objects.create_user('benchmark-login', 'benchmark@example.com', PASSWORD)
+                client = Client()
+                for _ in range(logins):
+                    with CaptureQueriesContext(connection) as context:
+                        client.login(username=user.username, password=PASSWORD)
+                    total += len(context.captured_queries)
+                    for query in context.captured_queries:
+                        sql = query['sql'].lstrip()
+                        if sql.upper().startswith(WRITE_PREFIXES):
+                            writes[_table(sql)] += 1
+                    client.logout()
+                raise _Rollback
+        except _Rollback:
+            pass
+        return total, writes
@@ -0,0 +1,118 @@
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connections, transaction
+
+ALIAS = 'sqlite_benchmark'
+
+# (label, OPTIONS koneksi)
+MODES = [
+    ('Bawaan (journal DELETE, BEGIN DEFERRED)', {'init_command': 'PRAGMA journal_mode=DELETE'}),
+    ('Tuned (WAL + pragma, BEGIN IMMEDIATE)', settings.SQLITE_OPTIONS),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark transaksi tulis SQLite paralel (pola checkout: baca lalu tulis dalam satu '
+        'transaksi) dengan pengaturan bawaan vs SQLITE_OPTIONS. Memakai file database '
+        'sementara, database aplikasi tidak disentuh.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=8, help='Jumlah thread penulis (default 8)')
+        parser.add_argument('--transactions', type=int, default=200, help='Transaksi per worker (default 200)')
+
+    def handle(self, *args, **options):
+        if settings.DATABASES['default']['ENGINE'] != 'django.db.backends.sqlite3':
+            raise CommandError('Database default bukan SQLite')
+
+        workers = options['workers']
+        per_worker = options['transactions']
+        self.stdout.write(
+            f'\n🗄️  Benchmark tulis SQLite: {workers} worker x {per_worker} transaksi\n'
+        )
+
+        for label, db_options in MODES:
+            result = self._run_mode(db_options, workers, per_worker)
+            latencies = sorted(result['latencies'])
+            self.stdout.write(self.style.MIGRATE_HEADING(label))
+            self.stdout.write(f'   Berhasil          : {len(latencies)}')
+            self.stdout.write(f'   Gagal (locked)    : {result["errors"]}')
+            self.stdout.write(f'   Throughput        : {len(latencies) / result["elapsed"]:.0f} transaksi/detik')
+            if latencies:
+                self.stdout.write(f'   Latensi p50 / p95 : {statistics.median(latencies) * 1000:.1f} / '
+                                  f'{latencies[int(len(latencies) * 0.95) - 1] * 1000:.1f} ms')
+            self.stdout.write('')
+
+        self.stdout.write(self.style.SUCCESS('✅ Benchmark selesai'))
+
+    def _run_mode(self, db_options, workers, per_worker):
+        handle, path = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(handle)
+        connections.settings[ALIAS] = dict(
+            connections.settings['default'], NAME=path, OPTIONS=dict(db_options)
+        )
+        try:
+            with connections[ALIAS].cursor() as cursor:
+                cursor.execute(
+                    'CREATE TABLE benchmark_stock (id INTEGER PRIMARY KEY, stock INTEGER NOT NULL)'
+                )
+                cursor.execute(
+                    'CREATE TABLE benchmark_order (id INTEGER PRIMARY KEY, worker INTEGER, stock_before INTEGER)'
+                )
+                cursor.execute('INSERT INTO benchmark_stock (id, stock) VALUES (1, 1000000)')
+            connections[ALIAS].close()
+
+            result = {'latencies': [], 'errors': 0}
+            lock = threading.Lock()
+            threads = [
+                threading.Thread(target=self._worker, args=(number, per_worker, result, lock))
+                for number in range(workers)
+            ]
+            started = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            result['elapsed'] = time.perf_counter() - started
+            return result
+        finally:
+            # Wrapper koneksi thread utama masih menyimpan NAME lama
+            del connections[ALIAS]
+            del connections.settings[ALIAS]
+            for suffix in ('', '-wal', '-shm', '-journal'):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+
+    def _worker(self, number, count, result, lock):
+        """Satu thread = satu koneksi, seperti satu worker gunicorn"""
+        latencies = []
+        errors = 0
+        try:
+            for _ in range(count):
+                started = time.perf_counter()
+                try:
+                    with transaction.atomic(using=ALIAS):
+                        with connections[ALIAS].cursor() as cursor:
+                            cursor.execute('SELECT stock FROM benchmark_stock WHERE id = 1')
+                            stock = cursor.fetchone()[0]
+                            cursor.execute(
+                                'INSERT INTO benchmark_order (worker, stock_before) VALUES (%s, %s)',
+                                [number, stock],
+                            )
+                            cursor.execute('UPDATE benchmark_stock SET stock = stock - 1 WHERE id = 1')
+                except OperationalError:
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - started)
+        finally:
+            connections[ALIAS].close()
+        with lock:
+            result['latencies'].extend(latencies)
+            result['errors'] += errors
@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from products.recommendations import DEFAULT_TOP_K, MAX_BASKET_SIZE, build_recommendations
+
+
+class Command(BaseCommand):
+    help = (
+        'Hitung rekomendasi "sering dibeli bersamaan" dari riwayat OrderItem dan simpan '
+        'top-k tetangga per produk. Jalankan berkala (mis. cron tiap malam).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top-k', type=int, default=DEFAULT_TOP_K, help=f'Tetangga per produk (default {DEFAULT_TOP_K})')
+        parser.add_argument('--min-count', type=int, default=1, help='Minimal pesanan berisi pasangan produk (default 1)')
+        parser.add_argument('--max-basket', type=int, default=MAX_BASKET_SIZE, help=f'Lewati pesanan dengan produk lebih dari ini (default {MAX_BASKET_SIZE})')
+
+    def handle(self, *args, **options):
+        if options['top_k'] < 1 or options['min_count'] < 1 or options['max_basket'] < 2:
+            raise CommandError('--top-k dan --min-count minimal 1, --max-basket minimal 2')
+
+        started = time.perf_counter()
+        stats = build_recommendations(options['top_k'], options['min_count'], options['max_basket'])
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(f'   Pesanan diproses      : {stats["orders"]} (dilewati {stats["skipped_orders"]})')
+        self.stdout.write(f'   Produk terjual        : {stats["products"]}')
+        self.stdout.write(f'   Pasangan produk       : {stats["pairs"]}')
+        self.stdout.write(f'   Produk ber-rekomendasi: {stats["recommended_products"]}')
+        self.stdout.write(f'   Baris disimpan        : {stats["rows"]}')
+        self.stdout.write(f'   Waktu                 : {elapsed:.1f} detik')
+        self.stdout.write(self.style.SUCCESS('\n✅ Rekomendasi produk berhasil dibangun ulang'))
@@ -0,0 +1,49 @@
+import shutil
+
+from django.core.management.base import BaseCommand
+
+from products.models import Product
+from products.static_catalog import StaticCatalogBuilder, get_catalog_root
+
+
+class Command(BaseCommand):
+    help = 'Render halaman katalog publik (home, shop per kategori, detail produk) menjadi file HTML statis'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            help='Direktori output (default: settings.STATIC_CATALOG_ROOT)',
+        )
+        parser.add_argument(
+            '--clean',
+            action='store_true',
+            help='Hapus seluruh isi direktori output sebelum build',
+        )
+        parser.add_argument(
+            '--product',
+            action='append',
+            dest='products',
+            metavar='SLUG',
+            help='Hanya render ulang produk tertentu (bisa diulang)',
+        )
+
+    def handle(self, *args, **options):
+        root = options['output'] or get_catalog_root()
+
+        if options['clean'] and not options['products']:
+            shutil.rmtree(root, ignore_errors=True)
+            self.stdout.write(f'🧹 Direktori {root} dibersihkan')
+
+        builder = StaticCatalogBuilder(root)
+
+        if options['products']:
+            builder.build_products(Product.objects.filter(slug__in=options['products'], is_active=True))
+        else:
+            builder.build_all()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'\n✅ {builder.pages} halaman dirender ke {builder.root} '
+                f'({builder.bytes / 1024:,.0f} KB), {builder.removed} halaman lama dihapus'
+            )
+        )
@@ -0,0 +1,199 @@
+import re
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from products.models import (
+    Category, Order, OrderItem, Product, ProductReview, PurchasedProduct, ShippingAddress
+)
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _catalog(sample):
+    """(label, queryset) query representatif untuk setiap hot path"""
+    now = timezone.now()
+    return [
+        ('Riwayat pesanan user', Order.objects.filter(user_id=sample['user']).order_by('-created_at')[:20]),
+        ('Pesanan per status (admin)', Order.objects.filter(status='pending').order_by('-created_at')[:50]),
+        ('Rekonsiliasi pembayaran', Order.objects.filter(payment_method='midtrans', status='pending')),
+        ('Rollup penjualan 7 hari', Order.objects.filter(
+            status__in=Order.SALES_STATUSES, created_at__gte=now - timedelta(days=7), created_at__lt=now,
+        )),
+        ('Item pesanan', OrderItem.objects.filter(order_id=sample['order'])),
+        ('Shop: produk terbaru', Product.objects.filter(is_active=True).order_by('-created_at')[:12]),
+        ('Shop: per kategori', Product.objects.filter(
+            is_active=True, category_id=sample['category'],
+        ).order_by('-created_at')[:12]),
+        ('Produk terkait', Product.objects.filter(
+            category_id=sample['category'], is_active=True,
+        ).exclude(id=sample['product'])[:4]),
+        ('Review terbaru', ProductReview.objects.filter(product_id=sample['product']).order_by('-created_at', '-id')[:6]),
+        ('Review rating tertinggi', ProductReview.objects.filter(
+            product_id=sample['product'],
+        ).order_by('-rating', '-created_at', '-id')[:6]),
+        ('Alamat utama', ShippingAddress.objects.filter(user_id=sample['user'], is_default=True)),
+        ('Cek pembelian (review)', PurchasedProduct.objects.filter(
+            user_id=sample['user'], product_id=sample['product'],
+        )),
+    ]
+
+
+def _full_scan(plan, table):
+    """Baris plan yang membaca seluruh tabel utama query, atau None"""
+    vendor = connection.vendor
+    for line in plan.splitlines():
+        line = line.strip(' -|`')
+        if vendor == 'sqlite':
+            # "SCAN tabel" = full scan; "SEARCH tabel USING INDEX ..." = index dipakai;
+            # "SCAN tabel USING INDEX ..." = membaca index sesuai urutan (berhenti di LIMIT)
+            match = re.search(r'\bSCAN (\S+)( USING)?', line)
+            if match and match.group(1) == table and not match.group(2):
+                return line
+        elif vendor == 'postgresql':
+            if re.search(rf'Seq Scan on {re.escape(table)}\b', line):
+                return line
+    return None
+
+
+class Command(BaseCommand):
+    help = (
+        'Jalankan EXPLAIN untuk katalog query hot path dan gagal jika ada yang '
+        'melakukan full table scan. Dengan --generate, dataset besar dibuat '
+        'sementara (di-rollback setelah selesai) agar planner memilih seperti di production.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--generate',
+            type=int,
+            default=0,
+            metavar='ORDERS',
+            help='Buat dataset sementara dengan sejumlah pesanan ini (mis. 50000)',
+        )
+        parser.add_argument('--verbose-plan', action='store_true', help='Tampilkan plan lengkap setiap query')
+
+    def handle(self, *args, **options):
+        if connection.vendor not in ('sqlite', 'postgresql'):
+            self.stdout.write(self.style.WARNING(
+                f'⚠️ Deteksi full scan belum didukung untuk {connection.vendor}, plan hanya ditampilkan'
+            ))
+
+        failures = []
+        try:
+            with transaction.atomic():
+                if options['generate']:
+                    self._generate(options['generate'])
+                self._analyze()
+                sample = self._sample()
+                if sample is None:
+                    raise CommandError('Data kosong, jalankan dengan --generate 50000')
+
+                self.stdout.write(f'\n🔎 EXPLAIN query hot path ({connection.vendor})\n')
+                for label, queryset in _catalog(sample):
+                    plan = queryset.explain()
+                    scan = _full_scan(plan, queryset.model._meta.db_table)
+                    if scan:
+                        failures.append((label, scan))
+                        self.stdout.write(self.style.ERROR(f'   ❌ {label}: {scan}'))
+                    else:
+                        self.stdout.write(f'   ✅ {label}')
+                    if options['verbose_plan'] or scan:
+                        for line in plan.splitlines():
+                            self.stdout.write(f'         {line}')
+                raise _Rollback
+        except _Rollback:
+            pass
+
+        if failures:
+            raise CommandError(f'{len(failures)} query melakukan full table scan')
+        self.stdout.write(self.style.SUCCESS('\n✅ Semua query hot path memakai index'))
+
+    def _analyze(self):
+        # Statistik tabel terbaru agar planner menilai selektivitas index dengan benar
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def _sample(self):
+        order = Order.objects.order_by('-id').values('id', 'user_id').first()
+        product = Product.objects.order_by('-id').values('id', 'category_id').first()
+        if not order or not product:
+            return None
+        return {
+            'order': order['id'],
+            'user': order['user_id'],
+            'product': product['id'],
+            'category': product['category_id'],
+        }
+
+    def _generate(self, orders):
+        """Dataset sintetis: pesanan tersebar 1 tahun, 10 pesanan per user, 20 per produk"""
+        self.stdout.write(f'🏗️  Membuat dataset sementara ({orders} pesanan)...')
+        batch = 1000
+        users_count = max(orders // 10, 1)
+        products_count = max(orders // 20, 1)
+        now = timezone.now()
+        statuses = [status for status, _ in Order.STATUS_CHOICES]
+        payments = [method for method, _ in Order.PAYMENT_CHOICES]
+
+        categories = Category.objects.bulk_create([
+            Category(name=f'Bench Kategori {i}', slug=f'bench-kategori-{i}') for i in range(20)
+        ])
+        products = Product.objects.bulk_create([
+            Product(
+                name=f'Bench Produk {i}', slug=f'bench-produk-{i}', description='-',
+                price=10000 + i, stock=100, category=categories[i % len(categories)],
+                is_active=i % 10 != 0,
+            )
+            for i in range(products_count)
+        ], batch_size=batch)
+        users = User.objects.bulk_create([
+            User(username=f'bench-user-{i}', email=f'bench{i}@example.com') for i in range(users_count)
+        ], batch_size=batch)
+        ShippingAddress.objects.bulk_create([
+            ShippingAddress(
+                user=user, full_name='Bench', phone='0812', address='-', city='Makassar',
+                is_default=index == 0,
+            )
+            for user in users for index in range(2)
+        ], batch_size=batch)
+
+        created = Order.objects.bulk_create([
+            Order(
+                user=users[i % users_count], order_number=f'BENCH-{i:08d}',
+                status=statuses[i % len(statuses)], payment_method=payments[i % len(payments)],
+                shipping_name='Bench', shipping_phone='0812', shipping_address='-', shipping_city='Makassar',
+                subtotal=Decimal(20000), total=Decimal(20000),
+            )
+            for i in range(orders)
+        ], batch_size=batch)
+        OrderItem.objects.bulk_create([
+            OrderItem(
+                order=order, product=products[i % products_count], product_name='-',
+                product_price=Decimal(10000), quantity=2, subtotal=Decimal(20000),
+            )
+            for i, order in enumerate(created)
+        ], batch_size=batch)
+        ProductReview.objects.bulk_create([
+            ProductReview(product=products[i % products_count], user=users[i % users_count], rating=i % 5 + 1, comment='-')
+            for i in range(min(orders // 2, users_count * products_count))
+        ], batch_size=batch, ignore_conflicts=True)
+        PurchasedProduct.objects.bulk_create([
+            PurchasedProduct(user=users[i % users_count], product=products[i % products_count], first_purchased_at=now)
+            for i in range(orders)
+        ], batch_size=batch, ignore_conflicts=True)
+
+        # created_at memakai auto_now_add, sebar ke 365 hari terakhir dengan satu UPDATE per hari
+        order_ids = [order.id for order in created]
+        for day in range(365):
+            ids = order_ids[day::365]
+            for start in range(0, len(ids), batch):
+                Order.objects.filter(id__in=ids[start:start + batch]).update(
+                    created_at=now - timedelta(days=day)
+                )
@@ -0,0 +1,62 @@
+import sys
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from products.models import Order
+from products.order_export import CHUNK_SIZE, export_filename, filter_orders, iter_export
+
+
+class Command(BaseCommand):
+    help = 'Export pesanan + item pesanan ke CSV/XLSX secara streaming (memori konstan)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=['csv', 'xlsx'], default='csv', help='Format file (default: csv)')
+        parser.add_argument('--from', dest='date_from', metavar='YYYY-MM-DD', help='Tanggal awal (inklusif)')
+        parser.add_argument('--to', dest='date_to', metavar='YYYY-MM-DD', help='Tanggal akhir (inklusif)')
+        parser.add_argument(
+            '--status',
+            action='append',
+            dest='statuses',
+            choices=[value for value, _ in Order.STATUS_CHOICES],
+            help='Hanya status tertentu (bisa diulang)',
+        )
+        parser.add_argument(
+            '--output',
+            help='File output (default: pesanan-<timestamp>.<format>, "-" untuk stdout)',
+        )
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help=f'Baris per fetch (default: {CHUNK_SIZE})')
+
+    def _parse_date(self, value):
+        if not value:
+            return None
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            raise CommandError(f'Format tanggal tidak valid: {value} (gunakan YYYY-MM-DD)')
+
+    def handle(self, *args, **options):
+        file_format = options['format']
+        queryset = filter_orders(
+            date_from=self._parse_date(options['date_from']),
+            date_to=self._parse_date(options['date_to']),
+            statuses=options['statuses'],
+        )
+        chunks = iter_export(queryset, file_format, chunk_size=options['chunk_size'])
+
+        output = options['output'] or export_filename(file_format)
+        if output == '-':
+            stream = sys.stdout.buffer
+            for chunk in chunks:
+                stream.write(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+            stream.flush()
+            return
+
+        size = 0
+        mode, encoding = ('w', 'utf-8') if file_format == 'csv' else ('wb', None)
+        with open(output, mode, encoding=encoding, newline='' if encoding else None) as f:
+            for chunk in chunks:
+                size += len(chunk)
+                f.write(chunk)
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Export selesai: {output} ({size / 1024:,.0f} KB)'))
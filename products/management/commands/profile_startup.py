@@ -0,0 +1,106 @@
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Dijalankan di proses baru: cold start seperti ecommerce/wsgi.py + resolve URL (request pertama)
+COLD_START = '''
+import json, resource, sys, time
+started = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+get_wsgi_application()
+from django.urls import get_resolver
+get_resolver().url_patterns
+elapsed = time.perf_counter() - started
+print(json.dumps({
+    "seconds": elapsed,
+    "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "modules": len(sys.modules),
+    "heavy": [name for name in %r if name in sys.modules],
+}))
+'''
+
+# Modul yang ditunda oleh LAZY_STARTUP
+HEAVY_MODULES = ('certifi', 'cloudinary', 'cloudinary_storage', 'midtransclient', 'requests', 'urllib3')
+
+# "import time: self [us] | cumulative | nama" (python -X importtime)
+IMPORTTIME_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)')
+
+MODES = [
+    ('Eager (LAZY_STARTUP=False, seperti sebelumnya)', 'False'),
+    ('Lazy (LAZY_STARTUP=True)', 'True'),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Ukur cold start aplikasi WSGI (waktu import settings, django.setup dan URLconf, '
+        'serta RSS) di proses baru untuk LAZY_STARTUP=False vs True, dan tampilkan '
+        'import paling lambat dari python -X importtime'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5, help='Jumlah cold start per mode (default 5)')
+        parser.add_argument('--top', type=int, default=15, help='Jumlah import terlambat yang ditampilkan (default 15)')
+
+    def handle(self, *args, **options):
+        runs = options['runs']
+        self.stdout.write(f'\n🚀 Profil cold start WSGI, {runs} proses per mode\n')
+
+        results = {}
+        for label, lazy in MODES:
+            samples = [self._cold_start(lazy) for _ in range(runs)]
+            seconds = [sample['seconds'] for sample in samples]
+            rss = [sample['rss_mb'] for sample in samples]
+            results[lazy] = (statistics.median(seconds), statistics.median(rss))
+
+            self.stdout.write(self.style.MIGRATE_HEADING(label))
+            self.stdout.write(f'   Waktu cold start : p50 {statistics.median(seconds) * 1000:.0f} ms, '
+                              f'min {min(seconds) * 1000:.0f} ms')
+            self.stdout.write(f'   RSS              : {statistics.median(rss):.1f} MB')
+            self.stdout.write(f'   Modul dimuat     : {samples[0]["modules"]}')
+            self.stdout.write(f'   Modul berat      : {", ".join(samples[0]["heavy"]) or "-"}')
+            self.stdout.write('')
+
+        (eager_time, eager_rss), (lazy_time, lazy_rss) = results['False'], results['True']
+        self.stdout.write(
+            f'📉 Selisih: {(eager_time - lazy_time) * 1000:.0f} ms '
+            f'({(1 - lazy_time / eager_time) * 100:.0f}%), RSS {eager_rss - lazy_rss:.1f} MB\n'
+        )
+
+        current = 'True' if settings.LAZY_STARTUP else 'False'
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'Import paling lambat (kumulatif, top-level) dengan LAZY_STARTUP={current}'
+        ))
+        for cumulative, name in self._slowest_imports(current, options['top']):
+            self.stdout.write(f'   {cumulative / 1000:7.1f} ms  {name}')
+
+        self.stdout.write(self.style.SUCCESS('\n✅ Profil selesai'))
+
+    def _run(self, lazy, *python_args):
+        env = dict(os.environ, LAZY_STARTUP=lazy)
+        env.setdefault('DJANGO_SETTINGS_MODULE', 'ecommerce.settings')
+        completed = subprocess.run(
+            [sys.executable, *python_args, '-c', COLD_START % (HEAVY_MODULES,)],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        if completed.returncode:
+            raise CommandError(f'Cold start gagal (LAZY_STARTUP={lazy}):\n{completed.stderr[-2000:]}')
+        return completed
+
+    def _cold_start(self, lazy):
+        return json.loads(self._run(lazy).stdout.strip().splitlines()[-1])
+
+    def _slowest_imports(self, lazy, top):
+        """Modul top-level (tanpa indentasi) dengan waktu import kumulatif terbesar"""
+        totals = []
+        for line in self._run(lazy, '-X', 'importtime').stderr.splitlines():
+            match = IMPORTTIME_LINE.match(line)
+            if match and not match.group(3):
+                totals.append((int(match.group(2)), match.group(4)))
+        return sorted(totals, reverse=True)[:top]
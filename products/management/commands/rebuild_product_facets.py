@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from products.models import ProductFacet
+
+
+class Command(BaseCommand):
+    help = 'Bangun ulang tabel facet produk (kategori, rentang harga, stok, rating) untuk filter halaman shop'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            count = ProductFacet.refresh_products()
+
+        self.stdout.write(f'   Produk aktif diproses: {count}')
+        self.stdout.write(self.style.SUCCESS('\n✅ Facet produk berhasil dibangun ulang'))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from products.models import ProductReview, PurchasedProduct
+
+
+class Command(BaseCommand):
+    help = (
+        'Bangun ulang index produk yang pernah dibeli per user (PurchasedProduct) '
+        'dan status is_verified_purchase semua review'
+    )
+
+    def handle(self, *args, **kwargs):
+        total = PurchasedProduct.rebuild()
+        verified = ProductReview.objects.filter(is_verified_purchase=True).count()
+
+        self.stdout.write(f'   Pasangan user-produk: {total}')
+        self.stdout.write(f'   Review terverifikasi: {verified}')
+        self.stdout.write(self.style.SUCCESS('\n✅ Index pembelian berhasil dibangun ulang'))
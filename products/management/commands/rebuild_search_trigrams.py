@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from products.models import ProductTrigram
+
+
+class Command(BaseCommand):
+    help = 'Bangun ulang tabel trigram nama produk untuk pencarian fuzzy (SQLite; PostgreSQL memakai pg_trgm)'
+
+    def handle(self, *args, **options):
+        if connection.vendor == 'postgresql':
+            self.stdout.write('ℹ️ PostgreSQL memakai index pg_trgm, tabel trigram tidak dipakai')
+            return
+
+        with transaction.atomic():
+            count = ProductTrigram.refresh_products()
+
+        self.stdout.write(f'   Produk aktif diproses: {count}')
+        self.stdout.write(f'   Total trigram        : {ProductTrigram.objects.count()}')
+        self.stdout.write(self.style.SUCCESS('\n✅ Trigram produk berhasil dibangun ulang'))
@@ -0,0 +1,27 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from products.models import AccountSummary
+
+
+class Command(BaseCommand):
+    help = 'Hitung ulang ringkasan akun (jumlah pesanan, total belanja, item keranjang) semua user'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            action='append',
+            dest='usernames',
+            help='Hanya user tertentu (bisa diulang)',
+        )
+
+    def handle(self, *args, **options):
+        users = User.objects.all()
+        if options['usernames']:
+            users = users.filter(username__in=options['usernames'])
+
+        user_ids = list(users.values_list('id', flat=True))
+        AccountSummary.refresh_users(user_ids)
+
+        self.stdout.write(f'   User diproses: {len(user_ids)}')
+        self.stdout.write(self.style.SUCCESS('\n✅ Ringkasan akun berhasil dihitung ulang'))
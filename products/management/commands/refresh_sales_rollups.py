@@ -0,0 +1,49 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from products.sales_report import first_sale_date, refresh_sales_rollups
+
+
+class Command(BaseCommand):
+    help = (
+        'Hitung ulang rollup penjualan harian (toko, produk, kategori) untuk N hari terakhir. '
+        'Jalankan berkala (mis. cron tiap jam); gunakan --full untuk membangun ulang semua riwayat.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=7, help='Jumlah hari terakhir yang dihitung ulang (default: 7)')
+        parser.add_argument('--from', dest='date_from', metavar='YYYY-MM-DD', help='Tanggal awal (inklusif)')
+        parser.add_argument('--to', dest='date_to', metavar='YYYY-MM-DD', help='Tanggal akhir (inklusif, default: hari ini)')
+        parser.add_argument('--full', action='store_true', help='Hitung ulang sejak pesanan pertama')
+
+    def _parse_date(self, value):
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            raise CommandError(f'Format tanggal tidak valid: {value} (gunakan YYYY-MM-DD)')
+
+    def handle(self, *args, **options):
+        date_to = self._parse_date(options['date_to']) if options['date_to'] else timezone.localdate()
+
+        if options['full']:
+            date_from = first_sale_date()
+            if date_from is None:
+                self.stdout.write(self.style.WARNING('⚠️  Belum ada penjualan'))
+                return
+        elif options['date_from']:
+            date_from = self._parse_date(options['date_from'])
+        else:
+            date_from = date_to - timedelta(days=max(options['days'], 1) - 1)
+
+        if date_from > date_to:
+            raise CommandError('Tanggal awal harus sebelum tanggal akhir')
+
+        counts = refresh_sales_rollups(date_from, date_to)
+
+        self.stdout.write(f'📅 {date_from:%d %b %Y} - {date_to:%d %b %Y}')
+        self.stdout.write(f'   Harian: {counts["daily"]} baris')
+        self.stdout.write(f'   Produk: {counts["products"]} baris')
+        self.stdout.write(f'   Kategori: {counts["categories"]} baris')
+        self.stdout.write(self.style.SUCCESS('\n✅ Rollup penjualan berhasil diperbarui'))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from products.order_status import send_pending_notifications
+
+
+class Command(BaseCommand):
+    help = (
+        'Kirim email antrian perubahan status pesanan ke customer per batch '
+        '(satu koneksi SMTP per batch). Jalankan berkala, mis. cron tiap 5 menit.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help='Email per batch (default: 100)')
+
+    def handle(self, *args, **options):
+        total = 0
+        while True:
+            processed = send_pending_notifications(limit=options['batch_size'])
+            if not processed:
+                break
+            total += processed
+            self.stdout.write(f'📧 {processed} notifikasi diproses')
+
+        self.stdout.write(self.style.SUCCESS(f'\n✅ {total} notifikasi pesanan terkirim'))
@@ -1,9 +1,136 @@
 # products/midtrans_utils.py
 # FILE BARU - Buat file ini di folder products/
 
+import asyncio
+import weakref
+
 import midtransclient
+from midtransclient.error_midtrans import MidtransAPIError
 from django.conf import settings
 from decimal import Decimal
+from functools import cache
+
+
+def build_snap_params(order, order_items, email):
+    """
+    Parameter Snap untuk order (tanpa I/O: item & email user diberikan pemanggil,
+    sehingga bisa dipakai dari view sync maupun async)
+    """
+    print(f"🔢 MEMBUAT TRANSAKSI MIDTRANS UNTUK ORDER: {order.order_number}")
+
+    # ✅ HITUNG ULANG DENGAN PASTI - INI YANG PERLU DIPERBAIKI
+    item_details = []
+    gross_amount = 0
+    
+    # 1. PRODUK-PRODUK
+    for order_item in order_items:
+        product_price = int(order_item.product_price)
+        product_total = product_price * order_item.quantity
+        
+        item_details.append({
+            'id': str(order_item.product_id),
+            'price': product_price,
+            'quantity': order_item.quantity,
+            'name': order_item.product_name[:50]
+        })
+        gross_amount += product_total
+        print(f"   📦 {order_item.product_name}: {product_price} x {order_item.quantity} = {product_total}")
+
+    # 2. BIAYA PENGIRIMAN
+    shipping_cost = int(order.shipping_cost)
+    if shipping_cost > 0:
+        item_details.append({
+            'id': 'shipping',
+            'price': shipping_cost,
+            'quantity': 1,
+            'name': 'Biaya Pengiriman'
+        })
+        gross_amount += shipping_cost
+        print(f"   🚚 Biaya Pengiriman: {shipping_cost}")
+
+    # 3. DISKON VOUCHER (JIKA ADA) - ✅ INI YANG DITAMBAHKAN
+    voucher_discount = int(order.voucher_discount)
+    if voucher_discount > 0:
+        item_details.append({
+            'id': 'voucher',
+            'price': -voucher_discount,  # HARUS NEGATIVE
+            'quantity': 1,
+            'name': f'Diskon Voucher {order.voucher_code}' if order.voucher_code else 'Diskon Voucher'
+        })
+        gross_amount -= voucher_discount
+        print(f"   💰 Diskon Voucher: -{voucher_discount}")
+
+    # ✅ PASTIKAN GROSS AMOUNT SAMA DENGAN ORDER TOTAL
+    calculated_total = gross_amount
+    order_total = int(order.total)
+    
+    print(f"   🧮 TOTAL PERHITUNGAN: {calculated_total}")
+    print(f"   🧮 TOTAL DI ORDER: {order_total}")
+    
+    # JIKA BERBEDA, PAKAI YANG DI ORDER
+    if calculated_total != order_total:
+        print(f"   ⚠️  PERHITUNGAN BERBEDA! Adjusting...")
+        gross_amount = order_total
+
+    print(f"   ✅ FINAL GROSS AMOUNT: {gross_amount}")
+
+    # ✅ SNAP PARAMETERS
+    snap_param = {
+        'transaction_details': {
+            'order_id': order.order_number,
+            'gross_amount': gross_amount
+        },
+        'item_details': item_details,
+        'customer_details': {
+            'first_name': order.shipping_name.split(' ')[0],
+            'last_name': ' '.join(order.shipping_name.split(' ')[1:]) if len(order.shipping_name.split(' ')) > 1 else '',
+            'email': email,
+            'phone': order.shipping_phone,
+            'billing_address': {
+                'first_name': order.shipping_name.split(' ')[0],
+                'last_name': ' '.join(order.shipping_name.split(' ')[1:]) if len(order.shipping_name.split(' ')) > 1 else '',
+                'email': email,
+                'phone': order.shipping_phone,
+                'address': order.shipping_address[:200],
+                'city': order.shipping_city,
+                'postal_code': order.shipping_postal_code or '00000',
+                'country_code': 'IDN'
+            },
+            'shipping_address': {
+                'first_name': order.shipping_name.split(' ')[0],
+                'last_name': ' '.join(order.shipping_name.split(' ')[1:]) if len(order.shipping_name.split(' ')) > 1 else '',
+                'email': email,
+                'phone': order.shipping_phone,
+                'address': order.shipping_address[:200],
+                'city': order.shipping_city,
+                'postal_code': order.shipping_postal_code or '00000',
+                'country_code': 'IDN'
+            }
+        },
+        'enabled_payments': [
+            'credit_card', 'bca_va', 'bni_va', 'bri_va', 
+            'permata_va', 'other_va', 'gopay', 'shopeepay', 
+            'qris', 'cimb_clicks', 'danamon_online'
+        ],
+        'credit_card': {
+            'secure': True,
+            'bank': 'bca',
+            'installment': {
+                'required': False,
+                'terms': {
+                    'bni': [3, 6, 12],
+                    'mandiri': [3, 6, 12],
+                    'cimb': [3],
+                    'bca': [3, 6, 12],
+                    'maybank': [3, 6, 12],
+                }
+            }
+        },
+        'callbacks': {
+            'finish': f'{settings.ALLOWED_HOSTS[0]}/order-success/{order.id}/' if settings.ALLOWED_HOSTS else f'http://localhost:8000/order-success/{order.id}/'
+        }
+    }
+    return snap_param
 
 
 class MidtransPayment:
@@ -31,120 +158,7 @@ class MidtransPayment:
         """
         
         try:
-            print(f"🔢 MEMBUAT TRANSAKSI MIDTRANS UNTUK ORDER: {order.order_number}")
-            
-            # ✅ HITUNG ULANG DENGAN PASTI - INI YANG PERLU DIPERBAIKI
-            item_details = []
-            gross_amount = 0
-            
-            # 1. PRODUK-PRODUK
-            for order_item in order.items.all():
-                product_price = int(order_item.product_price)
-                product_total = product_price * order_item.quantity
-                
-                item_details.append({
-                    'id': str(order_item.product.id),
-                    'price': product_price,
-                    'quantity': order_item.quantity,
-                    'name': order_item.product_name[:50]
-                })
-                gross_amount += product_total
-                print(f"   📦 {order_item.product_name}: {product_price} x {order_item.quantity} = {product_total}")
-
-            # 2. BIAYA PENGIRIMAN
-            shipping_cost = int(order.shipping_cost)
-            if shipping_cost > 0:
-                item_details.append({
-                    'id': 'shipping',
-                    'price': shipping_cost,
-                    'quantity': 1,
-                    'name': 'Biaya Pengiriman'
-                })
-                gross_amount += shipping_cost
-                print(f"   🚚 Biaya Pengiriman: {shipping_cost}")
-
-            # 3. DISKON VOUCHER (JIKA ADA) - ✅ INI YANG DITAMBAHKAN
-            voucher_discount = int(order.voucher_discount)
-            if voucher_discount > 0:
-                item_details.append({
-                    'id': 'voucher',
-                    'price': -voucher_discount,  # HARUS NEGATIVE
-                    'quantity': 1,
-                    'name': f'Diskon Voucher {order.voucher_code}' if order.voucher_code else 'Diskon Voucher'
-                })
-                gross_amount -= voucher_discount
-                print(f"   💰 Diskon Voucher: -{voucher_discount}")
-
-            # ✅ PASTIKAN GROSS AMOUNT SAMA DENGAN ORDER TOTAL
-            calculated_total = gross_amount
-            order_total = int(order.total)
-            
-            print(f"   🧮 TOTAL PERHITUNGAN: {calculated_total}")
-            print(f"   🧮 TOTAL DI ORDER: {order_total}")
-            
-            # JIKA BERBEDA, PAKAI YANG DI ORDER
-            if calculated_total != order_total:
-                print(f"   ⚠️  PERHITUNGAN BERBEDA! Adjusting...")
-                gross_amount = order_total
-
-            print(f"   ✅ FINAL GROSS AMOUNT: {gross_amount}")
-
-            # ✅ SNAP PARAMETERS
-            snap_param = {
-                'transaction_details': {
-                    'order_id': order.order_number,
-                    'gross_amount': gross_amount
-                },
-                'item_details': item_details,
-                'customer_details': {
-                    'first_name': order.shipping_name.split(' ')[0],
-                    'last_name': ' '.join(order.shipping_name.split(' ')[1:]) if len(order.shipping_name.split(' ')) > 1 else '',
-                    'email': order.user.email,
-                    'phone': order.shipping_phone,
-                    'billing_address': {
-                        'first_name': order.shipping_name.split(' ')[0],
-                        'last_name': ' '.join(order.shipping_name.split(' ')[1:]) if len(order.shipping_name.split(' ')) > 1 else '',
-                        'email': order.user.email,
-                        'phone': order.shipping_phone,
-                        'address': order.shipping_address[:200],
-                        'city': order.shipping_city,
-                        'postal_code': order.shipping_postal_code or '00000',
-                        'country_code': 'IDN'
-                    },
-                    'shipping_address': {
-                        'first_name': order.shipping_name.split(' ')[0],
-                        'last_name': ' '.join(order.shipping_name.split(' ')[1:]) if len(order.shipping_name.split(' ')) > 1 else '',
-                        'email': order.user.email,
-                        'phone': order.shipping_phone,
-                        'address': order.shipping_address[:200],
-                        'city': order.shipping_city,
-                        'postal_code': order.shipping_postal_code or '00000',
-                        'country_code': 'IDN'
-                    }
-                },
-                'enabled_payments': [
-                    'credit_card', 'bca_va', 'bni_va', 'bri_va', 
-                    'permata_va', 'other_va', 'gopay', 'shopeepay', 
-                    'qris', 'cimb_clicks', 'danamon_online'
-                ],
-                'credit_card': {
-                    'secure': True,
-                    'bank': 'bca',
-                    'installment': {
-                        'required': False,
-                        'terms': {
-                            'bni': [3, 6, 12],
-                            'mandiri': [3, 6, 12],
-                            'cimb': [3],
-                            'bca': [3, 6, 12],
-                            'maybank': [3, 6, 12],
-                        }
-                    }
-                },
-                'callbacks': {
-                    'finish': f'{settings.ALLOWED_HOSTS[0]}/order-success/{order.id}/' if settings.ALLOWED_HOSTS else f'http://localhost:8000/order-success/{order.id}/'
-                }
-            }
+            snap_param = build_snap_params(order, order.items.all(), order.user.email)
 
             print(f"   📦 Snap Parameters siap, membuat token...")
             
@@ -187,4 +201,111 @@ class MidtransPayment:
             return {
                 'success': False,
                 'error': str(e)
-            }
\ No newline at end of file
+            }
+
+@cache
+def _ssl_context():
+    """Dipakai bersama semua AsyncClient; membuat SSL context baru per client mahal (CPU)"""
+    import ssl
+
+    import certifi
+
+    return ssl.create_default_context(cafile=certifi.where())
+
+
+# Satu httpx.AsyncClient per event loop agar koneksi (TCP + TLS) ke Midtrans dipakai
+# ulang antar request. Client terikat pada loop yang membuatnya, jadi dibuat saat
+# pertama dipakai di loop itu; ditutup oleh aclose_async_clients() saat shutdown ASGI.
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def _async_client():
+    import httpx
+
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = _async_clients[loop] = httpx.AsyncClient(
+            headers={'accept': 'application/json'},
+            timeout=AsyncMidtransPayment.TIMEOUT,
+            verify=_ssl_context(),
+        )
+    return client
+
+
+async def aclose_async_clients():
+    """Tutup client milik event loop yang sedang berjalan"""
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+class AsyncMidtransPayment:
+    """
+    Versi async MidtransPayment untuk view async (ASGI/uvicorn): request ke
+    Midtrans memakai httpx.AsyncClient sehingga worker tidak tertahan selama
+    menunggu gateway. Hasil sama dengan MidtransPayment ({'success': ...}).
+    """
+
+    TIMEOUT = 30
+
+    def __init__(self, core_base_url=None, snap_base_url=None):
+        config = midtransclient.Snap(is_production=settings.MIDTRANS_IS_PRODUCTION).api_config
+        self.core_base_url = core_base_url or config.get_core_api_base_url()
+        self.snap_base_url = snap_base_url or config.get_snap_base_url()
+
+    async def _request(self, method, url, payload=None):
+        response = await _async_client().request(
+            method, url, json=payload, auth=(settings.MIDTRANS_SERVER_KEY, ''),
+        )
+        data = response.json()
+        # Sama dengan midtransclient: error HTTP, atau status_code >= 400 di body (kecuali 407 = expired)
+        status_code = int(data.get('status_code', 200)) if isinstance(data, dict) else 200
+        if response.status_code >= 400 or (status_code >= 400 and status_code != 407):
+            raise MidtransAPIError(
+                f'Midtrans API is returning API error. HTTP status code: `{response.status_code}`. '
+                f'API response: `{response.text}`',
+                api_response_dict=data,
+                http_status_code=response.status_code,
+            )
+        return data
+
+    async def create_transaction(self, order):
+        """Seperti MidtransPayment.create_transaction, item & email dibaca dengan ORM async"""
+        try:
+            from django.contrib.auth.models import User
+
+            order_items = [item async for item in order.items.all()]
+            email = await User.objects.filter(pk=order.user_id).values_list('email', flat=True).aget()
+            snap_param = build_snap_params(order, order_items, email)
+
+            print(f"   📦 Snap Parameters siap, membuat token...")
+            transaction = await self._request('POST', f'{self.snap_base_url}/transactions', snap_param)
+            snap_token = transaction['token']
+            print(f"   ✅ Snap token berhasil: {snap_token[:50]}...")
+
+            return {
+                'success': True,
+                'snap_token': snap_token,
+                'redirect_url': transaction.get('redirect_url', '')
+            }
+        except Exception as e:
+            print(f"   ❌ Error Midtrans: {str(e)}")
+            return {
+                'success': False,
+                'error': str(e)
+            }
+
+    async def check_transaction_status(self, order_id):
+        """Seperti MidtransPayment.check_transaction_status"""
+        try:
+            status_response = await self._request('GET', f'{self.core_base_url}/v2/{order_id}/status')
+            return {
+                'success': True,
+                'data': status_response
+            }
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e)
+            }
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-19 07:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0033_delete_passwordchangeverification'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_orders', models.IntegerField(default=0, verbose_name='Total Pesanan')),
+                ('pending_orders', models.IntegerField(default=0, verbose_name='Pesanan Pending')),
+                ('total_revenue', models.DecimalField(decimal_places=0, default=0, max_digits=14, verbose_name='Total Pendapatan')),
+                ('total_products', models.IntegerField(default=0, verbose_name='Total Produk')),
+                ('unread_messages', models.IntegerField(default=0, verbose_name='Pesan Belum Dibaca')),
+                ('recomputed_at', models.DateTimeField(blank=True, null=True, verbose_name='Dihitung Ulang Pada')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Diperbarui Pada')),
+            ],
+            options={
+                'verbose_name': 'Statistik Dashboard',
+                'verbose_name_plural': 'Statistik Dashboard',
+            },
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 5.2.7 on 2026-10-19 07:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0034_dashboardstats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailySales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Tanggal')),
+                ('order_count', models.IntegerField(default=0, verbose_name='Jumlah Pesanan')),
+                ('units', models.IntegerField(default=0, verbose_name='Unit Terjual')),
+                ('revenue', models.DecimalField(decimal_places=0, default=0, max_digits=14, verbose_name='Pendapatan')),
+                ('voucher_discount', models.DecimalField(decimal_places=0, default=0, max_digits=14, verbose_name='Diskon Voucher')),
+                ('shipping_cost', models.DecimalField(decimal_places=0, default=0, max_digits=14, verbose_name='Ongkos Kirim')),
+                ('refreshed_at', models.DateTimeField(auto_now=True, verbose_name='Diperbarui Pada')),
+            ],
+            options={
+                'verbose_name': 'Laporan Penjualan',
+                'verbose_name_plural': 'Laporan Penjualan',
+                'ordering': ['-date'],
+                'constraints': [models.UniqueConstraint(fields=('date',), name='unique_daily_sales_date')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyCategorySales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Tanggal')),
+                ('order_count', models.IntegerField(default=0, verbose_name='Jumlah Pesanan')),
+                ('units', models.IntegerField(default=0, verbose_name='Unit Terjual')),
+                ('revenue', models.DecimalField(decimal_places=0, default=0, max_digits=14, verbose_name='Pendapatan')),
+                ('voucher_discount', models.DecimalField(decimal_places=0, default=0, max_digits=14, verbose_name='Diskon Voucher')),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_sales', to='products.category', verbose_name='Kategori')),
+            ],
+            options={
+                'verbose_name': 'Penjualan Harian Kategori',
+                'verbose_name_plural': 'Penjualan Harian Kategori',
+                'ordering': ['-date'],
+                'constraints': [models.UniqueConstraint(fields=('date', 'category'), name='unique_daily_category_sales')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyProductSales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Tanggal')),
+                ('order_count', models.IntegerField(default=0, verbose_name='Jumlah Pesanan')),
+                ('units', models.IntegerField(default=0, verbose_name='Unit Terjual')),
+                ('revenue', models.DecimalField(decimal_places=0, default=0, max_digits=14, verbose_name='Pendapatan')),
+                ('voucher_discount', models.DecimalField(decimal_places=0, default=0, max_digits=14, verbose_name='Diskon Voucher')),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_product_sales', to='products.category', verbose_name='Kategori')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_sales', to='products.product', verbose_name='Produk')),
+            ],
+            options={
+                'verbose_name': 'Penjualan Harian Produk',
+                'verbose_name_plural': 'Penjualan Harian Produk',
+                'ordering': ['-date'],
+                'constraints': [models.UniqueConstraint(fields=('date', 'product'), name='unique_daily_product_sales')],
+            },
+        ),
+    ]
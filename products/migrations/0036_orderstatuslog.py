@@ -0,0 +1,37 @@
+# Generated by Django 5.2.7 on 2026-10-19 07:38
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0035_sales_rollups'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderStatusLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_status', models.CharField(choices=[('pending', 'Menunggu Pembayaran'), ('paid', 'Sudah Dibayar'), ('processing', 'Sedang Diproses'), ('shipped', 'Dikirim'), ('delivered', 'Terkirim'), ('cancelled', 'Dibatalkan'), ('ready_for_pickup', 'Siap Diambil')], max_length=20, verbose_name='Dari Status')),
+                ('to_status', models.CharField(choices=[('pending', 'Menunggu Pembayaran'), ('paid', 'Sudah Dibayar'), ('processing', 'Sedang Diproses'), ('shipped', 'Dikirim'), ('delivered', 'Terkirim'), ('cancelled', 'Dibatalkan'), ('ready_for_pickup', 'Siap Diambil')], max_length=20, verbose_name='Ke Status')),
+                ('source', models.CharField(choices=[('admin', 'Admin'), ('customer', 'Customer'), ('midtrans', 'Midtrans'), ('system', 'Sistem')], default='system', max_length=20, verbose_name='Sumber')),
+                ('note', models.CharField(blank=True, max_length=255, verbose_name='Catatan')),
+                ('notify', models.BooleanField(default=False, verbose_name='Kirim Notifikasi')),
+                ('notified_at', models.DateTimeField(blank=True, null=True, verbose_name='Notifikasi Terkirim')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Waktu')),
+                ('changed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='Diubah Oleh')),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='status_logs', to='products.order', verbose_name='Pesanan')),
+            ],
+            options={
+                'verbose_name': 'Riwayat Status Pesanan',
+                'verbose_name_plural': 'Riwayat Status Pesanan',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['notify', 'notified_at'], name='orderstatuslog_outbox_idx')],
+            },
+        ),
+    ]
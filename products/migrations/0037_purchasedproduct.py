@@ -0,0 +1,55 @@
+# Generated by Django 5.2.7 on 2026-10-19 07:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Min
+
+
+def build_purchase_index(apps, schema_editor):
+    OrderItem = apps.get_model('products', 'OrderItem')
+    PurchasedProduct = apps.get_model('products', 'PurchasedProduct')
+    rows = (
+        OrderItem.objects
+        .filter(order__status__in=['paid', 'processing', 'shipped', 'delivered', 'ready_for_pickup'])
+        .values('order__user_id', 'product_id')
+        .annotate(first_purchased_at=Min('order__created_at'))
+        .order_by()
+    )
+    PurchasedProduct.objects.bulk_create(
+        [
+            PurchasedProduct(
+                user_id=row['order__user_id'],
+                product_id=row['product_id'],
+                first_purchased_at=row['first_purchased_at'],
+            )
+            for row in rows
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0036_orderstatuslog'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PurchasedProduct',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('first_purchased_at', models.DateTimeField(verbose_name='Pertama Dibeli')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='purchasers', to='products.product', verbose_name='Produk')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='purchased_products', to=settings.AUTH_USER_MODEL, verbose_name='Pengguna')),
+            ],
+            options={
+                'verbose_name': 'Produk yang Dibeli',
+                'verbose_name_plural': 'Produk yang Dibeli',
+                'constraints': [models.UniqueConstraint(fields=('user', 'product'), name='unique_purchased_product')],
+            },
+        ),
+        migrations.RunPython(build_purchase_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-19 07:42
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0037_purchasedproduct'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='productreview',
+            index=models.Index(fields=['product', '-created_at', '-id'], name='review_newest_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productreview',
+            index=models.Index(fields=['product', '-rating', '-created_at', '-id'], name='review_highest_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productreview',
+            index=models.Index(fields=['product', 'rating', '-created_at', '-id'], name='review_lowest_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productreview',
+            index=models.Index(fields=['product', 'is_verified_purchase', '-created_at', '-id'], name='review_verified_idx'),
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.7 on 2026-10-19 07:45
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max, Q, Sum
+
+
+def build_account_summaries(apps, schema_editor):
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    Order = apps.get_model('products', 'Order')
+    CartItem = apps.get_model('products', 'CartItem')
+    AccountSummary = apps.get_model('products', 'AccountSummary')
+    orders = {
+        row['user_id']: row
+        for row in Order.objects.values('user_id').annotate(
+            count=Count('id'),
+            spent=Sum('total', filter=Q(status__in=['paid', 'processing', 'shipped', 'delivered', 'ready_for_pickup'])),
+            last=Max('created_at'),
+        ).order_by()
+    }
+    carts = dict(
+        CartItem.objects.values('cart__user_id').annotate(count=Count('id'))
+        .values_list('cart__user_id', 'count').order_by()
+    )
+    AccountSummary.objects.bulk_create(
+        [
+            AccountSummary(
+                user_id=user_id,
+                order_count=orders.get(user_id, {}).get('count', 0),
+                total_spent=orders.get(user_id, {}).get('spent') or 0,
+                last_order_at=orders.get(user_id, {}).get('last'),
+                cart_items=carts.get(user_id, 0),
+            )
+            for user_id in User.objects.values_list('id', flat=True).iterator()
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0038_review_sort_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccountSummary',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='account_summary', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Pengguna')),
+                ('order_count', models.IntegerField(default=0, verbose_name='Jumlah Pesanan')),
+                ('total_spent', models.DecimalField(decimal_places=0, default=0, max_digits=14, verbose_name='Total Belanja')),
+                ('last_order_at', models.DateTimeField(blank=True, null=True, verbose_name='Pesanan Terakhir')),
+                ('cart_items', models.IntegerField(default=0, verbose_name='Item di Keranjang')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Diperbarui Pada')),
+            ],
+            options={
+                'verbose_name': 'Ringkasan Akun',
+                'verbose_name_plural': 'Ringkasan Akun',
+            },
+        ),
+        migrations.RunPython(build_account_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.7 on 2026-10-19 08:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Avg
+
+PRICE_BANDS = [0, 50000, 100000, 250000, 500000, 1000000]
+
+
+def build_product_facets(apps, schema_editor):
+    Product = apps.get_model('products', 'Product')
+    ProductFacet = apps.get_model('products', 'ProductFacet')
+    rows = (
+        Product.objects.filter(is_active=True)
+        .annotate(rating=Avg('reviews__rating'))
+        .values_list('id', 'category_id', 'price', 'stock', 'rating')
+        .order_by()
+    )
+    ProductFacet.objects.bulk_create(
+        [
+            ProductFacet(
+                product_id=product_id,
+                category_id=category_id,
+                price_band=max((index for index, lower in enumerate(PRICE_BANDS) if price >= lower), default=0),
+                in_stock=stock > 0,
+                rating_band=int(rating or 0),
+            )
+            for product_id, category_id, price, stock, rating in rows
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0040_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductFacet',
+            fields=[
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='facet', serialize=False, to='products.product', verbose_name='Produk')),
+                ('price_band', models.PositiveSmallIntegerField(verbose_name='Rentang Harga')),
+                ('in_stock', models.BooleanField(verbose_name='Stok Tersedia')),
+                ('rating_band', models.PositiveSmallIntegerField(default=0, verbose_name='Rating')),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='products.category', verbose_name='Kategori')),
+            ],
+            options={
+                'verbose_name': 'Facet Produk',
+                'verbose_name_plural': 'Facet Produk',
+                'indexes': [models.Index(fields=['category', 'price_band', 'in_stock', 'rating_band'], name='facet_cube_idx')],
+            },
+        ),
+        migrations.RunPython(build_product_facets, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 5.2.7 on 2026-10-19 08:23
+
+import re
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+WORD_RE = re.compile(r'[^\W_]+')
+
+
+def trigrams(text):
+    grams = set()
+    for word in WORD_RE.findall(text.lower()):
+        padded = f' {word} '
+        grams.update(padded[index:index + 3] for index in range(len(padded) - 2))
+    return grams
+
+
+def build_search_index(apps, schema_editor):
+    Product = apps.get_model('products', 'Product')
+    if schema_editor.connection.vendor == 'postgresql':
+        # Pencarian fuzzy memakai pg_trgm langsung pada kolom nama
+        table = schema_editor.quote_name(Product._meta.db_table)
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS product_name_trgm_idx ON {table} USING gin (name gin_trgm_ops)'
+        )
+        return
+
+    ProductTrigram = apps.get_model('products', 'ProductTrigram')
+    ProductTrigram.objects.bulk_create(
+        [
+            ProductTrigram(trigram=trigram, product_id=product_id)
+            for product_id, name in Product.objects.filter(is_active=True).values_list('id', 'name')
+            for trigram in trigrams(name)
+        ],
+        batch_size=1000,
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS product_name_trgm_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0041_productfacet'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductTrigram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('trigram', models.CharField(max_length=3, verbose_name='Trigram')),
+                ('product', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='products.product', verbose_name='Produk')),
+            ],
+            options={
+                'verbose_name': 'Trigram Produk',
+                'verbose_name_plural': 'Trigram Produk',
+                'indexes': [models.Index(fields=['product'], name='product_trigram_product_idx')],
+                'constraints': [models.UniqueConstraint(fields=('trigram', 'product'), name='product_trigram_uniq')],
+            },
+        ),
+        migrations.RunPython(build_search_index, drop_search_index),
+    ]
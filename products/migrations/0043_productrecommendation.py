@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-19 08:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0042_producttrigram'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductRecommendation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField(verbose_name='Peringkat')),
+                ('score', models.FloatField(verbose_name='Skor')),
+                ('co_purchases', models.PositiveIntegerField(verbose_name='Jumlah Dibeli Bersamaan')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recommendations', to='products.product', verbose_name='Produk')),
+                ('recommended', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recommended_by', to='products.product', verbose_name='Produk Rekomendasi')),
+            ],
+            options={
+                'verbose_name': 'Rekomendasi Produk',
+                'verbose_name_plural': 'Rekomendasi Produk',
+                'ordering': ['product', 'rank'],
+                'constraints': [models.UniqueConstraint(fields=('product', 'rank'), name='product_recommendation_rank_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 08:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0043_productrecommendation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orderstatuslog',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Notifikasi Diproses'),
+        ),
+    ]
@@ -1,13 +1,21 @@
 from django.db import models
 from django.utils.text import slugify
 from django.contrib.auth.models import User
-from django.db.models.signals import post_save
+from django.db.models.signals import post_init, post_save, post_delete, pre_delete
+from django.db import connection, transaction
+from django.db.models import Avg, Count, Exists, F, Max, Min, OuterRef, Q, Sum
 from django.dispatch import receiver
+from django.contrib.auth.signals import user_logged_in, user_logged_out
+import re
 import secrets
 from datetime import timedelta
+from decimal import Decimal
 from django.utils import timezone
 from django.core.validators import MinValueValidator
 
+from .page_cache import CATALOG_TAG, FACET_TAG, invalidate_tags, mark_auth_cookie, product_tag
+from .static_catalog import schedule_catalog_rebuild
+
 # ==================== CATEGORY MODEL ====================
 
 class Category(models.Model):
@@ -51,6 +59,12 @@ class Product(models.Model):
         verbose_name_plural = "Produk"
         ordering = ['-created_at']
         app_label = 'products'
+        indexes = [
+            # Halaman shop/home: produk aktif terbaru, opsional per kategori
+            # (partial index, filter is_active=True di SQLite menjadi WHERE "is_active")
+            models.Index(fields=['-created_at'], condition=Q(is_active=True), name='product_active_recent_idx'),
+            models.Index(fields=['category', '-created_at'], condition=Q(is_active=True), name='product_catalog_idx'),
+        ]
     
     def save(self, *args, **kwargs):
         if not self.slug:
@@ -127,8 +141,8 @@ class EmailVerification(models.Model):
             self.is_verified = True
             self.verified_at = timezone.now()
             self.user.is_active = True
-            self.user.save()
-            self.save()
+            self.user.save(update_fields=['is_active'])
+            self.save(update_fields=['is_verified', 'verified_at'])
             return True, "Email berhasil diverifikasi!"
         
         return False, "Kode verifikasi salah!"
@@ -165,6 +179,22 @@ class UserProfile(models.Model):
     def __str__(self):
         return f"Profile - {self.user.username}"
     
+    def _field_values(self):
+        # Field yang di-defer tidak ikut dibandingkan (tidak memicu query)
+        return {
+            field.attname: getattr(self.__dict__[field.attname], 'name', self.__dict__[field.attname])
+            for field in self._meta.concrete_fields
+            if field.attname in self.__dict__ and field.name not in ('created_at', 'updated_at')
+        }
+
+    def changed_fields(self):
+        """Nama field yang nilainya berbeda dari saat dimuat/disimpan terakhir"""
+        current = self._field_values()
+        return [
+            name for name, value in current.items()
+            if name in self._profile_state and self._profile_state[name] != value
+        ]
+    
     def get_full_address(self):
         parts = []
         if self.address:
@@ -180,15 +210,40 @@ class UserProfile(models.Model):
         return ", ".join(parts) if parts else "Alamat belum diisi"
 
 
+# Field User yang tidak relevan untuk profile (last_login diupdate setiap login)
+USER_FIELDS_WITHOUT_PROFILE = {'last_login', 'password', 'is_active'}
+
+
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
     if created:
         UserProfile.objects.create(user=instance)
 
 @receiver(post_save, sender=User)
-def save_user_profile(sender, instance, **kwargs):
-    if hasattr(instance, 'profile'):
-        instance.profile.save()
+def save_user_profile(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Simpan perubahan profile yang diubah lewat user.profile lalu user.save()
+    Tidak ada query sama sekali jika profile belum dimuat (mis. update last_login
+    saat login) atau tidak ada field profile yang berubah
+    """
+    if created or (update_fields and set(update_fields) <= USER_FIELDS_WITHOUT_PROFILE):
+        return
+    if not User.profile.is_cached(instance):
+        return
+    profile = instance.profile
+    changed = profile.changed_fields()
+    if changed:
+        profile.save(update_fields=changed + ['updated_at'])
+
+
+@receiver(post_init, sender=UserProfile)
+def remember_profile_state(sender, instance, **kwargs):
+    instance._profile_state = instance._field_values()
+
+
+@receiver(post_save, sender=UserProfile)
+def reset_profile_state(sender, instance, **kwargs):
+    instance._profile_state = instance._field_values()
 
 
 # ==================== SHIPPING ADDRESS MODEL ====================
@@ -209,6 +264,9 @@ class ShippingAddress(models.Model):
         verbose_name = "Alamat Pengiriman"
         verbose_name_plural = "Alamat Pengiriman"
         app_label = 'products'
+        indexes = [
+            models.Index(fields=['user', 'is_default'], name='address_user_default_idx'),
+        ]
     
     def __str__(self):
         return f"{self.full_name} - {self.city}"
@@ -313,6 +371,9 @@ class Order(models.Model):
         ('reguler', 'Reguler'),
         ('express', 'Express'),
     ]
+
+    # Status yang dihitung sebagai penjualan di laporan
+    SALES_STATUSES = ['paid', 'processing', 'shipped', 'delivered', 'ready_for_pickup']
     
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='orders', verbose_name="Pengguna")
     order_number = models.CharField(max_length=50, unique=True, verbose_name="Nomor Pesanan")
@@ -354,6 +415,12 @@ class Order(models.Model):
         verbose_name = "Pesanan"
         verbose_name_plural = "Pesanan"
         ordering = ['-created_at']
+        indexes = [
+            # Riwayat pesanan user, filter status (admin, rollup penjualan) & rekonsiliasi pembayaran
+            models.Index(fields=['user', '-created_at'], name='order_user_recent_idx'),
+            models.Index(fields=['status', '-created_at'], name='order_status_recent_idx'),
+            models.Index(fields=['payment_method', 'status'], name='order_payment_status_idx'),
+        ]
     
     def __str__(self):
         return f"Pesanan {self.order_number} - {self.user.username}"
@@ -400,6 +467,44 @@ class OrderItem(models.Model):
         super().save(*args, **kwargs)
 
 
+# ==================== ORDER STATUS LOG MODEL ====================
+
+class OrderStatusLog(models.Model):
+    """
+    Riwayat perubahan status pesanan (lihat products/order_status.py)
+    Baris dengan notify=True dan notified_at kosong adalah antrian email ke customer;
+    claimed_at diisi saat baris sedang dikirim (klaim kedaluwarsa dikirim ulang)
+    """
+    SOURCE_CHOICES = [
+        ('admin', 'Admin'),
+        ('customer', 'Customer'),
+        ('midtrans', 'Midtrans'),
+        ('system', 'Sistem'),
+    ]
+
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='status_logs', verbose_name="Pesanan")
+    from_status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES, verbose_name="Dari Status")
+    to_status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES, verbose_name="Ke Status")
+    source = models.CharField(max_length=20, choices=SOURCE_CHOICES, default='system', verbose_name="Sumber")
+    changed_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, verbose_name="Diubah Oleh")
+    note = models.CharField(max_length=255, blank=True, verbose_name="Catatan")
+    notify = models.BooleanField(default=False, verbose_name="Kirim Notifikasi")
+    notified_at = models.DateTimeField(null=True, blank=True, verbose_name="Notifikasi Terkirim")
+    claimed_at = models.DateTimeField(null=True, blank=True, verbose_name="Notifikasi Diproses")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Waktu")
+
+    class Meta:
+        verbose_name = "Riwayat Status Pesanan"
+        verbose_name_plural = "Riwayat Status Pesanan"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['notify', 'notified_at'], name='orderstatuslog_outbox_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.order_id}: {self.from_status} → {self.to_status}"
+
+
 # ==================== CONTACT MESSAGE MODEL ====================
 
 class ContactMessage(models.Model):
@@ -524,21 +629,856 @@ class ProductReview(models.Model):
         ordering = ['-created_at']
         unique_together = ('product', 'user')
         app_label = 'products'
+        # Satu index per urutan review (lihat products/reviews.py)
+        indexes = [
+            models.Index(fields=['product', '-created_at', '-id'], name='review_newest_idx'),
+            models.Index(fields=['product', '-rating', '-created_at', '-id'], name='review_highest_idx'),
+            models.Index(fields=['product', 'rating', '-created_at', '-id'], name='review_lowest_idx'),
+            models.Index(fields=['product', 'is_verified_purchase', '-created_at', '-id'], name='review_verified_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.username} - {self.product.name} ({self.rating}⭐)"
     
     def save(self, *args, **kwargs):
-        has_purchased = OrderItem.objects.filter(
-            order__user=self.user,
-            product=self.product,
-            order__status__in=['paid', 'processing', 'shipped', 'delivered']
-        ).exists()
-        
-        self.is_verified_purchase = has_purchased
+        self.is_verified_purchase = PurchasedProduct.has_purchased(self.user_id, self.product_id)
         super().save(*args, **kwargs)
 
 
+# ==================== PURCHASED PRODUCT MODEL ====================
+
+class PurchasedProduct(models.Model):
+    """
+    Index (user, produk) yang pernah dibeli dengan pesanan berstatus dibayar
+    (Order.SALES_STATUSES). Dipakai untuk syarat review & is_verified_purchase
+    tanpa JOIN OrderItem -> Order. Diperbarui saat status pesanan berubah
+    (lihat products/order_status.py dan signal di bawah).
+    Bangun ulang: python manage.py rebuild_purchase_index
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='purchased_products', verbose_name="Pengguna")
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='purchasers', verbose_name="Produk")
+    first_purchased_at = models.DateTimeField(verbose_name="Pertama Dibeli")
+
+    BATCH_SIZE = 500
+
+    class Meta:
+        verbose_name = "Produk yang Dibeli"
+        verbose_name_plural = "Produk yang Dibeli"
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'product'], name='unique_purchased_product'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.product_id}"
+
+    @classmethod
+    def has_purchased(cls, user, product):
+        return cls.objects.filter(user=user, product=product).exists()
+
+    @classmethod
+    def _purchases(cls, items):
+        """{(user_id, product_id): tanggal pembelian pertama} dari OrderItem berstatus dibayar"""
+        rows = (
+            items.filter(order__status__in=Order.SALES_STATUSES)
+            .values('order__user_id', 'product_id')
+            .annotate(first_purchased_at=Min('order__created_at'))
+            .order_by()
+        )
+        return {(row['order__user_id'], row['product_id']): row['first_purchased_at'] for row in rows}
+
+    @classmethod
+    def refresh_pairs(cls, pairs):
+        """Samakan index & is_verified_purchase untuk pasangan (user_id, product_id) tertentu"""
+        by_user = {}
+        for user_id, product_id in pairs:
+            by_user.setdefault(user_id, set()).add(product_id)
+
+        user_ids = list(by_user)
+        for start in range(0, len(user_ids), cls.BATCH_SIZE):
+            batch = {user_id: by_user[user_id] for user_id in user_ids[start:start + cls.BATCH_SIZE]}
+            product_ids = set().union(*batch.values())
+            batch_pairs = {(user_id, product_id) for user_id, products in batch.items() for product_id in products}
+
+            current = {
+                pair: first for pair, first in cls._purchases(
+                    OrderItem.objects.filter(order__user_id__in=batch, product_id__in=product_ids)
+                ).items()
+                if pair in batch_pairs
+            }
+            existing = {
+                (row.user_id, row.product_id): row.id
+                for row in cls.objects.filter(user_id__in=batch, product_id__in=product_ids).only('id', 'user_id', 'product_id')
+                if (row.user_id, row.product_id) in batch_pairs
+            }
+
+            stale = [row_id for pair, row_id in existing.items() if pair not in current]
+            if stale:
+                cls.objects.filter(id__in=stale).delete()
+            cls.objects.bulk_create(
+                [
+                    cls(user_id=user_id, product_id=product_id, first_purchased_at=first)
+                    for (user_id, product_id), first in current.items()
+                    if (user_id, product_id) not in existing
+                ],
+                ignore_conflicts=True,
+            )
+
+            verified, unverified = [], []
+            reviews = ProductReview.objects.filter(user_id__in=batch, product_id__in=product_ids).values_list(
+                'id', 'user_id', 'product_id', 'is_verified_purchase'
+            )
+            for review_id, user_id, product_id, is_verified in reviews:
+                if (user_id, product_id) not in batch_pairs:
+                    continue
+                should_verify = (user_id, product_id) in current
+                if should_verify and not is_verified:
+                    verified.append(review_id)
+                elif is_verified and not should_verify:
+                    unverified.append(review_id)
+            # update() agar updated_at review tidak berubah
+            if verified:
+                ProductReview.objects.filter(id__in=verified).update(is_verified_purchase=True)
+            if unverified:
+                ProductReview.objects.filter(id__in=unverified).update(is_verified_purchase=False)
+            if verified or unverified:
+                # Badge & filter "terverifikasi" di halaman produk ikut berubah
+                slugs = Product.objects.filter(reviews__id__in=verified + unverified).values_list('slug', flat=True)
+                invalidate_tags(*(product_tag(slug) for slug in set(slugs)))
+
+    @classmethod
+    def order_pairs(cls, order_ids):
+        pairs = set()
+        order_ids = list(order_ids)
+        for start in range(0, len(order_ids), cls.BATCH_SIZE):
+            pairs.update(
+                OrderItem.objects.filter(order_id__in=order_ids[start:start + cls.BATCH_SIZE])
+                .values_list('order__user_id', 'product_id')
+                .distinct()
+            )
+        return pairs
+
+    @classmethod
+    def refresh_for_orders(cls, order_ids):
+        cls.refresh_pairs(cls.order_pairs(order_ids))
+
+    @classmethod
+    def rebuild(cls):
+        """Bangun ulang seluruh index dari OrderItem, return jumlah baris"""
+        purchases = cls._purchases(OrderItem.objects.all())
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create(
+                [
+                    cls(user_id=user_id, product_id=product_id, first_purchased_at=first)
+                    for (user_id, product_id), first in purchases.items()
+                ],
+                batch_size=cls.BATCH_SIZE,
+            )
+            ProductReview.objects.update(is_verified_purchase=Exists(
+                cls.objects.filter(user=OuterRef('user'), product=OuterRef('product'))
+            ))
+        return len(purchases)
+
+
+# ==================== ACCOUNT SUMMARY MODEL ====================
+
+class AccountSummary(models.Model):
+    """
+    Ringkasan akun per user untuk halaman profile (satu baris per user)
+    Diperbarui dalam transaksi yang sama dengan checkout, perubahan status
+    pesanan dan perubahan keranjang (lihat signal di bawah & products/order_status.py)
+    Hitung ulang penuh: python manage.py recompute_account_summaries
+    """
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True,
+        related_name='account_summary', verbose_name="Pengguna"
+    )
+    order_count = models.IntegerField(default=0, verbose_name="Jumlah Pesanan")
+    total_spent = models.DecimalField(max_digits=14, decimal_places=0, default=0, verbose_name="Total Belanja")
+    last_order_at = models.DateTimeField(null=True, blank=True, verbose_name="Pesanan Terakhir")
+    cart_items = models.IntegerField(default=0, verbose_name="Item di Keranjang")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Diperbarui Pada")
+
+    BATCH_SIZE = 500
+
+    class Meta:
+        verbose_name = "Ringkasan Akun"
+        verbose_name_plural = "Ringkasan Akun"
+
+    def __str__(self):
+        return f"Ringkasan - {self.user_id}"
+
+    @classmethod
+    def for_user(cls, user):
+        """Ringkasan user (memakai relasi yang sudah di-select_related jika ada)"""
+        try:
+            return user.account_summary
+        except cls.DoesNotExist:
+            cls.refresh_users([user.pk])
+            return cls.objects.get(pk=user.pk)
+
+    @classmethod
+    def refresh_users(cls, user_ids):
+        """Hitung ulang ringkasan untuk user tertentu dengan query GROUP BY per batch"""
+        user_ids = list(set(user_ids))
+        fields = ['order_count', 'total_spent', 'last_order_at', 'cart_items']
+        for start in range(0, len(user_ids), cls.BATCH_SIZE):
+            batch = user_ids[start:start + cls.BATCH_SIZE]
+            orders = {
+                row['user_id']: row
+                for row in Order.objects.filter(user_id__in=batch)
+                .values('user_id')
+                .annotate(
+                    count=Count('id'),
+                    spent=Sum('total', filter=Q(status__in=Order.SALES_STATUSES)),
+                    last=Max('created_at'),
+                )
+                .order_by()
+            }
+            carts = dict(
+                CartItem.objects.filter(cart__user_id__in=batch)
+                .values('cart__user_id')
+                .annotate(count=Count('id'))
+                .values_list('cart__user_id', 'count')
+                .order_by()
+            )
+            summaries = [
+                cls(
+                    user_id=user_id,
+                    order_count=orders.get(user_id, {}).get('count', 0),
+                    total_spent=orders.get(user_id, {}).get('spent') or 0,
+                    last_order_at=orders.get(user_id, {}).get('last'),
+                    cart_items=carts.get(user_id, 0),
+                )
+                for user_id in batch
+            ]
+            cls.objects.bulk_create(
+                summaries,
+                update_conflicts=True,
+                unique_fields=['user'],
+                update_fields=fields + ['updated_at'],
+            )
+
+    @classmethod
+    def apply_delta(cls, user_id, **changes):
+        """
+        Tambah/kurangi nilai secara atomik (UPDATE ... SET x = x + n)
+        Nilai non-angka (mis. last_order_at) di-set langsung
+        """
+        changes = {field: value for field, value in changes.items() if value}
+        if not changes:
+            return
+        updated = cls.objects.filter(pk=user_id).update(**{
+            field: F(field) + value if isinstance(value, (int, Decimal)) else value
+            for field, value in changes.items()
+        })
+        if not updated:
+            # Baris belum ada, hitung penuh sekali
+            cls.refresh_users([user_id])
+
+
+# ==================== PRODUCT FACET MODEL ====================
+
+class ProductFacet(models.Model):
+    """
+    Nilai facet per produk aktif untuk filter halaman shop (lihat products/facets.py):
+    kategori, rentang harga, stok tersedia dan rating rata-rata dibulatkan ke bawah
+    Diperbarui oleh signal Product/ProductReview dan pengembalian stok
+    (products/order_status.py). Bangun ulang: python manage.py rebuild_product_facets
+    """
+    # Batas bawah setiap rentang harga (Rupiah), rentang terakhir tanpa batas atas
+    PRICE_BANDS = [0, 50000, 100000, 250000, 500000, 1000000]
+
+    product = models.OneToOneField(
+        Product, on_delete=models.CASCADE, primary_key=True,
+        related_name='facet', verbose_name="Produk"
+    )
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='+', verbose_name="Kategori")
+    price_band = models.PositiveSmallIntegerField(verbose_name="Rentang Harga")
+    in_stock = models.BooleanField(verbose_name="Stok Tersedia")
+    rating_band = models.PositiveSmallIntegerField(default=0, verbose_name="Rating")  # 0 = belum ada review
+
+    BATCH_SIZE = 500
+
+    class Meta:
+        verbose_name = "Facet Produk"
+        verbose_name_plural = "Facet Produk"
+        indexes = [
+            # Kubus facet (GROUP BY keempat kolom) cukup membaca index ini
+            models.Index(fields=['category', 'price_band', 'in_stock', 'rating_band'], name='facet_cube_idx'),
+        ]
+
+    def __str__(self):
+        return f"Facet - {self.product_id}"
+
+    @classmethod
+    def price_band_for(cls, price):
+        band = 0
+        for index, lower in enumerate(cls.PRICE_BANDS):
+            if price >= lower:
+                band = index
+        return band
+
+    @classmethod
+    def refresh_products(cls, product_ids=None):
+        """
+        Samakan facet produk tertentu (None = semua produk)
+        Produk yang tidak aktif lagi dihapus dari tabel facet
+        """
+        products = Product.objects.filter(is_active=True)
+        stale = cls.objects.exclude(product__is_active=True)
+        if product_ids is not None:
+            product_ids = list(set(product_ids))
+            products = products.filter(pk__in=product_ids)
+            stale = stale.filter(pk__in=product_ids)
+
+        rows = products.annotate(rating=Avg('reviews__rating')).values_list(
+            'id', 'category_id', 'price', 'stock', 'rating'
+        ).order_by()
+        facets = [
+            cls(
+                product_id=product_id,
+                category_id=category_id,
+                price_band=cls.price_band_for(price),
+                in_stock=stock > 0,
+                rating_band=int(rating or 0),
+            )
+            for product_id, category_id, price, stock, rating in rows
+        ]
+        stale.delete()
+        cls.objects.bulk_create(
+            facets,
+            batch_size=cls.BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=['product'],
+            update_fields=['category', 'price_band', 'in_stock', 'rating_band'],
+        )
+        invalidate_tags(FACET_TAG)
+        return len(facets)
+
+
+# ==================== PRODUCT TRIGRAM MODEL ====================
+
+# Kata untuk trigram: huruf/angka, selain itu pemisah (seperti pg_trgm)
+_TRIGRAM_WORD_RE = re.compile(r'[^\W_]+')
+
+
+class ProductTrigram(models.Model):
+    """
+    Trigram nama produk aktif untuk pencarian fuzzy di database tanpa pg_trgm
+    (SQLite), lihat products/fuzzy_search.py. Trigram dibentuk seperti pg_trgm:
+    huruf kecil, per kata dengan padding (lihat trigrams()).
+    Di PostgreSQL tabel ini tidak diisi (pencarian memakai index GIN pg_trgm).
+    Diperbarui oleh signal Product. Bangun ulang: python manage.py rebuild_search_trigrams
+    """
+    trigram = models.CharField(max_length=3, verbose_name="Trigram")
+    product = models.ForeignKey(
+        Product, on_delete=models.CASCADE, related_name='+',
+        db_index=False, verbose_name="Produk"
+    )
+
+    BATCH_SIZE = 1000
+
+    class Meta:
+        verbose_name = "Trigram Produk"
+        verbose_name_plural = "Trigram Produk"
+        constraints = [
+            # Index (trigram, product): hitung kecocokan per produk hanya dari index
+            models.UniqueConstraint(fields=['trigram', 'product'], name='product_trigram_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['product'], name='product_trigram_product_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.trigram} - {self.product_id}"
+
+    @staticmethod
+    def trigrams(text):
+        """
+        Himpunan trigram teks seperti show_trgm() pg_trgm, tanpa trigram
+        "  x" (huruf pertama kata): sangat umum sehingga mahal dihitung,
+        dan awal kata sudah terwakili trigram " xy"
+        """
+        grams = set()
+        for word in _TRIGRAM_WORD_RE.findall(text.lower()):
+            padded = f' {word} '
+            grams.update(padded[index:index + 3] for index in range(len(padded) - 2))
+        return grams
+
+    @classmethod
+    def refresh_products(cls, product_ids=None):
+        """
+        Samakan trigram produk tertentu (None = semua produk)
+        Hanya baris yang berubah yang dihapus/ditambah; produk tidak aktif dihapus
+        """
+        if connection.vendor == 'postgresql':
+            return 0
+
+        products = Product.objects.filter(is_active=True)
+        existing = cls.objects.all()
+        if product_ids is not None:
+            product_ids = list(set(product_ids))
+            products = products.filter(pk__in=product_ids)
+            existing = existing.filter(product_id__in=product_ids)
+
+        wanted = {
+            (trigram, product_id)
+            for product_id, name in products.values_list('id', 'name')
+            for trigram in cls.trigrams(name)
+        }
+        current = set(existing.values_list('trigram', 'product_id'))
+
+        stale = {}
+        for trigram, product_id in current - wanted:
+            stale.setdefault(product_id, []).append(trigram)
+        for product_id, trigrams in stale.items():
+            cls.objects.filter(product_id=product_id, trigram__in=trigrams).delete()
+        cls.objects.bulk_create(
+            [cls(trigram=trigram, product_id=product_id) for trigram, product_id in wanted - current],
+            batch_size=cls.BATCH_SIZE,
+        )
+        return len({product_id for _, product_id in wanted})
+
+
+# ==================== PRODUCT RECOMMENDATION MODEL ====================
+
+class ProductRecommendation(models.Model):
+    """
+    Produk yang sering dibeli bersamaan: top-k tetangga per produk dari riwayat
+    OrderItem, diurutkan rank (0 = paling kuat). Dihitung offline oleh
+    python manage.py build_recommendations (lihat products/recommendations.py)
+    """
+    product = models.ForeignKey(
+        Product, on_delete=models.CASCADE, related_name='recommendations', verbose_name="Produk"
+    )
+    recommended = models.ForeignKey(
+        Product, on_delete=models.CASCADE, related_name='recommended_by', verbose_name="Produk Rekomendasi"
+    )
+    rank = models.PositiveSmallIntegerField(verbose_name="Peringkat")
+    score = models.FloatField(verbose_name="Skor")
+    co_purchases = models.PositiveIntegerField(verbose_name="Jumlah Dibeli Bersamaan")
+
+    class Meta:
+        verbose_name = "Rekomendasi Produk"
+        verbose_name_plural = "Rekomendasi Produk"
+        ordering = ['product', 'rank']
+        constraints = [
+            # Index (product, rank): halaman produk membaca tetangga dengan satu range scan
+            models.UniqueConstraint(fields=['product', 'rank'], name='product_recommendation_rank_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} -> {self.recommended_id} (#{self.rank})"
+
+
+# ==================== DASHBOARD STATS MODEL ====================
+
+class DashboardStats(models.Model):
+    """
+    Ringkasan statistik dashboard admin dalam satu baris.
+    Diperbarui incremental oleh signal Order/ContactMessage/Product sehingga
+    dashboard & badge sidebar tidak perlu COUNT/SUM ke seluruh tabel.
+    Hitung ulang penuh (perbaikan drift): python manage.py recompute_dashboard_stats
+    """
+    SINGLETON_ID = 1
+
+    total_orders = models.IntegerField(default=0, verbose_name="Total Pesanan")
+    pending_orders = models.IntegerField(default=0, verbose_name="Pesanan Pending")
+    total_revenue = models.DecimalField(max_digits=14, decimal_places=0, default=0, verbose_name="Total Pendapatan")
+    total_products = models.IntegerField(default=0, verbose_name="Total Produk")
+    unread_messages = models.IntegerField(default=0, verbose_name="Pesan Belum Dibaca")
+    recomputed_at = models.DateTimeField(null=True, blank=True, verbose_name="Dihitung Ulang Pada")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Diperbarui Pada")
+
+    class Meta:
+        verbose_name = "Statistik Dashboard"
+        verbose_name_plural = "Statistik Dashboard"
+
+    def __str__(self):
+        return f"Statistik Dashboard ({self.updated_at:%d %b %Y %H:%M})"
+
+    @classmethod
+    def get_current(cls):
+        return cls.objects.filter(pk=cls.SINGLETON_ID).first() or cls.recompute()
+
+    @classmethod
+    def recompute(cls):
+        """Hitung ulang semua nilai dari tabel sumber"""
+        orders = Order.objects.aggregate(
+            count=Count('id'),
+            pending=Count('id', filter=Q(status='pending')),
+            revenue=Sum('total', filter=Q(status='delivered')),
+        )
+        stats, _ = cls.objects.update_or_create(
+            pk=cls.SINGLETON_ID,
+            defaults={
+                'total_orders': orders['count'],
+                'pending_orders': orders['pending'],
+                'total_revenue': orders['revenue'] or 0,
+                'total_products': Product.objects.count(),
+                'unread_messages': ContactMessage.objects.filter(is_read=False).count(),
+                'recomputed_at': timezone.now(),
+            }
+        )
+        return stats
+
+    @classmethod
+    def apply_delta(cls, **deltas):
+        """Tambah/kurangi nilai secara atomik (UPDATE ... SET x = x + n)"""
+        deltas = {field: value for field, value in deltas.items() if value}
+        if not deltas:
+            return
+        updated = cls.objects.filter(pk=cls.SINGLETON_ID).update(
+            **{field: F(field) + value for field, value in deltas.items()}
+        )
+        if not updated:
+            # Baris belum ada, hitung penuh sekali
+            cls.recompute()
+
+    @classmethod
+    def message_read_delta(cls, queryset, is_read):
+        """Delta untuk bulk update is_read pesan kontak"""
+        changed = queryset.exclude(is_read=is_read).count()
+        return {'unread_messages': -changed if is_read else changed}
+
+
+def order_stats_contribution(status, total, count=1):
+    """Kontribusi order (atau sekelompok order) ke DashboardStats"""
+    if status is None:
+        return {'total_orders': 0, 'pending_orders': 0, 'total_revenue': 0}
+    return {
+        'total_orders': count,
+        'pending_orders': count if status == 'pending' else 0,
+        'total_revenue': (total or 0) if status == 'delivered' else 0,
+    }
+
+
+# ==================== DASHBOARD STATS SIGNALS ====================
+# Nilai saat dimuat disimpan di instance agar post_save bisa menghitung delta.
+# Pakai __dict__ supaya field yang di-defer (.only()) tidak memicu query tambahan.
+
+@receiver(post_init, sender=Order)
+def remember_order_stats_state(sender, instance, **kwargs):
+    instance._stats_state = (instance.__dict__.get('status'), instance.__dict__.get('total'))
+
+
+@receiver(post_save, sender=Order)
+def update_stats_on_order_save(sender, instance, created, **kwargs):
+    old_status, old_total = (None, None) if created else instance._stats_state
+    if not created and old_status is None:
+        # Status awal tidak diketahui (field di-defer), diperbaiki oleh recompute periodik
+        return
+    old = order_stats_contribution(old_status, old_total)
+    new = order_stats_contribution(instance.status, instance.total)
+    DashboardStats.apply_delta(**{field: new[field] - old[field] for field in new})
+    instance._stats_state = (instance.status, instance.total)
+
+
+@receiver(post_delete, sender=Order)
+def update_stats_on_order_delete(sender, instance, **kwargs):
+    old = order_stats_contribution(*instance._stats_state)
+    DashboardStats.apply_delta(**{field: -value for field, value in old.items()})
+
+
+@receiver(post_init, sender=ContactMessage)
+def remember_message_stats_state(sender, instance, **kwargs):
+    instance._stats_is_read = instance.__dict__.get('is_read')
+
+
+@receiver(post_save, sender=ContactMessage)
+def update_stats_on_message_save(sender, instance, created, **kwargs):
+    if created:
+        delta = 0 if instance.is_read else 1
+    elif instance._stats_is_read is None or instance._stats_is_read == instance.is_read:
+        delta = 0
+    else:
+        delta = -1 if instance.is_read else 1
+    DashboardStats.apply_delta(unread_messages=delta)
+    instance._stats_is_read = instance.is_read
+
+
+@receiver(post_delete, sender=ContactMessage)
+def update_stats_on_message_delete(sender, instance, **kwargs):
+    if instance._stats_is_read is False:
+        DashboardStats.apply_delta(unread_messages=-1)
+
+
+@receiver(post_save, sender=Product)
+def update_stats_on_product_create(sender, instance, created, **kwargs):
+    if created:
+        DashboardStats.apply_delta(total_products=1)
+
+
+@receiver(post_delete, sender=Product)
+def update_stats_on_product_delete(sender, instance, **kwargs):
+    DashboardStats.apply_delta(total_products=-1)
+
+
+# ==================== PURCHASE INDEX SIGNALS ====================
+# Perubahan status lewat products/order_status.py memperbarui index secara set-based;
+# signal ini menangani save()/delete() biasa (mis. form admin, inline item pesanan)
+
+@receiver(post_init, sender=Order)
+def remember_order_purchase_state(sender, instance, **kwargs):
+    instance._purchase_status = instance.__dict__.get('status')
+
+
+@receiver(post_save, sender=Order)
+def update_purchases_on_order_save(sender, instance, created, **kwargs):
+    was_paid = instance._purchase_status in Order.SALES_STATUSES
+    instance._purchase_status = instance.status
+    # Pesanan baru belum punya item, index diisi oleh signal OrderItem
+    if not created and was_paid != (instance.status in Order.SALES_STATUSES):
+        PurchasedProduct.refresh_for_orders([instance.pk])
+
+
+@receiver(pre_delete, sender=Order)
+def remember_order_purchase_pairs(sender, instance, **kwargs):
+    if instance.status in Order.SALES_STATUSES:
+        instance._purchase_pairs = PurchasedProduct.order_pairs([instance.pk])
+
+
+@receiver(post_delete, sender=Order)
+def update_purchases_on_order_delete(sender, instance, **kwargs):
+    pairs = getattr(instance, '_purchase_pairs', None)
+    if pairs:
+        PurchasedProduct.refresh_pairs(pairs)
+
+
+@receiver([post_save, post_delete], sender=OrderItem)
+def update_purchases_on_item_change(sender, instance, **kwargs):
+    if OrderItem.order.is_cached(instance) and kwargs.get('created'):
+        order = {'user_id': instance.order.user_id, 'status': instance.order.status}
+    else:
+        order = Order.objects.filter(pk=instance.order_id).values('user_id', 'status').first()
+    # Pesanan ikut terhapus: ditangani update_purchases_on_order_delete
+    if order and order['status'] in Order.SALES_STATUSES:
+        PurchasedProduct.refresh_pairs({(order['user_id'], instance.product_id)})
+
+
+# ==================== ACCOUNT SUMMARY SIGNALS ====================
+
+@receiver(post_init, sender=Order)
+def remember_order_account_state(sender, instance, **kwargs):
+    instance._account_state = (instance.__dict__.get('status'), instance.__dict__.get('total'))
+
+
+def _account_spent(status, total):
+    return (total or 0) if status in Order.SALES_STATUSES else 0
+
+
+@receiver(post_save, sender=Order)
+def update_account_on_order_save(sender, instance, created, **kwargs):
+    old_status, old_total = instance._account_state
+    instance._account_state = (instance.status, instance.total)
+    if created:
+        AccountSummary.apply_delta(
+            instance.user_id,
+            order_count=1,
+            total_spent=_account_spent(instance.status, instance.total),
+            last_order_at=instance.created_at,
+        )
+    elif old_status is not None:
+        AccountSummary.apply_delta(
+            instance.user_id,
+            total_spent=_account_spent(instance.status, instance.total) - _account_spent(old_status, old_total),
+        )
+
+
+@receiver(post_delete, sender=Order)
+def update_account_on_order_delete(sender, instance, **kwargs):
+    # Pesanan terakhir bisa berubah, hitung ulang user ini saja
+    AccountSummary.refresh_users([instance.user_id])
+
+
+@receiver(post_save, sender=CartItem)
+def update_account_on_cart_item_add(sender, instance, created, **kwargs):
+    if created:
+        AccountSummary.objects.filter(user__cart=instance.cart_id).update(cart_items=F('cart_items') + 1)
+
+
+@receiver(post_delete, sender=CartItem)
+def update_account_on_cart_item_delete(sender, instance, **kwargs):
+    AccountSummary.objects.filter(user__cart=instance.cart_id).update(cart_items=F('cart_items') - 1)
+
+
+# ==================== PRODUCT FACET SIGNALS ====================
+# Facet hanya dihitung ulang jika input facet berubah (bukan setiap pengurangan
+# stock saat checkout); refresh_products juga menaikkan FACET_TAG
+
+def _facet_inputs(product):
+    """(kategori, rentang harga, aktif, stok tersedia) atau None jika ada field yang di-defer"""
+    values = [product.__dict__.get(field) for field in ('category_id', 'price', 'is_active', 'stock')]
+    if None in values:
+        return None
+    category_id, price, is_active, stock = values
+    return (category_id, ProductFacet.price_band_for(price), is_active, stock > 0)
+
+
+@receiver(post_init, sender=Product)
+def remember_product_facet_state(sender, instance, **kwargs):
+    instance._facet_state = _facet_inputs(instance)
+
+
+@receiver(post_save, sender=Product)
+def update_facet_on_product_save(sender, instance, created, **kwargs):
+    state = _facet_inputs(instance)
+    if created or instance._facet_state is None or instance._facet_state != state:
+        ProductFacet.refresh_products([instance.pk])
+    instance._facet_state = state
+
+
+@receiver(post_delete, sender=Product)
+def update_facet_on_product_delete(sender, instance, **kwargs):
+    # Baris facet ikut terhapus (CASCADE), cukup buang cache jumlah facet
+    invalidate_tags(FACET_TAG)
+
+
+@receiver([post_save, post_delete], sender=ProductReview)
+def update_facet_on_review_change(sender, instance, **kwargs):
+    ProductFacet.refresh_products([instance.product_id])
+
+
+# ==================== PRODUCT TRIGRAM SIGNALS ====================
+
+# Trigram hanya bergantung pada nama dan status aktif produk
+
+def _trigram_inputs(product):
+    return (product.__dict__.get('name'), product.__dict__.get('is_active'))
+
+
+@receiver(post_init, sender=Product)
+def remember_product_trigram_state(sender, instance, **kwargs):
+    instance._trigram_state = _trigram_inputs(instance)
+
+
+@receiver(post_save, sender=Product)
+def update_trigrams_on_product_save(sender, instance, created, **kwargs):
+    # Baris trigram produk yang dihapus ikut terhapus (CASCADE)
+    state = _trigram_inputs(instance)
+    if created or None in instance._trigram_state or instance._trigram_state != state:
+        ProductTrigram.refresh_products([instance.pk])
+    instance._trigram_state = state
+
+
+# ==================== PAGE CACHE INVALIDATION ====================
+
+@receiver([post_save, post_delete], sender=Category)
+@receiver(post_delete, sender=Product)
+@receiver([post_save, post_delete], sender=ProductImage)
+def invalidate_catalog_pages(sender, **kwargs):
+    invalidate_tags(CATALOG_TAG)
+
+
+# Field produk yang tampil di home, shop & produk terkait. Stock hanya tampil di
+# halaman produk itu sendiri, jadi pengurangan stock saat checkout tidak
+# membuang cache seluruh katalog
+CATALOG_DISPLAY_FIELDS = ('name', 'slug', 'description', 'price', 'category_id', 'image', 'is_active', 'featured')
+
+
+def _catalog_inputs(product):
+    """Nilai field katalog, atau None jika ada field yang di-defer"""
+    if product.get_deferred_fields() & set(CATALOG_DISPLAY_FIELDS):
+        return None
+    # ImageField: string saat dimuat, FieldFile setelah diakses
+    return tuple(getattr(value, 'name', value) for value in map(product.__dict__.get, CATALOG_DISPLAY_FIELDS))
+
+
+@receiver(post_init, sender=Product)
+def remember_product_catalog_state(sender, instance, **kwargs):
+    instance._catalog_state = _catalog_inputs(instance)
+
+
+@receiver(post_save, sender=Product)
+def invalidate_pages_on_product_save(sender, instance, created, **kwargs):
+    state = _catalog_inputs(instance)
+    if created or instance._catalog_state is None or instance._catalog_state != state:
+        invalidate_tags(CATALOG_TAG)
+    else:
+        invalidate_tags(product_tag(instance.slug))
+    instance._catalog_state = state
+
+
+@receiver([post_save, post_delete], sender=ProductReview)
+def invalidate_product_page(sender, instance, **kwargs):
+    invalidate_tags(product_tag(instance.product.slug))
+
+
+@receiver(user_logged_in)
+def set_page_cache_auth_cookie(sender, request, user, **kwargs):
+    mark_auth_cookie(request, True)
+
+
+@receiver(user_logged_out)
+def clear_page_cache_auth_cookie(sender, request, user, **kwargs):
+    mark_auth_cookie(request, False)
+
+
+# ==================== STATIC CATALOG REBUILD ====================
+# Hanya aktif jika STATIC_CATALOG_AUTO_REBUILD = True (lihat products/static_catalog.py)
+
+@receiver([post_save, post_delete], sender=Category)
+def rebuild_static_catalog_all(sender, **kwargs):
+    schedule_catalog_rebuild(full=True)
+
+
+def _static_catalog_inputs(product):
+    """(field katalog, stok tersedia) atau None jika ada field yang di-defer"""
+    catalog = _catalog_inputs(product)
+    stock = product.__dict__.get('stock')
+    if catalog is None or stock is None:
+        return None
+    return catalog, stock > 0
+
+
+@receiver(post_init, sender=Product)
+def remember_product_static_catalog_state(sender, instance, **kwargs):
+    instance._static_catalog_state = _static_catalog_inputs(instance)
+
+
+@receiver(post_delete, sender=Product)
+def rebuild_static_catalog_product(sender, instance, **kwargs):
+    # Produk lain di kategori yang sama, dan produk yang merekomendasikan produk ini,
+    # menampilkannya sebagai produk terkait (queryset hanya dievaluasi jika auto rebuild aktif)
+    schedule_catalog_rebuild(
+        product_ids=ProductRecommendation.objects.filter(recommended=instance).values_list('product_id', flat=True),
+        category_ids=[instance.category_id],
+        listings=True,
+    )
+
+
+@receiver(post_save, sender=Product)
+def rebuild_static_catalog_on_product_save(sender, instance, created, **kwargs):
+    old, state = instance._static_catalog_state, _static_catalog_inputs(instance)
+    instance._static_catalog_state = state
+    if created or old is None or state is None or old[0] != state[0]:
+        rebuild_static_catalog_product(sender, instance)
+    else:
+        # Hanya stock berubah (checkout): halaman produk ini saja, listing hanya jika
+        # jumlah facet "stok tersedia" berubah
+        schedule_catalog_rebuild(product_ids=[instance.pk], listings=old[1] != state[1])
+
+
+@receiver([post_save, post_delete], sender=ProductImage)
+@receiver([post_save, post_delete], sender=ProductReview)
+def rebuild_static_catalog_product_page(sender, instance, **kwargs):
+    schedule_catalog_rebuild(product_ids=[instance.product_id])
+
+
+# ==================== PARENT TIMESTAMP ====================
+# updated_at induk dipakai sebagai versi untuk ETag/Last-Modified (lihat products/conditional.py)
+
+@receiver([post_save, post_delete], sender=ProductImage)
+def touch_product_on_image_change(sender, instance, **kwargs):
+    Product.objects.filter(pk=instance.product_id).update(updated_at=timezone.now())
+
+
+@receiver([post_save, post_delete], sender=CartItem)
+def touch_cart_on_item_change(sender, instance, **kwargs):
+    Cart.objects.filter(pk=instance.cart_id).update(updated_at=timezone.now())
+
+
 # ==================== PROXY MODELS FOR ADMIN SEPARATION ====================
 
 class AdminUser(User):
@@ -554,4 +1494,72 @@ class CustomerUser(User):
         proxy = True
         verbose_name = "User"
         verbose_name_plural = "User"
-        app_label = 'auth'
\ No newline at end of file
+        app_label = 'auth'
+
+# ==================== SALES ROLLUP MODELS ====================
+# Ringkasan penjualan harian untuk laporan admin, diisi oleh
+# python manage.py refresh_sales_rollups (lihat products/sales_report.py)
+
+class SalesRollupBase(models.Model):
+    date = models.DateField(verbose_name="Tanggal")
+    order_count = models.IntegerField(default=0, verbose_name="Jumlah Pesanan")
+    units = models.IntegerField(default=0, verbose_name="Unit Terjual")
+    revenue = models.DecimalField(max_digits=14, decimal_places=0, default=0, verbose_name="Pendapatan")
+    voucher_discount = models.DecimalField(max_digits=14, decimal_places=0, default=0, verbose_name="Diskon Voucher")
+
+    class Meta:
+        abstract = True
+
+    @property
+    def average_basket(self):
+        return self.revenue / self.order_count if self.order_count else 0
+
+
+class DailySales(SalesRollupBase):
+    """Total penjualan toko per hari (revenue = total pesanan termasuk ongkir)"""
+    shipping_cost = models.DecimalField(max_digits=14, decimal_places=0, default=0, verbose_name="Ongkos Kirim")
+    refreshed_at = models.DateTimeField(auto_now=True, verbose_name="Diperbarui Pada")
+
+    class Meta:
+        verbose_name = "Laporan Penjualan"
+        verbose_name_plural = "Laporan Penjualan"
+        ordering = ['-date']
+        constraints = [
+            models.UniqueConstraint(fields=['date'], name='unique_daily_sales_date'),
+        ]
+
+    def __str__(self):
+        return f"Penjualan {self.date:%d %b %Y}"
+
+
+class DailyProductSales(SalesRollupBase):
+    """Penjualan per produk per hari (revenue = subtotal item, diskon voucher dibagi proporsional)"""
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='daily_sales', verbose_name="Produk")
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='daily_product_sales', verbose_name="Kategori")
+
+    class Meta:
+        verbose_name = "Penjualan Harian Produk"
+        verbose_name_plural = "Penjualan Harian Produk"
+        ordering = ['-date']
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'product'], name='unique_daily_product_sales'),
+        ]
+
+    def __str__(self):
+        return f"{self.product} - {self.date:%d %b %Y}"
+
+
+class DailyCategorySales(SalesRollupBase):
+    """Penjualan per kategori per hari"""
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='daily_sales', verbose_name="Kategori")
+
+    class Meta:
+        verbose_name = "Penjualan Harian Kategori"
+        verbose_name_plural = "Penjualan Harian Kategori"
+        ordering = ['-date']
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'category'], name='unique_daily_category_sales'),
+        ]
+
+    def __str__(self):
+        return f"{self.category} - {self.date:%d %b %Y}"
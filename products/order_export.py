@@ -0,0 +1,246 @@
+# products/order_export.py
+"""
+Export pesanan + item pesanan ke CSV / XLSX secara streaming
+
+Satu baris per item pesanan (kolom pesanan diulang). Data dibaca dengan
+values_list().iterator(chunk_size) sehingga di PostgreSQL memakai server-side
+cursor, dan file ditulis per potongan: memori tetap konstan berapa pun
+jumlah pesanan dalam rentang tanggal.
+
+XLSX ditulis langsung sebagai SpreadsheetML di dalam zip yang di-stream
+(tanpa openpyxl), dengan inline string sehingga tidak perlu shared strings.
+
+Dipakai oleh action admin OrderAdmin dan command `export_orders`.
+"""
+
+import csv
+import re
+import zipfile
+from datetime import datetime, time
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from .models import Order
+
+CHUNK_SIZE = 2000
+
+# (judul kolom, field values_list)
+COLUMNS = [
+    ('Nomor Pesanan', 'order_number'),
+    ('Tanggal', 'created_at'),
+    ('Dibayar Pada', 'paid_at'),
+    ('Status', 'status'),
+    ('Metode Pembayaran', 'payment_method'),
+    ('Metode Pengiriman', 'shipping_method'),
+    ('Username', 'user__username'),
+    ('Email', 'user__email'),
+    ('Nama Penerima', 'shipping_name'),
+    ('Telepon Penerima', 'shipping_phone'),
+    ('Kota/Kabupaten', 'shipping_city'),
+    ('Kecamatan', 'shipping_district'),
+    ('Kode Voucher', 'voucher_code'),
+    ('Subtotal Pesanan', 'subtotal'),
+    ('Ongkos Kirim', 'shipping_cost'),
+    ('Diskon Voucher', 'voucher_discount'),
+    ('Total Pesanan', 'total'),
+    ('Produk', 'items__product_name'),
+    ('Harga Produk', 'items__product_price'),
+    ('Jumlah', 'items__quantity'),
+    ('Subtotal Item', 'items__subtotal'),
+]
+
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+_LABELS = {
+    'status': dict(Order.STATUS_CHOICES),
+    'payment_method': dict(Order.PAYMENT_CHOICES),
+    'shipping_method': dict(Order.SHIPPING_METHODS),
+}
+
+
+# ==================== QUERY ====================
+
+def filter_orders(queryset=None, date_from=None, date_to=None, statuses=None):
+    """Filter pesanan berdasarkan tanggal dibuat (inklusif) dan status"""
+    queryset = Order.objects.all() if queryset is None else queryset
+    if date_from:
+        queryset = queryset.filter(created_at__gte=timezone.make_aware(datetime.combine(date_from, time.min)))
+    if date_to:
+        queryset = queryset.filter(created_at__lte=timezone.make_aware(datetime.combine(date_to, time.max)))
+    if statuses:
+        queryset = queryset.filter(status__in=statuses)
+    return queryset
+
+
+def iter_rows(queryset, chunk_size=CHUNK_SIZE):
+    """Generator baris (list nilai) tanpa memuat seluruh queryset ke memori"""
+    fields = [field for _, field in COLUMNS]
+    label_indexes = [(fields.index(field), labels) for field, labels in _LABELS.items()]
+
+    rows = (
+        queryset
+        # Buang prefetch/select_related dari admin, hanya kolom yang di-export
+        .prefetch_related(None)
+        .select_related(None)
+        .order_by('created_at', 'id', 'items__id')
+        .values_list(*fields)
+        .iterator(chunk_size=chunk_size)
+    )
+    for row in rows:
+        row = list(row)
+        for index, labels in label_indexes:
+            row[index] = labels.get(row[index], row[index])
+        yield row
+
+
+def _format_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return timezone.localtime(value).strftime('%Y-%m-%d %H:%M:%S')
+    return value
+
+
+# ==================== CSV ====================
+
+class _Echo:
+    """File-like yang mengembalikan data yang ditulis (pola streaming CSV Django)"""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(rows):
+    writer = csv.writer(_Echo())
+    # BOM agar Excel membaca UTF-8 dengan benar
+    yield '﻿' + writer.writerow([title for title, _ in COLUMNS])
+    for row in rows:
+        yield writer.writerow([_format_value(value) for value in row])
+
+
+# ==================== XLSX ====================
+
+class _StreamBuffer:
+    """Target zipfile yang tidak bisa di-seek; isi diambil per potongan"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+# Karakter kontrol tidak valid di XML (mis. dari alamat yang di-copy paste)
+_ILLEGAL_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+_XLSX_STATIC_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Pesanan" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+
+def _xlsx_cell(value):
+    value = _format_value(value)
+    if isinstance(value, bool):
+        value = str(value)
+    if isinstance(value, (int, float, Decimal)):
+        return f'<c><v>{value}</v></c>'
+    text = escape(_ILLEGAL_XML_CHARS.sub('', str(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _xlsx_row(values):
+    return '<row>' + ''.join(_xlsx_cell(value) for value in values) + '</row>'
+
+
+def iter_xlsx(rows, rows_per_flush=500):
+    buffer = _StreamBuffer()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in _XLSX_STATIC_PARTS.items():
+            archive.writestr(name, content)
+        yield buffer.drain()
+
+        with archive.open('xl/worksheets/sheet1.xml', 'w') as sheet:
+            sheet.write((
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                '<sheetData>' + _xlsx_row([title for title, _ in COLUMNS])
+            ).encode('utf-8'))
+
+            pending = []
+            for row in rows:
+                pending.append(_xlsx_row(row))
+                if len(pending) >= rows_per_flush:
+                    sheet.write(''.join(pending).encode('utf-8'))
+                    pending = []
+                    yield buffer.drain()
+
+            pending.append('</sheetData></worksheet>')
+            sheet.write(''.join(pending).encode('utf-8'))
+    # Sisa data + central directory zip
+    yield buffer.drain()
+
+
+# ==================== OUTPUT ====================
+
+def iter_export(queryset, file_format, chunk_size=CHUNK_SIZE):
+    """Potongan file (str untuk CSV, bytes untuk XLSX)"""
+    rows = iter_rows(queryset, chunk_size=chunk_size)
+    if file_format == 'xlsx':
+        return iter_xlsx(rows)
+    return iter_csv(rows)
+
+
+def export_filename(file_format):
+    return f'pesanan-{timezone.localtime():%Y%m%d-%H%M%S}.{file_format}'
+
+
+def streaming_export_response(queryset, file_format):
+    response = StreamingHttpResponse(
+        iter_export(queryset, file_format),
+        content_type=CONTENT_TYPES[file_format],
+    )
+    response['Content-Disposition'] = f'attachment; filename="{export_filename(file_format)}"'
+    response['Cache-Control'] = 'no-store'
+    return response
@@ -0,0 +1,329 @@
+# products/order_status.py
+"""
+State machine status pesanan
+
+Semua perubahan status (action admin, pembatalan oleh customer, Midtrans)
+lewat transition_orders() yang bekerja per himpunan, bukan per baris:
+
+- transisi divalidasi terhadap TRANSITIONS; pesanan yang tidak valid dilewati
+- UPDATE status dikelompokkan per (status tujuan), pickup yang dibayar
+  langsung menjadi ready_for_pickup (sama seperti Order.save)
+- stock produk dari pesanan yang dibatalkan dikembalikan dengan satu
+  UPDATE ... SET stock = stock + n per produk
+- DashboardStats disesuaikan dengan satu delta, index PurchasedProduct dan
+  AccountSummary diperbarui untuk pesanan yang masuk/keluar status dibayar
+- riwayat dicatat ke OrderStatusLog dengan bulk_create; baris yang perlu
+  diberitahukan ke customer menjadi antrian email yang dikirim per batch oleh
+  `python manage.py send_order_notifications` (cron/worker) atau Vercel Cron
+  (/cron/send-order-notifications/), opsional sebagian
+  langsung setelah commit di thread terpisah (ORDER_NOTIFICATION_INLINE_BATCH)
+"""
+
+import threading
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connections, transaction
+from django.db.models import F, Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import (
+    AccountSummary, DashboardStats, Order, OrderItem, OrderStatusLog, Product, ProductFacet, PurchasedProduct,
+    order_stats_contribution,
+)
+from .page_cache import invalidate_tags, product_tag
+from .static_catalog import schedule_catalog_rebuild
+
+# Status asal -> status tujuan yang diizinkan
+TRANSITIONS = {
+    'pending': {'paid', 'cancelled'},
+    'paid': {'processing', 'shipped', 'delivered', 'ready_for_pickup', 'cancelled'},
+    'processing': {'shipped', 'delivered', 'ready_for_pickup', 'cancelled'},
+    'ready_for_pickup': {'delivered', 'cancelled'},
+    'shipped': {'delivered'},
+    'delivered': set(),
+    'cancelled': set(),
+}
+
+# Status yang diberitahukan ke customer lewat email
+NOTIFY_STATUSES = {'paid', 'processing', 'shipped', 'ready_for_pickup', 'delivered', 'cancelled'}
+
+# Stock dikurangi saat checkout, jadi dikembalikan saat pesanan dibatalkan
+STOCK_RESTORE_STATUS = 'cancelled'
+
+ID_BATCH_SIZE = 500
+
+
+def _chunks(items, size=ID_BATCH_SIZE):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def resolve_target(status, shipping_method):
+    """Status tujuan efektif: pesanan pickup yang dibayar langsung siap diambil"""
+    if status == 'paid' and shipping_method == 'pickup':
+        return 'ready_for_pickup'
+    return status
+
+
+def can_transition(from_status, to_status):
+    return to_status in TRANSITIONS.get(from_status, set())
+
+
+# ==================== TRANSITION ====================
+
+def transition_orders(queryset, new_status, source='system', changed_by=None, note=''):
+    """
+    Ubah status semua pesanan di queryset ke new_status
+
+    Return dict:
+        updated: jumlah pesanan yang berubah
+        skipped: jumlah pesanan yang dilewati (sudah di status tujuan / transisi tidak valid)
+        by_status: {status tujuan: jumlah}
+        restocked: {product_id: unit dikembalikan}
+    """
+    if new_status not in TRANSITIONS:
+        raise ValueError(f'Status tidak dikenal: {new_status}')
+
+    now = timezone.now()
+    result = {'updated': 0, 'skipped': 0, 'by_status': {}, 'restocked': {}}
+
+    with transaction.atomic():
+        rows = list(
+            queryset.order_by().select_for_update()
+            .values_list('id', 'user_id', 'status', 'shipping_method', 'total')
+        )
+
+        # (status asal, status tujuan) -> [id]; sekaligus hitung delta DashboardStats
+        groups = defaultdict(list)
+        stats_delta = defaultdict(int)
+        users = {}
+        for order_id, user_id, status, shipping_method, total in rows:
+            # Validasi memakai status yang diminta, yang disimpan bisa berbeda (pickup)
+            target = resolve_target(new_status, shipping_method)
+            if target == status or not can_transition(status, new_status):
+                result['skipped'] += 1
+                continue
+            groups[(status, target)].append(order_id)
+            users[order_id] = user_id
+            old = order_stats_contribution(status, total)
+            new = order_stats_contribution(target, total)
+            for field in new:
+                stats_delta[field] += new[field] - old[field]
+
+        if not groups:
+            return result
+
+        by_target = defaultdict(list)
+        for (status, target), ids in groups.items():
+            by_target[target].extend(ids)
+
+        for target, ids in by_target.items():
+            fields = {'status': target, 'updated_at': now}
+            if target in ('paid', 'ready_for_pickup'):
+                fields['paid_at'] = Coalesce(F('paid_at'), now)
+            for batch in _chunks(ids):
+                Order.objects.filter(id__in=batch).update(**fields)
+            result['by_status'][target] = len(ids)
+            result['updated'] += len(ids)
+
+        if STOCK_RESTORE_STATUS in by_target:
+            result['restocked'] = _restore_stock(by_target[STOCK_RESTORE_STATUS], now)
+
+        DashboardStats.apply_delta(**stats_delta)
+
+        # Index pembelian hanya berubah jika pesanan masuk/keluar status dibayar
+        purchase_changed = [
+            order_id
+            for (status, target), ids in groups.items()
+            if (status in Order.SALES_STATUSES) != (target in Order.SALES_STATUSES)
+            for order_id in ids
+        ]
+        if purchase_changed:
+            PurchasedProduct.refresh_for_orders(purchase_changed)
+            AccountSummary.refresh_users(users[order_id] for order_id in purchase_changed)
+
+        OrderStatusLog.objects.bulk_create(
+            [
+                OrderStatusLog(
+                    order_id=order_id,
+                    from_status=status,
+                    to_status=target,
+                    source=source,
+                    changed_by=changed_by,
+                    note=note,
+                    notify=target in NOTIFY_STATUSES,
+                )
+                for (status, target), ids in groups.items()
+                for order_id in ids
+            ],
+            batch_size=ID_BATCH_SIZE,
+        )
+
+        if any(target in NOTIFY_STATUSES for target in by_target):
+            transaction.on_commit(_send_notifications_after_commit)
+
+    return result
+
+
+def transition_order(order, new_status, source='system', changed_by=None, note=''):
+    """
+    Transisi satu pesanan; instance `order` ikut diperbarui
+    Return True jika status berubah
+    """
+    result = transition_orders(
+        Order.objects.filter(pk=order.pk), new_status,
+        source=source, changed_by=changed_by, note=note,
+    )
+    if result['updated']:
+        order.refresh_from_db(fields=['status', 'paid_at', 'updated_at'])
+        # Status baru sudah dihitung di DashboardStats oleh transition_orders
+        order._stats_state = (order.status, order.total)
+        order._account_state = (order.status, order.total)
+    return bool(result['updated'])
+
+
+def _restore_stock(order_ids, now):
+    """Satu UPDATE per produk untuk total unit dari semua pesanan yang dibatalkan"""
+    quantities = defaultdict(int)
+    for batch in _chunks(order_ids):
+        rows = (
+            OrderItem.objects.filter(order_id__in=batch)
+            .values('product_id')
+            .annotate(quantity=Sum('quantity'))
+            .order_by()
+        )
+        for row in rows:
+            quantities[row['product_id']] += row['quantity']
+
+    for product_id, quantity in quantities.items():
+        Product.objects.filter(pk=product_id).update(stock=F('stock') + quantity, updated_at=now)
+
+    if quantities:
+        # update() tidak memicu signal; stock hanya tampil di halaman produk itu sendiri
+        slugs = Product.objects.filter(pk__in=quantities).values_list('slug', flat=True)
+        invalidate_tags(*(product_tag(slug) for slug in slugs))
+        schedule_catalog_rebuild(product_ids=quantities.keys(), listings=True)
+        ProductFacet.refresh_products(quantities.keys())
+    return dict(quantities)
+
+
+# ==================== NOTIFICATIONS ====================
+
+STATUS_MESSAGES = {
+    'paid': 'Pembayaran untuk pesanan Anda telah kami terima dan akan segera diproses.',
+    'processing': 'Pesanan Anda sedang kami proses.',
+    'shipped': 'Pesanan Anda telah dikirim dan sedang dalam perjalanan.',
+    'ready_for_pickup': 'Pesanan Anda sudah siap diambil di toko.',
+    'delivered': 'Pesanan Anda telah diterima. Terima kasih telah berbelanja di MancingMo!',
+    'cancelled': 'Pesanan Anda telah dibatalkan.',
+}
+
+
+def _build_message(log):
+    order = log.order
+    status_label = dict(Order.STATUS_CHOICES).get(log.to_status, log.to_status)
+    return EmailMessage(
+        subject=f'Pesanan {order.order_number} - {status_label}',
+        body=f'''
+Halo {order.shipping_name},
+
+{STATUS_MESSAGES.get(log.to_status, '')}
+
+Nomor Pesanan: {order.order_number}
+Status: {status_label}
+Total: Rp {order.total:,.0f}
+
+Salam,
+Tim MancingMo
+        ''',
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[order.user.email],
+    )
+
+
+def _claim_notifications(limit):
+    """
+    Klaim antrian dalam transaksi singkat sebelum SMTP dipanggil, sehingga lock
+    baris (dan write lock SQLite) tidak ditahan selama kirim email. Klaim yang
+    lebih lama dari ORDER_NOTIFICATION_CLAIM_TIMEOUT (proses mati sebelum
+    selesai) diambil lagi.
+    """
+    now = timezone.now()
+    expired = now - timedelta(seconds=getattr(settings, 'ORDER_NOTIFICATION_CLAIM_TIMEOUT', 15 * 60))
+    with transaction.atomic():
+        ids = list(
+            OrderStatusLog.objects
+            .filter(notify=True, notified_at__isnull=True)
+            .filter(Q(claimed_at__isnull=True) | Q(claimed_at__lt=expired))
+            .select_for_update(skip_locked=True)
+            .order_by('id')
+            .values_list('id', flat=True)[:limit]
+        )
+        if ids:
+            OrderStatusLog.objects.filter(id__in=ids).update(claimed_at=now)
+    return ids
+
+
+def send_pending_notifications(limit=100):
+    """
+    Kirim email antrian OrderStatusLog lewat satu koneksi SMTP, di luar transaksi
+    Email yang gagal dikembalikan ke antrian (klaim dilepas)
+    Return jumlah antrian yang selesai diproses (customer tanpa email ikut ditandai)
+    """
+    ids = _claim_notifications(limit)
+    if not ids:
+        return 0
+
+    logs = OrderStatusLog.objects.filter(id__in=ids).select_related('order', 'order__user').order_by('id')
+    messages = [(log.id, _build_message(log)) for log in logs if log.order.user.email]
+
+    failed = []
+    if messages:
+        connection = get_connection(fail_silently=False)
+        try:
+            connection.open()
+        except Exception as e:
+            failed = [log_id for log_id, _ in messages]
+            print(f"❌ Gagal membuka koneksi email: {str(e)}")
+        else:
+            try:
+                for log_id, message in messages:
+                    try:
+                        connection.send_messages([message])
+                    except Exception as e:
+                        failed.append(log_id)
+                        print(f"❌ Gagal mengirim notifikasi pesanan (log {log_id}): {str(e)}")
+            finally:
+                connection.close()
+
+    failed_ids = set(failed)
+    sent = [log_id for log_id in ids if log_id not in failed_ids]
+    OrderStatusLog.objects.filter(id__in=sent).update(notified_at=timezone.now())
+    if failed:
+        # Dikirim ulang oleh batch berikutnya / send_order_notifications
+        OrderStatusLog.objects.filter(id__in=failed).update(claimed_at=None)
+    return len(sent)
+
+
+def _send_inline_batch(limit):
+    try:
+        send_pending_notifications(limit=limit)
+    except Exception as e:
+        # Antrian tetap tersimpan, dikirim ulang oleh send_order_notifications
+        print(f"❌ Gagal mengirim notifikasi pesanan: {str(e)}")
+    finally:
+        connections.close_all()
+
+
+def _send_notifications_after_commit():
+    limit = getattr(settings, 'ORDER_NOTIFICATION_INLINE_BATCH', 0)
+    if not limit:
+        return
+    # Thread terpisah: request yang commit (admin, webhook Midtrans, view async lewat
+    # sync_to_async) tidak menunggu SMTP
+    threading.Thread(target=_send_inline_batch, args=(limit,), daemon=True).start()
@@ -0,0 +1,238 @@
+# products/page_cache.py
+"""
+Cache halaman penuh untuk halaman katalog (home, shop, detail produk, about)
+
+- HTML yang di-cache tidak bergantung pada user: bagian header yang personal
+  (badge keranjang, menu user) dimuat lewat endpoint JSON `header_status`
+- Invalidasi berbasis tag: setiap halaman mencatat versi tag yang dipakainya
+  di cache key, sehingga menaikkan versi tag (lewat signal model) otomatis
+  membuat semua halaman terkait menjadi miss tanpa perlu menghapus satu per satu
+- Response untuk pengunjung anonim diberi Cache-Control public agar bisa
+  disimpan CDN, dengan Vary: Cookie
+"""
+
+import hashlib
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.decorators import sync_and_async_middleware
+
+from .db_router import replica_aliases, use_primary
+
+PAGE_KEY_PREFIX = 'pagecache:page'
+TAG_KEY_PREFIX = 'pagecache:tag'
+
+# Tag yang dipakai halaman katalog
+CATALOG_TAG = 'catalog'
+# Jumlah facet shop (berubah juga karena review, lihat products/facets.py)
+FACET_TAG = 'facets'
+# Rekomendasi "sering dibeli bersamaan" di halaman produk (products/recommendations.py)
+RECOMMENDATION_TAG = 'recommendations'
+
+
+def product_tag(slug):
+    return f'product:{slug}'
+
+
+def product_page_tags(slug):
+    """Tag halaman detail produk (cache halaman & ETag di products/conditional.py)"""
+    return [CATALOG_TAG, RECOMMENDATION_TAG, product_tag(slug)]
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+# ==================== TAG VERSION ====================
+
+def get_tag_versions(tags):
+    """Versi terkini setiap tag; tag baru diinisialisasi dengan timestamp"""
+    keys = [f'{TAG_KEY_PREFIX}:{tag}' for tag in tags]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), None)
+            versions[key] = cache.get(key)
+    return [str(versions[key]) for key in keys]
+
+
+def invalidate_tags(*tags):
+    """Naikkan versi tag sehingga semua halaman yang memakainya menjadi basi"""
+    if not tags:
+        return
+    version = time.time_ns()
+    cache.set_many({f'{TAG_KEY_PREFIX}:{tag}': version for tag in tags}, None)
+
+
+# ==================== DECORATOR ====================
+
+def _page_key(request, versions, query_params):
+    params = [
+        (name, sorted(request.GET.getlist(name)))
+        for name in sorted(query_params)
+        if request.GET.get(name)
+    ]
+    raw = '|'.join([
+        request.path,
+        repr(params),
+        ','.join(versions),
+    ])
+    return f'{PAGE_KEY_PREFIX}:{hashlib.md5(raw.encode("utf-8")).hexdigest()}'
+
+
+def is_cacheable_request(request, allow_authenticated=True):
+    if not _setting('PAGE_CACHE_ENABLED', True):
+        return False
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    if not allow_authenticated and request.user.is_authenticated:
+        return False
+    # Flash message harus tampil di halaman berikutnya, jadi render biasa
+    if len(get_messages(request)):
+        return False
+    return True
+
+
+def _is_cacheable_response(request, response):
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+        # Template memanggil {% csrf_token %} -> HTML berisi token milik user ini
+        and not request.META.get('CSRF_COOKIE_NEEDS_UPDATE')
+    )
+
+
+def patch_page_cache_headers(request, response):
+    if request.user.is_authenticated:
+        patch_cache_control(response, private=True, max_age=0)
+    else:
+        patch_cache_control(
+            response,
+            public=True,
+            max_age=_setting('PAGE_CACHE_BROWSER_MAX_AGE', 60),
+            s_maxage=_setting('PAGE_CACHE_CDN_MAX_AGE', 300),
+        )
+    patch_vary_headers(response, ('Cookie',))
+
+
+def _recently_invalidated(versions):
+    """Versi tag adalah timestamp invalidasi (time_ns), bandingkan dengan batas lag replica"""
+    if not replica_aliases():
+        return False
+    max_lag_ns = _setting('DATABASE_REPLICA_MAX_LAG', 5) * 1_000_000_000
+    now = time.time_ns()
+    return any(now - int(version) < max_lag_ns for version in versions)
+
+
+def cache_public_page(tags=(), query_params=(), allow_authenticated=True, timeout=None):
+    """
+    Cache HTML view publik berdasarkan path, query param yang relevan dan versi tag
+
+    tags bisa berupa list atau callable(*args, **kwargs) untuk tag per objek,
+    misalnya tag produk berdasarkan slug. Jika allow_authenticated=False,
+    user login selalu mendapat render biasa (halaman berisi data personal).
+
+    Contoh:
+        @cache_public_page(tags=[CATALOG_TAG], query_params=('search', 'page'))
+        def shop(request): ...
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if not is_cacheable_request(request, allow_authenticated):
+                return view_func(request, *args, **kwargs)
+
+            page_tags = tags(*args, **kwargs) if callable(tags) else tags
+            versions = get_tag_versions(page_tags)
+            key = _page_key(request, versions, query_params)
+            cached = cache.get(key)
+
+            if cached is not None:
+                response = HttpResponse(cached['content'], content_type=cached['content_type'])
+                response['X-Page-Cache'] = 'HIT'
+            else:
+                # Template merender header versi anonim (lihat context processor)
+                request.page_cache = True
+                if _recently_invalidated(versions):
+                    # Replica mungkin belum menerima perubahan yang memicu invalidasi,
+                    # jangan simpan data lama di cache dengan versi tag yang baru
+                    with use_primary():
+                        response = view_func(request, *args, **kwargs)
+                else:
+                    response = view_func(request, *args, **kwargs)
+                if not _is_cacheable_response(request, response):
+                    return response
+                cache.set(key, {
+                    'content': response.content,
+                    'content_type': response['Content-Type'],
+                }, timeout if timeout is not None else _setting('PAGE_CACHE_TIMEOUT', 60 * 15))
+                response['X-Page-Cache'] = 'MISS'
+
+            patch_page_cache_headers(request, response)
+            return response
+        return wrapper
+    return decorator
+
+
+# ==================== CONTEXT PROCESSOR ====================
+
+def page_cache_context(request):
+    """
+    `page_cache` True jika halaman sedang dirender untuk disimpan di cache.
+    Saat itu `user` di template diganti AnonymousUser agar HTML tidak pernah
+    berisi data user; bagian personal dimuat lewat endpoint JSON.
+    """
+    page_cache = getattr(request, 'page_cache', False)
+    context = {
+        'page_cache': page_cache,
+        'page_cache_auth_cookie': _setting('PAGE_CACHE_AUTH_COOKIE', 'mm_auth'),
+    }
+    if page_cache:
+        context['user'] = AnonymousUser()
+    return context
+
+
+# ==================== AUTH COOKIE ====================
+
+@sync_and_async_middleware
+def auth_cookie_middleware(get_response):
+    """
+    Set/hapus cookie penanda login (bukan HttpOnly, tanpa data sensitif)
+    sehingga JS di halaman ter-cache tahu kapan perlu memuat header user
+    Flag di-set oleh signal user_logged_in/user_logged_out
+    """
+    def process_response(request, response):
+        logged_in = getattr(request, '_page_cache_auth', None)
+        name = _setting('PAGE_CACHE_AUTH_COOKIE', 'mm_auth')
+        if logged_in is True:
+            response.set_cookie(
+                name, '1',
+                max_age=settings.SESSION_COOKIE_AGE,
+                secure=settings.SESSION_COOKIE_SECURE,
+                samesite='Lax',
+            )
+        elif logged_in is False and name in request.COOKIES:
+            response.delete_cookie(name, samesite='Lax')
+        return response
+
+    # Versi async agar view async di ASGI tidak dipaksa berjalan di thread
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            return process_response(request, await get_response(request))
+    else:
+        def middleware(request):
+            return process_response(request, get_response(request))
+    return middleware
+
+
+def mark_auth_cookie(request, logged_in):
+    if request is not None:
+        request._page_cache_auth = logged_in
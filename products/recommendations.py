@@ -0,0 +1,149 @@
+# products/recommendations.py
+"""
+Rekomendasi "sering dibeli bersamaan" untuk halaman produk
+
+build_recommendations() dijalankan offline (python manage.py build_recommendations):
+- membaca pasangan (pesanan, produk) dari OrderItem pesanan terjual
+  (Order.SALES_STATUSES) secara streaming, terurut per pesanan
+- menghitung co-occurrence produk secara sparse: hanya pasangan yang pernah
+  dibeli bersamaan yang disimpan, dengan kunci int terpaket (a << 32 | b)
+  dan array jumlah pembelian per produk
+- skor pasangan = co / sqrt(beli_a * beli_b) (cosine), sehingga produk
+  yang sangat laris tidak muncul sebagai tetangga semua produk
+- top-k tetangga per produk disimpan di tabel ProductRecommendation
+
+get_related_products() dipakai view product_detail: satu query ber-index
+(product, rank); jika belum ada data, dilengkapi produk satu kategori.
+"""
+
+import heapq
+import math
+from array import array
+from itertools import combinations, groupby
+
+from django.db import transaction
+
+from .models import Order, OrderItem, Product, ProductRecommendation
+from .page_cache import RECOMMENDATION_TAG, invalidate_tags
+from .static_catalog import schedule_catalog_rebuild
+
+DEFAULT_TOP_K = 8
+# Pesanan dengan produk lebih banyak dari ini dilewati (pesanan grosir
+# menambah pasangan secara kuadratik tanpa banyak sinyal)
+MAX_BASKET_SIZE = 50
+CHUNK_SIZE = 5000
+BATCH_SIZE = 1000
+
+
+def _baskets():
+    """Himpunan produk aktif per pesanan terjual, satu pesanan per iterasi"""
+    rows = (
+        OrderItem.objects.filter(order__status__in=Order.SALES_STATUSES, product__is_active=True)
+        .values_list('order_id', 'product_id')
+        .order_by('order_id')
+        .distinct()
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+    for _, items in groupby(rows, key=lambda row: row[0]):
+        yield [product_id for _, product_id in items]
+
+
+def compute_recommendations(top_k=DEFAULT_TOP_K, min_count=1, max_basket_size=MAX_BASKET_SIZE):
+    """
+    Return (rekomendasi, statistik)
+    rekomendasi = {product_id: [(recommended_id, skor, jumlah dibeli bersamaan), ...]}
+    """
+    index = {}                  # product_id -> indeks padat
+    product_ids = array('q')    # indeks padat -> product_id
+    purchases = array('L')      # jumlah pesanan per produk
+    pairs = {}                  # (a << 32 | b), a < b -> jumlah pesanan berisi keduanya
+    stats = {'orders': 0, 'skipped_orders': 0}
+
+    for basket in _baskets():
+        if len(basket) > max_basket_size:
+            stats['skipped_orders'] += 1
+            continue
+        stats['orders'] += 1
+
+        dense = []
+        for product_id in basket:
+            position = index.get(product_id)
+            if position is None:
+                position = index[product_id] = len(product_ids)
+                product_ids.append(product_id)
+                purchases.append(0)
+            purchases[position] += 1
+            dense.append(position)
+
+        dense.sort()
+        for a, b in combinations(dense, 2):
+            key = a << 32 | b
+            pairs[key] = pairs.get(key, 0) + 1
+
+    # Top-k per produk dengan min-heap berukuran k
+    heaps = {}
+    for key, count in pairs.items():
+        if count < min_count:
+            continue
+        a, b = key >> 32, key & 0xFFFFFFFF
+        score = count / math.sqrt(purchases[a] * purchases[b])
+        for source, target in ((a, b), (b, a)):
+            heap = heaps.setdefault(source, [])
+            item = (score, count, -product_ids[target])
+            if len(heap) < top_k:
+                heapq.heappush(heap, item)
+            elif item > heap[0]:
+                heapq.heapreplace(heap, item)
+
+    recommendations = {
+        product_ids[source]: [(-negative_id, score, count) for score, count, negative_id in sorted(heap, reverse=True)]
+        for source, heap in heaps.items()
+    }
+    stats.update(products=len(product_ids), pairs=len(pairs), recommended_products=len(recommendations))
+    return recommendations, stats
+
+
+def build_recommendations(top_k=DEFAULT_TOP_K, min_count=1, max_basket_size=MAX_BASKET_SIZE):
+    """Hitung ulang dan ganti seluruh isi ProductRecommendation; return statistik"""
+    recommendations, stats = compute_recommendations(top_k, min_count, max_basket_size)
+    rows = [
+        ProductRecommendation(
+            product_id=product_id,
+            recommended_id=recommended_id,
+            rank=rank,
+            score=score,
+            co_purchases=count,
+        )
+        for product_id, neighbours in recommendations.items()
+        for rank, (recommended_id, score, count) in enumerate(neighbours)
+    ]
+
+    with transaction.atomic():
+        ProductRecommendation.objects.all().delete()
+        ProductRecommendation.objects.bulk_create(rows, batch_size=BATCH_SIZE)
+        invalidate_tags(RECOMMENDATION_TAG)
+        schedule_catalog_rebuild(full=True)
+
+    stats['rows'] = len(rows)
+    return stats
+
+
+def get_related_products(product, limit=4):
+    """
+    Return (produk terkait, dari_riwayat_pembelian)
+    Tetangga dari ProductRecommendation lebih dulu, sisanya produk satu kategori
+    """
+    related = list(
+        Product.objects.filter(recommended_by__product=product, is_active=True)
+        .select_related('category')
+        .order_by('recommended_by__rank')[:limit]
+    )
+    from_purchases = bool(related)
+
+    if len(related) < limit:
+        related += list(
+            Product.objects.filter(category_id=product.category_id, is_active=True)
+            .exclude(id__in=[product.id, *(item.id for item in related)])
+            .select_related('category')[:limit - len(related)]
+        )
+    return related, from_purchases
@@ -0,0 +1,91 @@
+# products/reviews.py
+"""
+Pagination review produk berbasis cursor (keyset)
+
+Setiap urutan punya index komposit di ProductReview sehingga halaman ke-N
+sama murahnya dengan halaman pertama: query memakai WHERE (kolom urut) <
+(nilai terakhir) alih-alih OFFSET. Cursor adalah nilai kolom urut baris
+terakhir, di-encode base64 agar aman dipakai di URL.
+"""
+
+import base64
+import json
+from datetime import datetime
+
+from django.db.models import Q
+
+PAGE_SIZE = 5
+
+# nama -> (label, filter tambahan, urutan [(field, descending)])
+REVIEW_SORTS = {
+    'newest': ('Terbaru', {}, [('created_at', True), ('id', True)]),
+    'highest': ('Rating Tertinggi', {}, [('rating', True), ('created_at', True), ('id', True)]),
+    'lowest': ('Rating Terendah', {}, [('rating', False), ('created_at', True), ('id', True)]),
+    'verified': ('Pembelian Terverifikasi', {'is_verified_purchase': True}, [('created_at', True), ('id', True)]),
+}
+DEFAULT_SORT = 'newest'
+
+
+def sort_choices():
+    return [(name, label) for name, (label, _, _) in REVIEW_SORTS.items()]
+
+
+def _encode_cursor(values):
+    raw = json.dumps([value.isoformat() if isinstance(value, datetime) else value for value in values])
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def _decode_cursor(cursor, ordering):
+    """Return list nilai cursor atau None jika cursor tidak valid"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(ordering):
+            return None
+        return [
+            datetime.fromisoformat(value) if field == 'created_at' else int(value)
+            for (field, _), value in zip(ordering, values)
+        ]
+    except (ValueError, TypeError):
+        return None
+
+
+def _after(ordering, values):
+    """
+    Baris setelah cursor untuk urutan multi-kolom:
+    (a > x) OR (a = x AND b > y) OR (a = x AND b = y AND c > z) ...
+    """
+    condition = Q(pk__in=[])
+    equal = Q()
+    for (field, descending), value in zip(ordering, values):
+        lookup = 'lt' if descending else 'gt'
+        condition |= equal & Q(**{f'{field}__{lookup}': value})
+        equal &= Q(**{field: value})
+    return condition
+
+
+def get_review_page(product, sort=DEFAULT_SORT, cursor=None, page_size=PAGE_SIZE):
+    """
+    Return (list review, cursor halaman berikutnya atau None)
+    Cursor yang tidak valid diperlakukan sebagai halaman pertama
+    """
+    if sort not in REVIEW_SORTS:
+        sort = DEFAULT_SORT
+    _, filters, ordering = REVIEW_SORTS[sort]
+
+    reviews = product.reviews.filter(**filters).select_related('user', 'user__profile')
+    if cursor:
+        values = _decode_cursor(cursor, ordering)
+        if values is not None:
+            reviews = reviews.filter(_after(ordering, values))
+
+    reviews = list(reviews.order_by(*[
+        f'-{field}' if descending else field for field, descending in ordering
+    ])[:page_size + 1])
+
+    next_cursor = None
+    if len(reviews) > page_size:
+        reviews = reviews[:page_size]
+        last = reviews[-1]
+        next_cursor = _encode_cursor([getattr(last, field) for field, _ in ordering])
+    return reviews, next_cursor
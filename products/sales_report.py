@@ -0,0 +1,252 @@
+# products/sales_report.py
+"""
+Rollup penjualan harian dan data untuk halaman laporan admin
+
+- refresh_sales_rollups() menghitung ulang DailySales, DailyProductSales dan
+  DailyCategorySales untuk rentang tanggal tertentu dengan query GROUP BY
+  (set-based), lalu mengganti baris rollup pada rentang itu dalam satu transaksi
+- get_sales_report() hanya membaca tabel rollup (puluhan-ratusan baris),
+  tidak pernah menyentuh Order/OrderItem, sehingga laporan & grafik cepat
+
+Penjualan = pesanan dengan status di Order.SALES_STATUSES, dikelompokkan
+berdasarkan tanggal pesanan dibuat (zona waktu lokal).
+Refresh berkala: python manage.py refresh_sales_rollups --days 7
+"""
+
+import json
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db import transaction
+from django.db.models import Case, Count, F, FloatField, Sum, Value, When
+from django.db.models.functions import Cast, TruncDate, TruncMonth
+from django.utils import timezone
+
+from .models import (
+    DailyCategorySales, DailyProductSales, DailySales, Order, OrderItem
+)
+
+ROLLUP_MODELS = [DailySales, DailyProductSales, DailyCategorySales]
+
+
+def _day_bounds(date_from, date_to):
+    start = timezone.make_aware(datetime.combine(date_from, time.min))
+    end = timezone.make_aware(datetime.combine(date_to + timedelta(days=1), time.min))
+    return start, end
+
+
+def _to_decimal(value):
+    return Decimal(value or 0).quantize(Decimal('1'), rounding=ROUND_HALF_UP)
+
+
+# ==================== REFRESH ====================
+
+def _voucher_share():
+    """Diskon voucher pesanan dibagi ke item sesuai porsi subtotalnya"""
+    return Case(
+        When(
+            order__subtotal__gt=0,
+            then=Cast('subtotal', FloatField()) * Cast('order__voucher_discount', FloatField())
+            / Cast('order__subtotal', FloatField()),
+        ),
+        default=Value(0.0),
+        output_field=FloatField(),
+    )
+
+
+def _item_rows(items, tz, *group_by):
+    return (
+        items
+        .annotate(day=TruncDate('order__created_at', tzinfo=tz))
+        .values('day', *group_by)
+        .annotate(
+            order_count=Count('order_id', distinct=True),
+            total_units=Sum('quantity'),
+            total_revenue=Sum('subtotal'),
+            total_voucher=Sum(_voucher_share()),
+        )
+        .order_by()
+    )
+
+
+def refresh_sales_rollups(date_from, date_to):
+    """
+    Hitung ulang rollup untuk tanggal date_from s/d date_to (inklusif)
+    Return jumlah baris per tabel
+    """
+    tz = timezone.get_current_timezone()
+    start, end = _day_bounds(date_from, date_to)
+
+    orders = Order.objects.filter(
+        status__in=Order.SALES_STATUSES, created_at__gte=start, created_at__lt=end
+    )
+    items = OrderItem.objects.filter(
+        order__status__in=Order.SALES_STATUSES, order__created_at__gte=start, order__created_at__lt=end
+    )
+
+    daily_orders = (
+        orders
+        .annotate(day=TruncDate('created_at', tzinfo=tz))
+        .values('day')
+        .annotate(
+            order_count=Count('id'),
+            total_revenue=Sum('total'),
+            total_shipping=Sum('shipping_cost'),
+            total_voucher=Sum('voucher_discount'),
+        )
+        .order_by()
+    )
+    daily_units = {
+        row['day']: row['units']
+        for row in items.annotate(day=TruncDate('order__created_at', tzinfo=tz))
+        .values('day').annotate(units=Sum('quantity')).order_by()
+    }
+
+    daily = [
+        DailySales(
+            date=row['day'],
+            order_count=row['order_count'],
+            units=daily_units.get(row['day']) or 0,
+            revenue=row['total_revenue'] or 0,
+            shipping_cost=row['total_shipping'] or 0,
+            voucher_discount=row['total_voucher'] or 0,
+        )
+        for row in daily_orders
+    ]
+    products = [
+        DailyProductSales(
+            date=row['day'],
+            product_id=row['product_id'],
+            category_id=row['product__category_id'],
+            order_count=row['order_count'],
+            units=row['total_units'] or 0,
+            revenue=row['total_revenue'] or 0,
+            voucher_discount=_to_decimal(row['total_voucher']),
+        )
+        for row in _item_rows(items, tz, 'product_id', 'product__category_id')
+    ]
+    categories = [
+        DailyCategorySales(
+            date=row['day'],
+            category_id=row['product__category_id'],
+            order_count=row['order_count'],
+            units=row['total_units'] or 0,
+            revenue=row['total_revenue'] or 0,
+            voucher_discount=_to_decimal(row['total_voucher']),
+        )
+        for row in _item_rows(items, tz, 'product__category_id')
+    ]
+
+    with transaction.atomic():
+        for model in ROLLUP_MODELS:
+            model.objects.filter(date__gte=date_from, date__lte=date_to).delete()
+        DailySales.objects.bulk_create(daily, batch_size=500)
+        DailyProductSales.objects.bulk_create(products, batch_size=500)
+        DailyCategorySales.objects.bulk_create(categories, batch_size=500)
+
+    return {
+        'daily': len(daily),
+        'products': len(products),
+        'categories': len(categories),
+    }
+
+
+def first_sale_date():
+    first = Order.objects.filter(status__in=Order.SALES_STATUSES).order_by('created_at').values_list(
+        'created_at', flat=True
+    ).first()
+    return timezone.localtime(first).date() if first else None
+
+
+# ==================== REPORT ====================
+
+def _chart(labels, datasets):
+    return json.dumps({
+        'labels': labels,
+        'datasets': [
+            {'label': label, 'data': [float(value or 0) for value in values]}
+            for label, values in datasets
+        ],
+    })
+
+
+def _ranking(queryset, *group_by, limit=10):
+    rows = (
+        queryset
+        .values(*group_by)
+        .annotate(
+            total_orders=Sum('order_count'),
+            total_units=Sum('units'),
+            total_revenue=Sum('revenue'),
+            total_voucher=Sum('voucher_discount'),
+        )
+        .order_by('-total_revenue')[:limit]
+    )
+    for row in rows:
+        row['average_basket'] = row['total_revenue'] / row['total_orders'] if row['total_orders'] else 0
+    return rows
+
+
+def get_sales_report(days=30, months=12, today=None):
+    """Data laporan untuk `days` hari terakhir + grafik `months` bulan terakhir"""
+    today = today or timezone.localdate()
+    date_from = today - timedelta(days=days - 1)
+    month_from = date(today.year, today.month, 1)
+    for _ in range(months - 1):
+        month_from = (month_from - timedelta(days=1)).replace(day=1)
+
+    period = DailySales.objects.filter(date__gte=date_from, date__lte=today)
+    totals = period.aggregate(
+        orders=Sum('order_count'),
+        units=Sum('units'),
+        revenue=Sum('revenue'),
+        voucher=Sum('voucher_discount'),
+        shipping=Sum('shipping_cost'),
+    )
+    totals = {key: value or 0 for key, value in totals.items()}
+    totals['average_basket'] = totals['revenue'] / totals['orders'] if totals['orders'] else 0
+
+    # Hari tanpa penjualan tetap tampil di grafik sebagai 0
+    by_day = {row['date']: row for row in period.values('date', 'revenue', 'order_count')}
+    days_range = [date_from + timedelta(days=offset) for offset in range(days)]
+    daily_chart = _chart(
+        [day.strftime('%d %b') for day in days_range],
+        [('Pendapatan', [by_day.get(day, {}).get('revenue') for day in days_range])],
+    )
+
+    monthly = {
+        row['month']: row
+        for row in DailySales.objects.filter(date__gte=month_from, date__lte=today)
+        .annotate(month=TruncMonth('date'))
+        .values('month')
+        .annotate(total_revenue=Sum('revenue'), total_orders=Sum('order_count'))
+        .order_by()
+    }
+    months_range = []
+    month = month_from
+    while month <= today:
+        months_range.append(month)
+        month = (month + timedelta(days=32)).replace(day=1)
+    monthly_chart = _chart(
+        [month.strftime('%b %Y') for month in months_range],
+        [
+            ('Pendapatan', [monthly.get(month, {}).get('total_revenue') for month in months_range]),
+        ],
+    )
+
+    return {
+        'date_from': date_from,
+        'date_to': today,
+        'totals': totals,
+        'daily_chart': daily_chart,
+        'monthly_chart': monthly_chart,
+        'top_products': _ranking(
+            DailyProductSales.objects.filter(date__gte=date_from, date__lte=today),
+            'product_id', 'product__name',
+        ),
+        'top_categories': _ranking(
+            DailyCategorySales.objects.filter(date__gte=date_from, date__lte=today),
+            'category_id', 'category__name',
+        ),
+        'last_refreshed': DailySales.objects.order_by('-refreshed_at').values_list('refreshed_at', flat=True).first(),
+    }
@@ -0,0 +1,226 @@
+# products/search_index.py
+"""
+Index prefix di memori untuk autocomplete pencarian (/api/search/suggest/)
+
+Setiap proses menyimpan list terurut berisi kunci "<akhiran nama
+ternormalisasi>\\x00<id entri>" untuk setiap awal kata nama produk aktif dan
+kategori, sehingga "pancing" cocok dengan "Joran Pancing". Di sampingnya ada
+array rank (sudah dihitung saat build) dan list pemilik kunci dengan urutan
+yang sama. Pencarian prefix = dua bisect untuk rentang kunci yang cocok lalu
+heapq.nsmallest pada rank (maksimal SCAN_LIMIT kunci); tidak ada query
+database dan reverse() URL per saran.
+
+Index dibangun saat pertama dipakai, lalu diperbarui dari versi CATALOG_TAG
+(dinaikkan signal Product/Category, lihat page_cache): jika versi berubah,
+hanya produk dengan updated_at berbeda yang dibuang/disisipkan ke index.
+Versi dicek paling sering setiap SEARCH_SUGGEST_RECHECK_SECONDS agar setiap
+ketikan tidak perlu membaca cache (di production cache memakai tabel database).
+"""
+
+import heapq
+import re
+import threading
+import time
+import unicodedata
+from array import array
+from bisect import bisect_left
+
+from django.conf import settings
+from django.urls import reverse
+
+from .models import Category, Product
+from .page_cache import CATALOG_TAG, get_tag_versions
+
+SEPARATOR = '\x00'
+# Lebih besar dari semua karakter kunci (kunci hanya berisi ASCII)
+PREFIX_END = '\x7f'
+
+# Batas kunci yang di-ranking per prefix; prefix pendek (mis. "a") di katalog
+# besar cocok dengan ratusan ribu kunci, ranking cukup dari sebagian awalnya
+SCAN_LIMIT = 1000
+
+# Jumlah hasil per prefix yang diingat sampai index berikutnya diganti
+MEMO_SIZE = 2048
+
+# Lebih dari proporsi ini produk berubah -> bangun ulang penuh
+FULL_REBUILD_RATIO = 0.2
+
+URL_NAMES = {
+    'category': 'shop_category',
+    'product': 'product_detail',
+}
+SLUG_PLACEHOLDER = '__slug__'
+
+_NON_WORD_RE = re.compile(r'[^0-9a-z]+')
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def normalize(text):
+    """Huruf kecil tanpa aksen, selain huruf/angka diganti satu spasi"""
+    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+    return _NON_WORD_RE.sub(' ', text.lower()).strip()
+
+
+def _index_keys(entry_id, entry):
+    """
+    [(kunci, rank)] untuk setiap awal kata label; rank kecil = lebih dulu:
+    kategori, cocok di awal nama, produk unggulan, label pendek
+    """
+    label, kind, _, featured = entry
+    words = normalize(label).split()
+    base = (kind != 'category') << 20 | (not featured) << 18 | min(len(label), 0xFFFF)
+    return [
+        (f'{" ".join(words[position:])}{SEPARATOR}{entry_id}', base | (position > 0) << 19)
+        for position in range(len(words))
+    ]
+
+
+class _Snapshot:
+    """Isi index yang tidak diubah setelah dipasang (dibaca tanpa lock)"""
+
+    def __init__(self, keys, ranks, owners, entries, products, version):
+        self.keys = keys            # list kunci terurut
+        self.ranks = ranks          # array rank, sejajar dengan keys
+        self.owners = owners        # list id entri, sejajar dengan keys
+        self.entries = entries      # id entri -> (label, tipe, slug, featured)
+        self.products = products    # id produk -> updated_at
+        self.version = version
+        self.memo = {}
+        # reverse() ~35 us per panggilan; URL saran dibentuk dari template
+        self.url_templates = {
+            kind: reverse(name, args=[SLUG_PLACEHOLDER]) for kind, name in URL_NAMES.items()
+        }
+
+
+class SuggestIndex:
+    def __init__(self):
+        self._snapshot = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    # ==================== BUILD ====================
+
+    def _category_entries(self):
+        return {
+            f'c{category_id}': (name, 'category', slug, True)
+            for category_id, name, slug in Category.objects.values_list('id', 'name', 'slug')
+        }
+
+    def _product_entries(self, product_ids=None):
+        products = Product.objects.filter(is_active=True)
+        if product_ids is not None:
+            products = products.filter(id__in=product_ids)
+        return {
+            f'p{product_id}': (name, 'product', slug, featured)
+            for product_id, name, slug, featured in products.values_list('id', 'name', 'slug', 'featured')
+        }
+
+    def _build(self, version):
+        products = dict(Product.objects.filter(is_active=True).values_list('id', 'updated_at'))
+        entries = {**self._category_entries(), **self._product_entries()}
+        rows = sorted(
+            (key, rank, entry_id)
+            for entry_id, entry in entries.items()
+            for key, rank in _index_keys(entry_id, entry)
+        )
+        keys = [key for key, _, _ in rows]
+        ranks = array('L', (rank for _, rank, _ in rows))
+        owners = [entry_id for _, _, entry_id in rows]
+        return _Snapshot(keys, ranks, owners, entries, products, version)
+
+    def _update(self, snapshot, version):
+        """Snapshot baru dengan hanya produk yang berubah sejak snapshot lama"""
+        products = dict(Product.objects.filter(is_active=True).values_list('id', 'updated_at'))
+        changed = {pid for pid, updated_at in products.items() if snapshot.products.get(pid) != updated_at}
+        removed = snapshot.products.keys() - products.keys()
+        if len(changed) + len(removed) > FULL_REBUILD_RATIO * max(len(products), 1):
+            return self._build(version)
+
+        entries = dict(snapshot.entries)
+        keys, ranks, owners = list(snapshot.keys), array('L', snapshot.ranks), list(snapshot.owners)
+        # Kategori selalu dibaca ulang (jumlahnya sedikit)
+        old_entries = {entry_id: entry for entry_id, entry in entries.items() if entry[1] == 'category'}
+        old_entries.update((f'p{pid}', entries[f'p{pid}']) for pid in changed | removed if f'p{pid}' in entries)
+        new_entries = {**self._category_entries(), **self._product_entries(changed)}
+
+        for entry_id, entry in old_entries.items():
+            for key, _ in _index_keys(entry_id, entry):
+                index = bisect_left(keys, key)
+                if index < len(keys) and keys[index] == key:
+                    del keys[index], ranks[index], owners[index]
+            del entries[entry_id]
+        for entry_id, entry in new_entries.items():
+            for key, rank in _index_keys(entry_id, entry):
+                index = bisect_left(keys, key)
+                keys.insert(index, key)
+                ranks.insert(index, rank)
+                owners.insert(index, entry_id)
+            entries[entry_id] = entry
+        return _Snapshot(keys, ranks, owners, entries, products, version)
+
+    def snapshot(self):
+        """Snapshot terkini; dibangun/diperbarui jika versi CATALOG_TAG berubah"""
+        snapshot = self._snapshot
+        now = time.monotonic()
+        if snapshot and now - self._checked_at < _setting('SEARCH_SUGGEST_RECHECK_SECONDS', 2):
+            return snapshot
+
+        # Thread lain sedang memperbarui: pakai snapshot lama (kecuali belum ada sama sekali)
+        if not self._lock.acquire(blocking=snapshot is None):
+            return snapshot
+        try:
+            snapshot = self._snapshot
+            version = get_tag_versions([CATALOG_TAG])[0]
+            if snapshot is None:
+                snapshot = self._build(version)
+            elif snapshot.version != version:
+                snapshot = self._update(snapshot, version)
+            self._snapshot = snapshot
+            self._checked_at = time.monotonic()
+        finally:
+            self._lock.release()
+        return snapshot
+
+    def reset(self):
+        with self._lock:
+            self._snapshot = None
+            self._checked_at = 0.0
+
+    # ==================== QUERY ====================
+
+    def suggest(self, query, limit=None):
+        """Maksimal `limit` saran [{'label', 'type', 'url'}] untuk teks yang sedang diketik"""
+        limit = limit or _setting('SEARCH_SUGGEST_LIMIT', 8)
+        prefix = normalize(query)
+        if not prefix:
+            return []
+
+        snapshot = self.snapshot()
+        memo_key = (prefix, limit)
+        if memo_key in snapshot.memo:
+            return snapshot.memo[memo_key]
+
+        keys = snapshot.keys
+        start = bisect_left(keys, prefix)
+        end = min(bisect_left(keys, prefix + PREFIX_END, start), start + SCAN_LIMIT)
+        # Satu entri bisa cocok di beberapa kata; ambil lebih banyak lalu buang duplikat
+        best = heapq.nsmallest(limit * 4, range(start, end), key=snapshot.ranks.__getitem__)
+
+        results = []
+        for entry_id in dict.fromkeys(snapshot.owners[index] for index in best):
+            label, kind, slug, _ = snapshot.entries[entry_id]
+            url = snapshot.url_templates[kind].replace(SLUG_PLACEHOLDER, slug)
+            results.append({'label': label, 'type': kind, 'url': url})
+            if len(results) == limit:
+                break
+
+        if len(snapshot.memo) >= MEMO_SIZE:
+            snapshot.memo.clear()
+        snapshot.memo[memo_key] = results
+        return results
+
+
+suggest_index = SuggestIndex()
@@ -0,0 +1,193 @@
+# products/static_catalog.py
+"""
+Pre-render katalog publik menjadi file HTML statis
+
+Halaman home, shop (semua & per kategori) dan setiap detail produk dirender
+sebagai pengunjung anonim ke STATIC_CATALOG_ROOT dengan struktur yang sama
+seperti URL-nya (mis. product/<slug>/index.html), sehingga bisa disajikan
+langsung oleh web server/CDN. Bagian personal (header, tombol beli, form
+review) dimuat oleh JS lewat endpoint JSON, sama seperti halaman ter-cache.
+
+Build penuh: python manage.py build_static_catalog
+Build incremental: aktifkan STATIC_CATALOG_AUTO_REBUILD, halaman yang
+terpengaruh dirender ulang setelah transaksi commit (lihat signal di models.py).
+
+Hanya URL tanpa query string yang dirender: /shop/?page=2, filter facet,
+dan pencarian selalu harus diteruskan ke Django. Deploy:
+- Vercel: build_files.sh menjalankan build_static_catalog --clean, dan route
+  di vercel.json menyajikan static_catalog/<path>/index.html hanya jika tidak
+  ada query param search/category/page/facet (FILTER_PARAMS) dan cookie
+  flash message; selain itu ke Django. Filesystem Vercel read-only, jadi
+  perubahan katalog baru tampil di halaman statis setelah deploy berikutnya
+  (mis. deploy hook setelah edit produk).
+- Server sendiri (nginx di depan gunicorn, dengan STATIC_CATALOG_AUTO_REBUILD):
+      location ~ ^/(shop/|product/|$) {
+          if ($args) { proxy_pass http://django; }
+          if ($cookie_messages) { proxy_pass http://django; }
+          try_files /static_catalog$uri/index.html @django;
+      }
+"""
+
+import os
+import shutil
+import threading
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.db import transaction
+from django.db.models import Q
+from django.test import RequestFactory
+from django.urls import reverse
+
+PAGE_FILENAME = 'index.html'
+
+_pending = threading.local()
+
+
+def get_catalog_root():
+    return Path(getattr(settings, 'STATIC_CATALOG_ROOT', Path(settings.BASE_DIR) / 'static_catalog'))
+
+
+class StaticCatalogBuilder:
+    """Render halaman katalog ke file"""
+
+    def __init__(self, root=None):
+        self.root = Path(root) if root else get_catalog_root()
+        self.pages = 0
+        self.bytes = 0
+        self.removed = 0
+
+    # ==================== RENDER ====================
+
+    def _render(self, view, path, **kwargs):
+        request = RequestFactory().get(path)
+        request.user = AnonymousUser()
+        request._messages = CookieStorage(request)
+        # Render versi anonim + atribut hydrate (lihat products/page_cache.py)
+        request.page_cache = True
+        response = view(request, **kwargs)
+        if response.status_code != 200:
+            return None
+        return response.content
+
+    def _target(self, path):
+        return self.root / path.strip('/') / PAGE_FILENAME
+
+    def build_page(self, view, path, **kwargs):
+        content = self._render(view, path, **kwargs)
+        if content is None:
+            return False
+
+        target = self._target(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # Tulis ke file sementara lalu rename agar web server tidak pernah membaca file setengah jadi
+        temp = target.with_name(f'.{target.name}.tmp')
+        temp.write_bytes(content)
+        os.replace(temp, target)
+
+        self.pages += 1
+        self.bytes += len(content)
+        return True
+
+    # ==================== PAGES ====================
+
+    def build_listings(self):
+        from products import views
+        from products.models import Category
+
+        self.build_page(views.home, reverse('home'))
+        self.build_page(views.shop, reverse('shop'))
+        for slug in Category.objects.values_list('slug', flat=True):
+            self.build_page(views.shop, reverse('shop_category', args=[slug]), category_slug=slug)
+
+    def build_products(self, products):
+        from products import views
+
+        for slug in products.values_list('slug', flat=True):
+            self.build_page(views.product_detail, reverse('product_detail', args=[slug]), slug=slug)
+
+    def build_all(self):
+        from products.models import Product
+
+        self.build_listings()
+        self.build_products(Product.objects.filter(is_active=True))
+        self.prune()
+
+    def prune(self):
+        """Hapus halaman produk/kategori yang sudah tidak ada atau tidak aktif"""
+        from products.models import Category, Product
+
+        sections = [
+            (reverse('product_detail', args=['x']), set(Product.objects.filter(is_active=True).values_list('slug', flat=True))),
+            (reverse('shop_category', args=['x']), set(Category.objects.values_list('slug', flat=True))),
+        ]
+        for sample_path, valid_slugs in sections:
+            # '/product/x/' -> direktori 'product'
+            directory = self.root / Path(sample_path.strip('/')).parent
+            if not directory.is_dir():
+                continue
+            for entry in directory.iterdir():
+                if entry.is_dir() and entry.name not in valid_slugs:
+                    shutil.rmtree(entry)
+                    self.removed += 1
+
+
+# ==================== INCREMENTAL REBUILD ====================
+
+def _pending_state():
+    state = getattr(_pending, 'state', None)
+    if state is None:
+        state = _pending.state = {
+            'product_ids': set(),
+            'category_ids': set(),
+            'listings': False,
+            'full': False,
+        }
+    return state
+
+
+def schedule_catalog_rebuild(product_ids=(), category_ids=(), listings=False, full=False):
+    """
+    Catat halaman yang perlu dirender ulang dan jalankan setelah transaksi commit
+    Beberapa perubahan dalam satu transaksi digabung menjadi satu rebuild
+    """
+    if not getattr(settings, 'STATIC_CATALOG_AUTO_REBUILD', False):
+        return
+
+    state = _pending_state()
+    state['product_ids'].update(product_ids)
+    state['category_ids'].update(category_ids)
+    state['listings'] = state['listings'] or listings
+    state['full'] = state['full'] or full
+    transaction.on_commit(_run_pending)
+
+
+def _run_pending():
+    state = getattr(_pending, 'state', None)
+    _pending.state = None
+    if not state:
+        return
+
+    from products.models import Product
+
+    builder = StaticCatalogBuilder()
+    try:
+        if state['full']:
+            builder.build_all()
+        else:
+            if state['listings']:
+                builder.build_listings()
+            products = Product.objects.filter(
+                Q(id__in=state['product_ids']) | Q(category_id__in=state['category_ids']),
+                is_active=True,
+            )
+            builder.build_products(products)
+            builder.prune()
+    except Exception as e:
+        # Gagal rebuild tidak boleh menggagalkan request yang menyimpan data
+        print(f"❌ Gagal rebuild static catalog: {str(e)}")
+        return
+
+    print(f"📄 Static catalog diperbarui: {builder.pages} halaman, {builder.removed} dihapus")
@@ -0,0 +1,297 @@
+# products/storage.py
+"""
+Storage untuk static files dengan optimasi gambar saat collectstatic
+
+- PNG dikompres ulang secara lossless (optimize, buang alpha yang tidak terpakai)
+- JPEG dikompres ulang near-lossless (quality tinggi, progressive)
+- Setiap gambar mendapat versi WebP; url() gambar di bundle CSS mendapat
+  image-set() WebP dengan fallback format asli
+- Favicon dibuat dalam beberapa ukuran dari satu gambar sumber
+- CSS/JS digabung per halaman menjadi bundle ter-minify (lihat products/assets.py)
+- Hasil dicatat di manifest agar template tag tahu varian mana yang tersedia
+"""
+
+import hashlib
+import io
+import json
+import os
+import posixpath
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import StaticFilesStorage, staticfiles_storage
+from django.core.files.base import ContentFile
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+IMAGE_MANIFEST_NAME = 'images.json'
+IMAGE_MANIFEST_VERSION = 1
+BUNDLE_MANIFEST_NAME = 'bundles.json'
+
+# (nama file, ukuran) untuk set favicon/icon
+FAVICON_PNG_SIZES = [
+    ('favicon-32.png', 32),
+    ('apple-touch-icon.png', 180),
+    ('icon-192.png', 192),
+    ('icon-512.png', 512),
+]
+FAVICON_ICO_SIZES = [(16, 16), (32, 32), (48, 48)]
+
+
+def _digest(data):
+    return hashlib.md5(data).hexdigest()
+
+
+class OptimizedStaticFilesStorage(StaticFilesStorage):
+    """
+    StaticFilesStorage yang mengoptimasi gambar dan membangun bundle CSS/JS
+    di tahap post-processing collectstatic
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.jpeg_quality = getattr(settings, 'STATIC_IMAGE_JPEG_QUALITY', 85)
+        self.webp_quality = getattr(settings, 'STATIC_IMAGE_WEBP_QUALITY', 82)
+        self.max_dimension = getattr(settings, 'STATIC_IMAGE_MAX_DIMENSION', 1600)
+        self.favicon_source = getattr(settings, 'STATIC_FAVICON_SOURCE', None)
+        self.favicon_dir = getattr(settings, 'STATIC_FAVICON_DIR', 'image/favicon')
+
+    # ==================== MANIFEST ====================
+
+    def load_image_manifest(self):
+        if not self.exists(IMAGE_MANIFEST_NAME):
+            return {'version': IMAGE_MANIFEST_VERSION, 'images': {}, 'favicons': {}}
+        with self.open(IMAGE_MANIFEST_NAME) as manifest:
+            try:
+                data = json.loads(manifest.read().decode('utf-8'))
+            except ValueError:
+                data = {}
+        if data.get('version') != IMAGE_MANIFEST_VERSION:
+            return {'version': IMAGE_MANIFEST_VERSION, 'images': {}, 'favicons': {}}
+        return data
+
+    def save_image_manifest(self, manifest):
+        self._write(IMAGE_MANIFEST_NAME, json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8'))
+
+    def load_bundle_manifest(self):
+        if not self.exists(BUNDLE_MANIFEST_NAME):
+            return {}
+        with self.open(BUNDLE_MANIFEST_NAME) as manifest:
+            try:
+                return json.loads(manifest.read().decode('utf-8'))
+            except ValueError:
+                return {}
+
+    def _write(self, name, data):
+        if self.exists(name):
+            self.delete(name)
+        self.save(name, ContentFile(data))
+
+    # ==================== POST PROCESS ====================
+
+    def post_process(self, paths, dry_run=False, **options):
+        if dry_run:
+            return
+        yield from self._optimize_images(paths)
+        yield from self._build_bundles()
+
+    def _optimize_images(self, paths):
+        from PIL import Image
+
+        manifest = self.load_image_manifest()
+        images = manifest['images']
+        original_total = 0
+        optimized_total = 0
+
+        for name in sorted(paths):
+            if not name.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+
+            with self.open(name) as source:
+                data = source.read()
+
+            entry = images.get(name)
+            if entry and entry.get('digest') == _digest(data):
+                # Sudah dioptimasi pada collectstatic sebelumnya
+                continue
+
+            try:
+                optimized, webp = self._optimize_image(Image, name, data)
+            except Exception as e:
+                yield name, None, e
+                return
+
+            if len(optimized) < len(data):
+                self._write(name, optimized)
+            else:
+                optimized = data
+
+            webp_name = os.path.splitext(name)[0] + '.webp'
+            self._write(webp_name, webp)
+
+            images[name] = {
+                'digest': _digest(optimized),
+                'original_size': len(data),
+                'size': len(optimized),
+                'webp': webp_name,
+                'webp_size': len(webp),
+            }
+            original_total += len(data)
+            # Hanya file di URL aslinya; WebP dihitung jika benar-benar dirujuk (lihat _build_bundles)
+            optimized_total += len(optimized)
+            yield name, name, True
+
+        if self.favicon_source and self.favicon_source in images:
+            if manifest.get('favicon_digest') != images[self.favicon_source]['digest']:
+                manifest['favicons'] = self._build_favicons(Image, self.favicon_source)
+                manifest['favicon_digest'] = images[self.favicon_source]['digest']
+
+        self.save_image_manifest(manifest)
+        get_image_manifest.cache_clear()
+
+        if original_total:
+            saved = original_total - optimized_total
+            print(
+                f"🖼️  Optimasi gambar: {original_total / 1024:,.0f} KB → "
+                f"{optimized_total / 1024:,.0f} KB (hemat {saved / 1024:,.0f} KB)"
+            )
+
+    def _css_webp_resolver(self, path, images, referenced):
+        """webp_url_for() untuk add_webp_image_set: url() di file CSS `path` -> url WebP"""
+        def webp_url_for(url):
+            # Spasi di url() bisa di-escape: bg\ hero.png
+            name = url.replace('\\', '')
+            if name.startswith(('data:', 'http:', 'https:', '//')):
+                return None
+            if name.startswith(settings.STATIC_URL):
+                name = name[len(settings.STATIC_URL):]
+            else:
+                name = posixpath.normpath(posixpath.join(posixpath.dirname(path), name))
+            entry = images.get(name)
+            if not entry or not entry.get('webp'):
+                return None
+            referenced[name] = entry
+            return os.path.splitext(url)[0] + '.webp'
+        return webp_url_for
+
+    def _build_bundles(self):
+        from products.assets import BUNDLE_KINDS, add_webp_image_set, build_bundle, get_bundles
+
+        manifest = {}
+        original_total = 0
+        bundled_total = 0
+        images = self.load_image_manifest()['images']
+        webp_images = {}
+
+        for bundle_name, bundle in get_bundles().items():
+            manifest[bundle_name] = {}
+            for kind in BUNDLE_KINDS:
+                sources = []
+                for path in bundle.get(kind, []):
+                    if not self.exists(path):
+                        yield path, None, FileNotFoundError(
+                            f"Bundle '{bundle_name}' membutuhkan file '{path}' yang tidak ditemukan"
+                        )
+                        return
+                    with self.open(path) as source:
+                        content = source.read().decode('utf-8')
+                    if kind == 'css':
+                        # Background gambar memakai WebP di browser yang mendukung
+                        content = add_webp_image_set(content, self._css_webp_resolver(path, images, webp_images))
+                    sources.append(content)
+                if not sources:
+                    continue
+
+                name, content = build_bundle(bundle_name, kind, sources)
+                if not self.exists(name):
+                    self._write(name, content)
+                manifest[bundle_name][kind] = name
+                original_total += sum(len(source.encode('utf-8')) for source in sources)
+                bundled_total += len(content)
+                yield name, name, True
+
+        self._write(BUNDLE_MANIFEST_NAME, json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8'))
+        get_bundle_manifest.cache_clear()
+
+        if original_total:
+            print(
+                f"📦 Bundle CSS/JS: {len(manifest)} bundle, "
+                f"{original_total / 1024:,.0f} KB → {bundled_total / 1024:,.0f} KB"
+            )
+        if webp_images:
+            image_total = sum(entry['size'] for entry in webp_images.values())
+            webp_total = sum(entry['webp_size'] for entry in webp_images.values())
+            print(
+                f"🖼️  Background CSS via image-set WebP: {len(webp_images)} gambar, "
+                f"{image_total / 1024:,.0f} KB → {webp_total / 1024:,.0f} KB"
+            )
+
+    def _optimize_image(self, Image, name, data):
+        """Return (bytes format asli yang dioptimasi, bytes WebP)"""
+        image = Image.open(io.BytesIO(data))
+        image.load()
+        image_format = image.format
+
+        if self.max_dimension and max(image.size) > self.max_dimension:
+            image.thumbnail((self.max_dimension, self.max_dimension), Image.LANCZOS)
+
+        # Alpha yang seluruhnya opaque bisa dibuang tanpa kehilangan informasi
+        if image.mode == 'RGBA' and image.getchannel('A').getextrema() == (255, 255):
+            image = image.convert('RGB')
+
+        output = io.BytesIO()
+        if image_format == 'PNG':
+            image.save(output, format='PNG', optimize=True)
+        else:
+            if image.mode not in ('RGB', 'L'):
+                image = image.convert('RGB')
+            image.save(output, format='JPEG', quality=self.jpeg_quality, optimize=True, progressive=True)
+
+        webp_output = io.BytesIO()
+        image.save(webp_output, format='WEBP', quality=self.webp_quality, method=6)
+        return output.getvalue(), webp_output.getvalue()
+
+    def _build_favicons(self, Image, source_name):
+        with self.open(source_name) as source:
+            image = Image.open(io.BytesIO(source.read()))
+            image.load()
+        if image.mode != 'RGBA':
+            image = image.convert('RGBA')
+
+        favicons = {}
+        for filename, size in FAVICON_PNG_SIZES:
+            output = io.BytesIO()
+            image.resize((size, size), Image.LANCZOS).save(output, format='PNG', optimize=True)
+            name = f'{self.favicon_dir}/{filename}'
+            self._write(name, output.getvalue())
+            favicons[filename] = name
+
+        output = io.BytesIO()
+        image.save(output, format='ICO', sizes=FAVICON_ICO_SIZES)
+        name = f'{self.favicon_dir}/favicon.ico'
+        self._write(name, output.getvalue())
+        favicons['favicon.ico'] = name
+        return favicons
+
+
+@lru_cache(maxsize=1)
+def get_image_manifest():
+    """Manifest hasil optimasi gambar (kosong jika collectstatic belum dijalankan)"""
+    load_manifest = getattr(staticfiles_storage, 'load_image_manifest', None)
+    if load_manifest is None:
+        return {'images': {}, 'favicons': {}}
+    try:
+        return load_manifest()
+    except OSError:
+        return {'images': {}, 'favicons': {}}
+
+
+@lru_cache(maxsize=1)
+def get_bundle_manifest():
+    """Manifest bundle CSS/JS (kosong jika collectstatic belum dijalankan)"""
+    load_manifest = getattr(staticfiles_storage, 'load_bundle_manifest', None)
+    if load_manifest is None:
+        return {}
+    try:
+        return load_manifest()
+    except OSError:
+        return {}
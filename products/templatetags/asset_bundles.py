@@ -0,0 +1,26 @@
+# products/templatetags/asset_bundles.py
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html_join
+
+from products.assets import get_bundles
+from products.storage import get_bundle_manifest
+
+register = template.Library()
+
+TAG_FORMATS = {
+    'css': '<link rel="stylesheet" href="{}">',
+    'js': '<script src="{}"></script>',
+}
+
+
+@register.simple_tag
+def bundle(name, kind):
+    """
+    Render bundle CSS/JS ter-minify hasil collectstatic
+    Jika bundle belum dibangun (development), render file sumbernya satu per satu
+    Contoh: {% bundle 'checkout' 'css' %}
+    """
+    built = get_bundle_manifest().get(name, {}).get(kind)
+    paths = [built] if built else get_bundles()[name].get(kind, [])
+    return format_html_join('\n    ', TAG_FORMATS[kind], ((static(path),) for path in paths))
@@ -0,0 +1,70 @@
+# products/templatetags/static_images.py
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+
+from products.storage import get_image_manifest
+
+register = template.Library()
+
+
+def _webp_name(path):
+    entry = get_image_manifest()['images'].get(path)
+    return entry['webp'] if entry else None
+
+
+@register.simple_tag
+def static_webp(path):
+    """
+    URL versi WebP dari static image, fallback ke file asli
+    Contoh: {% static_webp 'image/inspirasi1.png' %}
+    """
+    return static(_webp_name(path) or path)
+
+
+@register.simple_tag
+def picture(path, alt='', **attrs):
+    """
+    Render <picture> dengan sumber WebP dan fallback ke format asli
+    Contoh: {% picture 'image/Rara.jpeg' alt='Arfika' loading='lazy' %}
+    """
+    extra = format_html_join('', ' {}="{}"', attrs.items())
+    img = format_html('<img src="{}" alt="{}"{}>', static(path), alt, extra)
+
+    webp = _webp_name(path)
+    if not webp:
+        return img
+    return format_html(
+        '<picture><source srcset="{}" type="image/webp">{}</picture>',
+        static(webp), img
+    )
+
+
+@register.simple_tag
+def favicon_links(fallback='image/icon mancingmo3.png'):
+    """
+    Render tag <link> untuk set favicon hasil collectstatic
+    Jika belum ada, gunakan gambar fallback
+    """
+    favicons = get_image_manifest().get('favicons') or {}
+    if not favicons:
+        return format_html('<link rel="icon" type="image/png" href="{}">', static(fallback))
+
+    links = [
+        ('icon', 'image/x-icon', '', favicons['favicon.ico']),
+        ('icon', 'image/png', '32x32', favicons['favicon-32.png']),
+        ('icon', 'image/png', '192x192', favicons['icon-192.png']),
+        ('apple-touch-icon', '', '180x180', favicons['apple-touch-icon.png']),
+    ]
+    return format_html_join(
+        '\n    ', '<link rel="{}"{}{} href="{}">',
+        (
+            (
+                rel,
+                format_html(' type="{}"', type_) if type_ else '',
+                format_html(' sizes="{}"', sizes) if sizes else '',
+                static(name),
+            )
+            for rel, type_, sizes, name in links
+        )
+    )
@@ -1,3 +1,100 @@
+from datetime import timedelta
+
+from django.contrib import admin
+from django.contrib.auth.models import Group, Permission, User
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import (
+    Category, Product, ProductImage, Cart, CartItem, Order, OrderItem,
+    ShippingAddress, ContactMessage, ProductReview, EmailVerification,
+    ShippingCost, Voucher
+)
+
+
+# ==================== ADMIN CHANGELIST QUERY COUNT ====================
+
+class AdminChangelistQueryCountTests(TestCase):
+    """Jumlah query setiap changelist admin harus tetap walau jumlah baris bertambah"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.superuser = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        cls.permissions = list(Permission.objects.all()[:3])
+
+    def create_rows(self, start, count):
+        """Buat `count` baris untuk setiap model yang terdaftar di admin"""
+        now = timezone.now()
+        for i in range(start, start + count):
+            category = Category.objects.create(name=f'Kategori {i}', slug=f'kategori-{i}')
+            product = Product.objects.create(
+                name=f'Produk {i}', slug=f'produk-{i}', description='Deskripsi',
+                price=10000 + i, stock=5, category=category, image='products/produk.jpg',
+            )
+            ProductImage.objects.create(product=product, image='products/produk.jpg')
+
+            customer = User.objects.create_user(f'customer{i}', f'customer{i}@example.com', 'password')
+            customer.profile.phone = f'0812{i:06d}'
+            customer.profile.city = 'Makassar'
+            customer.profile.save()
+            User.objects.create_user(f'staff{i}', f'staff{i}@example.com', 'password', is_staff=True)
+
+            group = Group.objects.create(name=f'Grup {i}')
+            group.user_set.add(customer)
+            group.permissions.add(*self.permissions)
+
+            cart = Cart.objects.create(user=customer)
+            CartItem.objects.create(cart=cart, product=product, quantity=2)
+
+            order = Order.objects.create(
+                user=customer, shipping_name='Penerima', shipping_phone='0812',
+                shipping_address='Jl. Contoh', shipping_city='Makassar',
+                payment_method='bank_transfer', subtotal=20000, total=20000,
+            )
+            OrderItem.objects.create(
+                order=order, product=product, product_name=product.name,
+                product_price=product.price, quantity=2, subtotal=20000,
+            )
+
+            ShippingAddress.objects.create(
+                user=customer, full_name='Penerima', phone='0812',
+                address='Jl. Contoh', city='Makassar',
+            )
+            EmailVerification.objects.create(user=customer, verification_code='123456')
+            ContactMessage.objects.create(name=f'Pengirim {i}', email='a@example.com', message='Halo')
+            ProductReview.objects.create(product=product, user=customer, rating=5, comment='Mantap')
+            Voucher.objects.create(
+                code=f'VOUCHER{i}', discount_value=10,
+                valid_from=now, valid_to=now + timedelta(days=7),
+            )
+            ShippingCost.objects.create(kecamatan=f'Kecamatan {i}')
+
+    def changelist_urls(self):
+        return [
+            reverse(f'admin:{model._meta.app_label}_{model._meta.model_name}_changelist')
+            for model in admin.site._registry
+        ]
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+        return len(queries)
+
+    def test_changelist_query_count_does_not_grow_with_rows(self):
+        self.client.force_login(self.superuser)
+        urls = self.changelist_urls()
+
+        self.create_rows(0, 2)
+        for url in urls:
+            # Request pertama mengisi cache (ContentType, session, dll)
+            self.client.get(url)
+        baseline = {url: self.count_queries(url) for url in urls}
 
-# Create your tests here.
+        self.create_rows(2, 6)
+        for url in urls:
+            with self.subTest(changelist=url):
+                self.assertEqual(self.count_queries(url), baseline[url])
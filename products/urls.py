@@ -6,6 +6,7 @@ urlpatterns = [
     # Public pages
     path('', views.home, name='home'),
     path('shop/', views.shop, name='shop'),
+    path('shop/category/<slug:category_slug>/', views.shop, name='shop_category'),
     path('product/<slug:slug>/', views.product_detail, name='product_detail'),
     path('about/', views.about, name='about'),
     path('contact/', views.contact, name='contact'),
@@ -37,6 +38,10 @@ urlpatterns = [
     path('cart/remove/<int:item_id>/', views.remove_from_cart, name='remove_from_cart'),
     path('cart/delete-selected/', views.delete_selected_items, name='delete_selected_items'),
     path('api/cart/count/', views.get_cart_count, name='get_cart_count'),
+    path('api/header/', views.header_status, name='header_status'),
+    path('api/product/<int:product_id>/user-state/', views.product_user_state, name='product_user_state'),
+    path('api/product/<slug:slug>/reviews/', views.product_reviews, name='product_reviews'),
+    path('api/search/suggest/', views.search_suggest, name='search_suggest'),
     
     path('cart/apply-voucher/', views.apply_voucher, name='apply_voucher'),
     path('cart/remove-voucher/', views.remove_voucher, name='remove_voucher'),
@@ -58,4 +63,7 @@ urlpatterns = [
     # Voucher AJAX routes
     path('checkout/apply-voucher/', views.apply_voucher_ajax, name='apply_voucher_ajax'),
     path('checkout/remove-voucher/', views.remove_voucher_ajax, name='remove_voucher_ajax'),
+
+    # Vercel Cron
+    path('cron/send-order-notifications/', views.cron_send_order_notifications, name='cron_send_order_notifications'),
 ]
\ No newline at end of file
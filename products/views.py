@@ -1,4 +1,5 @@
-from django.shortcuts import render, redirect, get_object_or_404
+from asgiref.sync import sync_to_async
+from django.shortcuts import render, redirect, get_object_or_404, aget_object_or_404
 from django.contrib.auth import login, logout, authenticate, update_session_auth_hash
 from django.core.paginator import Paginator
 from django.contrib.auth.models import User
@@ -6,22 +7,40 @@ from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.http import JsonResponse
 from django.views.decorators.http import require_POST
+from django.views.decorators.cache import never_cache
+from django.template.loader import render_to_string
+from django.middleware.csrf import get_token
 from django.db.models import Sum, Count, Q, Avg
 from decimal import Decimal
 from django.contrib.auth.forms import PasswordChangeForm
 from django.core.mail import send_mail
 from django.conf import settings
 from django.utils import timezone
+from django.urls import reverse
+from django.utils.cache import patch_cache_control
+from django.utils.crypto import constant_time_compare
+from urllib.parse import urlencode
 from .models import Voucher
+from .page_cache import CATALOG_TAG, FACET_TAG, cache_public_page, mark_auth_cookie, product_page_tags, product_tag
+from .conditional import cart_count_state, conditional_page, order_detail_state, product_detail_state
+from .order_status import send_pending_notifications, transition_order
+from .checkout_session import clear_checkout_state, load_checkout_state, price_voucher, update_checkout_state
+from .mail import asend_mail
+from .reviews import DEFAULT_SORT, get_review_page, sort_choices
+from .facets import FILTER_PARAMS, build_facets, filter_products, parse_filters, query_params
+from .search_index import suggest_index
+from .fuzzy_search import order_by_ids, search_product_ids
+from .recommendations import get_related_products
 
 from .models import (
     Product, Category, Cart, CartItem, Order, OrderItem, 
     ShippingAddress, ContactMessage, UserProfile, ProductReview, 
-    EmailVerification, ShippingCost, Voucher
+    EmailVerification, ShippingCost, Voucher, PurchasedProduct, AccountSummary
 )
 
 # ==================== PUBLIC VIEWS ====================
 
+@cache_public_page(tags=[CATALOG_TAG])
 def home(request):
     """View untuk halaman home - Menampilkan 8 produk terbaru"""
     products = Product.objects.filter(is_active=True)[:8]
@@ -33,48 +52,58 @@ def home(request):
     return render(request, 'home.html', context)
 
 
-def shop(request):
-    """View untuk halaman shop (daftar semua produk)"""
-    products = Product.objects.filter(is_active=True).order_by('-created_at')
-    categories = Category.objects.all()
+@cache_public_page(tags=[CATALOG_TAG, FACET_TAG], query_params=('search', 'category', 'page') + FILTER_PARAMS)
+def shop(request, category_slug=None):
+    """
+    View untuk halaman shop (daftar semua produk, atau per kategori lewat URL shop_category)
+    dengan filter facet kategori, harga, stok dan rating (lihat products/facets.py)
+    """
+    products = Product.objects.filter(is_active=True).select_related('category').order_by('-created_at')
+    categories = list(Category.objects.all())
     
-    # Search functionality
+    # Search functionality (tahan salah ketik & sinonim, urut relevansi)
     search_query = request.GET.get('search', '')
+    product_ids = None
     if search_query:
-        products = products.filter(name__icontains=search_query)
+        product_ids = search_product_ids(search_query)
+        products = order_by_ids(products.filter(id__in=product_ids), product_ids)
     
-    # Filter berdasarkan kategori jika ada
-    category_slug = request.GET.get('category')
-    selected_category = None
-    if category_slug:
-        products = products.filter(category__slug=category_slug)
-        selected_category = category_slug
+    # Filter facet (kategori dari URL shop_category atau ?category=)
+    filters = parse_filters(request.GET, category_slug)
+    category_id = next((category.id for category in categories if category.slug == filters['category']), None)
+    products = filter_products(products, filters, category_id)
     
     # Pagination - 16 products per page
     paginator = Paginator(products, 16)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
+    current_params = query_params(filters, search_query)
     context = {
         'products': page_obj,
         'categories': categories,
         'search_query': search_query,
-        'selected_category': selected_category,
+        'selected_category': filters['category'],
+        'facets': build_facets(reverse('shop'), categories, filters, search_query, category_id, product_ids),
+        # Filter aktif untuk link pagination & form pencarian
+        'filter_query': urlencode(current_params),
+        'filter_hidden_inputs': [(name, value) for name, value in current_params if name != 'search'],
+        'has_filters': bool(current_params),
     }
     
     return render(request, 'shop.html', context)
 
 
+@conditional_page(product_detail_state)
+@cache_public_page(tags=product_page_tags)
 def product_detail(request, slug):
     """View untuk halaman detail produk dengan review"""
     product = get_object_or_404(Product, slug=slug, is_active=True)
-    related_products = Product.objects.filter(
-        category=product.category,
-        is_active=True
-    ).exclude(id=product.id)[:4]
+    # Sering dibeli bersamaan (python manage.py build_recommendations), atau satu kategori
+    related_products, related_from_purchases = get_related_products(product)
     
-    # Ambil semua reviews untuk produk ini
-    reviews = product.reviews.select_related('user', 'user__profile').all()
+    # Halaman pertama review, halaman berikutnya dimuat lewat product_reviews
+    reviews, next_cursor = get_review_page(product)
     
     # Hitung rating rata-rata dan jumlah review
     rating_stats = product.reviews.aggregate(
@@ -83,32 +112,119 @@ def product_detail(request, slug):
     )
     
     # Cek apakah user sudah pernah review
-    user_review = None
-    can_review = False
-    if request.user.is_authenticated:
-        user_review = product.reviews.filter(user=request.user).first()
-        
-        # User bisa review jika sudah pernah beli dan belum pernah review
-        has_purchased = OrderItem.objects.filter(
-            order__user=request.user,
-            product=product,
-            order__status__in=['paid', 'processing', 'shipped', 'delivered']
-        ).exists()
-        
-        can_review = has_purchased and not user_review
+    user_review, can_review = _review_state(request, product)
+    
+    # Data untuk static/js/product_detail.js
+    gallery_images = [image.image.url for image in product.images.all()]
+    if not gallery_images and product.image:
+        gallery_images = [product.image.url]
+    product_config = {
+        'images': gallery_images,
+        'max_stock': product.stock,
+        'buy_now_url': reverse('buy_now', args=[product.id]),
+        'login_url': f"{reverse('login')}?next={request.path}",
+        'user_state_url': reverse('product_user_state', args=[product.id]),
+        'reviews_url': reverse('product_reviews', args=[product.slug]),
+    }
     
     context = {
         'product': product,
         'related_products': related_products,
+        'related_from_purchases': related_from_purchases,
         'reviews': reviews,
+        'reviews_next_cursor': next_cursor,
+        'review_sorts': sort_choices(),
         'rating_stats': rating_stats,
         'user_review': user_review,
         'can_review': can_review,
+        'product_config': product_config,
     }
     
     return render(request, 'product_detail.html', context)
 
 
+@cache_public_page(tags=lambda slug: [product_tag(slug)], query_params=('sort', 'cursor'))
+def product_reviews(request, slug):
+    """
+    API endpoint review per halaman (cursor) untuk tombol "Muat Lebih Banyak"
+    dan pilihan urutan di halaman produk
+    """
+    product = get_object_or_404(Product, slug=slug, is_active=True)
+    reviews, next_cursor = get_review_page(
+        product, sort=request.GET.get('sort', DEFAULT_SORT), cursor=request.GET.get('cursor')
+    )
+    # Tanpa request: tombol edit review milik user ditambahkan oleh JS (lihat product_user_state)
+    html = render_to_string('includes/review_list.html', {'reviews': reviews})
+    return JsonResponse({
+        'html': html,
+        'next_cursor': next_cursor,
+    })
+
+
+def search_suggest(request):
+    """
+    API endpoint autocomplete kotak pencarian shop (?q=teks yang diketik)
+    Dijawab dari index di memori tanpa query database (lihat products/search_index.py)
+    """
+    query = request.GET.get('q', '')[:100]
+    response = JsonResponse({
+        'query': query,
+        'suggestions': suggest_index.suggest(query),
+    })
+    # Tidak bergantung pada user, boleh di-cache browser/CDN sebentar
+    patch_cache_control(response, public=True, max_age=settings.PAGE_CACHE_BROWSER_MAX_AGE)
+    return response
+
+
+def _review_state(request, product):
+    """Return (review milik user, boleh review) untuk user yang sedang login"""
+    if not request.user.is_authenticated:
+        return None, False
+
+    user_review = product.reviews.filter(user=request.user).first()
+    
+    if user_review:
+        return user_review, False
+    
+    # User bisa review jika sudah pernah beli dan belum pernah review
+    return None, PurchasedProduct.has_purchased(request.user, product)
+
+
+@never_cache
+def product_user_state(request, product_id):
+    """
+    API endpoint bagian halaman produk yang personal (tombol beli, form review,
+    tombol edit review milik user). Dipanggil static/js/product_detail.js di
+    halaman ter-cache / hasil build_static_catalog
+    """
+    if not request.user.is_authenticated:
+        mark_auth_cookie(request, False)
+        return JsonResponse({'authenticated': False})
+
+    product = get_object_or_404(Product, id=product_id, is_active=True)
+    user_review, can_review = _review_state(request, product)
+    context = {
+        'product': product,
+        'user_review': user_review,
+        'can_review': can_review,
+    }
+
+    own_review = None
+    if user_review:
+        own_review = {
+            'id': user_review.id,
+            'html': render_to_string('includes/review_actions.html', {'review': user_review}, request=request),
+        }
+
+    return JsonResponse({
+        'authenticated': True,
+        'csrf_token': get_token(request),
+        'actions_html': render_to_string('includes/product_actions.html', context, request=request),
+        'review_form_html': render_to_string('includes/product_review_form.html', context, request=request),
+        'own_review': own_review,
+    })
+
+
 # TAMBAHKAN fungsi-fungsi baru untuk review:
 
 @login_required
@@ -123,13 +239,7 @@ def add_review(request, product_id):
         return redirect('product_detail', slug=product.slug)
     
     # Cek apakah user pernah membeli produk ini
-    has_purchased = OrderItem.objects.filter(
-        order__user=request.user,
-        product=product,
-        order__status__in=['paid', 'processing', 'shipped', 'delivered']
-    ).exists()
-    
-    if not has_purchased:
+    if not PurchasedProduct.has_purchased(request.user, product):
         messages.error(request, 'Anda harus membeli produk ini terlebih dahulu untuk memberikan review!')
         return redirect('product_detail', slug=product.slug)
     
@@ -205,6 +315,7 @@ def delete_review(request, review_id):
     return redirect('product_detail', slug=product_slug)
 
 
+@cache_public_page()
 def about(request):
     """View untuk halaman about"""
     return render(request, 'about.html')
@@ -385,20 +496,20 @@ def verify_email(request, username):
     return render(request, 'registration/verify_email.html', {'username': username, 'user': user})
 
 
-def resend_verification_code(request, username):
-    """View untuk kirim ulang kode verifikasi"""
-    user = get_object_or_404(User, username=username)
+async def resend_verification_code(request, username):
+    """View untuk kirim ulang kode verifikasi (async: menunggu SMTP tanpa menahan worker)"""
+    user = await aget_object_or_404(User, username=username)
     
     if user.is_active:
         messages.info(request, 'Email Anda sudah diverifikasi.')
         return redirect('login')
     
     try:
-        email_verification = user.email_verification
-        verification_code = email_verification.generate_code()
+        email_verification = await EmailVerification.objects.aget(user=user)
+        verification_code = await sync_to_async(email_verification.generate_code)()
         
         # Kirim ulang email
-        send_mail(
+        await asend_mail(
             subject='Kode Verifikasi Baru - MancingMo',
             message=f'''
 Halo {user.first_name},
@@ -464,21 +575,11 @@ def profile(request):
     # Get recent orders
     recent_orders = Order.objects.filter(user=request.user).order_by('-created_at')[:5]
     
-    # Calculate statistics
-    total_orders = Order.objects.filter(user=request.user).count()
-    
-    # Get cart items count
-    try:
-        cart = Cart.objects.get(user=request.user)
-        cart_items_count = cart.items.count()
-    except Cart.DoesNotExist:
-        cart_items_count = 0
-    
-    # Calculate total spending (dari order yang sudah selesai/delivered)
-    total_spending = Order.objects.filter(
-        user=request.user,
-        status__in=['paid', 'processing', 'shipped', 'delivered']
-    ).aggregate(total=Sum('total'))['total'] or 0
+    # Statistik dibaca dari tabel ringkasan (satu baris), bukan COUNT/SUM per request
+    summary = AccountSummary.for_user(request.user)
+    total_orders = summary.order_count
+    cart_items_count = summary.cart_items
+    total_spending = summary.total_spent
     
     context = {
         'profile': user_profile,
@@ -501,7 +602,7 @@ def edit_profile(request):
         request.user.first_name = request.POST.get('first_name', '')
         request.user.last_name = request.POST.get('last_name', '')
         request.user.email = request.POST.get('email', '')
-        request.user.save()
+        request.user.save(update_fields=['first_name', 'last_name', 'email'])
         
         # Update profile data
         user_profile.phone = request.POST.get('phone', '')
@@ -580,15 +681,12 @@ def order_history(request):
                     
                     if transaction_status == 'capture':
                         if fraud_status == 'accept':
-                            order.status = 'paid'
-                            order.paid_at = timezone.now()
+                            transition_order(order, 'paid', source='midtrans', note=f'Midtrans: {transaction_status}')
                     elif transaction_status == 'settlement':
-                        order.status = 'paid'
-                        order.paid_at = timezone.now()
+                        transition_order(order, 'paid', source='midtrans', note=f'Midtrans: {transaction_status}')
                     elif transaction_status in ['deny', 'expire', 'cancel']:
                         order.midtrans_transaction_status = transaction_status
-                    
-                    order.save()
+                        order.save(update_fields=['midtrans_transaction_status', 'updated_at'])
                     
             except Exception as e:
                 print(f"Error checking Midtrans status for order {order.id}: {str(e)}")
@@ -606,17 +704,21 @@ def order_history(request):
 
 
 @login_required
-def order_detail(request, order_id):
-    """View untuk detail pesanan dengan pengecekan status Midtrans real-time"""
-    order = get_object_or_404(Order, id=order_id, user=request.user)
+@conditional_page(order_detail_state)
+async def order_detail(request, order_id):
+    """
+    View untuk detail pesanan dengan pengecekan status Midtrans real-time
+    (async: menunggu Midtrans tanpa menahan worker)
+    """
+    order = await aget_object_or_404(Order, id=order_id, user=await request.auser())
     
     # ✅ CEK STATUS TRANSAKSI MIDTRANS JIKA ORDER MASIH PENDING
     if order.status == 'pending' and order.payment_method == 'midtrans' and order.midtrans_order_id:
-        from .midtrans_utils import MidtransPayment
+        from .midtrans_utils import AsyncMidtransPayment
         
         try:
-            midtrans = MidtransPayment()
-            status_result = midtrans.check_transaction_status(order.midtrans_order_id)
+            midtrans = AsyncMidtransPayment()
+            status_result = await midtrans.check_transaction_status(order.midtrans_order_id)
             
             if status_result['success']:
                 transaction_status = status_result['data'].get('transaction_status')
@@ -625,17 +727,13 @@ def order_detail(request, order_id):
                 # Update status order berdasarkan response Midtrans
                 if transaction_status == 'capture':
                     if fraud_status == 'accept':
-                        order.status = 'paid'
-                        order.paid_at = timezone.now()
+                        await sync_to_async(transition_order)(order, 'paid', source='midtrans', note=f'Midtrans: {transaction_status}')
                 elif transaction_status == 'settlement':
-                    order.status = 'paid'
-                    order.paid_at = timezone.now()
+                    await sync_to_async(transition_order)(order, 'paid', source='midtrans', note=f'Midtrans: {transaction_status}')
                 elif transaction_status in ['deny', 'expire', 'cancel']:
                     # Update status transaksi ke expired/cancelled
                     order.midtrans_transaction_status = transaction_status
-                
-                # Simpan perubahan
-                order.save()
+                    await order.asave(update_fields=['midtrans_transaction_status', 'updated_at'])
                 
         except Exception as e:
             # Jika gagal cek status, lanjutkan saja tanpa error
@@ -645,7 +743,8 @@ def order_detail(request, order_id):
         'order': order,
     }
     
-    return render(request, 'registration/order_detail.html', context)
+    # Template membaca item pesanan & context processor (ORM sync)
+    return await sync_to_async(render)(request, 'registration/order_detail.html', context)
 
 
 # ==================== CART VIEWS ====================
@@ -834,10 +933,7 @@ def buy_now(request, product_id):
         return redirect('product_detail', slug=product.slug)
     
     # Simpan data produk dan quantity ke session untuk checkout
-    request.session['buy_now_data'] = {
-        'product_id': product.id,
-        'quantity': quantity
-    }
+    update_checkout_state(request.session, buy_now=(product.id, quantity))
     
     # Response untuk AJAX
     if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
@@ -856,23 +952,17 @@ def buy_now(request, product_id):
 def checkout(request):
     """View untuk halaman checkout - SUPPORT BUY NOW & CART ITEMS DENGAN VOUCHER & PICKUP"""
     
-    buy_now_data = request.session.get('buy_now_data')
+    checkout_state = load_checkout_state(request.session)
+    buy_now_data = checkout_state['buy_now']
     is_buy_now = buy_now_data is not None
     
-    # ✅ DIPERBAIKI: Ambil applied_voucher dari session di awal fungsi
-    applied_voucher = request.session.get('applied_voucher')
-    voucher_discount = Decimal(0)
-    
-    if applied_voucher:
-        voucher_discount = Decimal(applied_voucher['discount_amount'])
-    
     if is_buy_now:
-        product = get_object_or_404(Product, id=buy_now_data['product_id'], is_active=True)
-        quantity = buy_now_data['quantity']
+        product = get_object_or_404(Product, id=buy_now_data[0], is_active=True)
+        quantity = buy_now_data[1]
         
         if quantity > product.stock:
             messages.error(request, f'Stock {product.name} tidak mencukupi!')
-            del request.session['buy_now_data']
+            clear_checkout_state(request.session, 'buy_now')
             return redirect('product_detail', slug=product.slug)
         
         class BuyNowItem:
@@ -894,7 +984,7 @@ def checkout(request):
             messages.error(request, 'Keranjang Anda kosong!')
             return redirect('cart')
         
-        selected_item_ids = request.POST.getlist('selected_items') or request.session.get('selected_items', [])
+        selected_item_ids = request.POST.getlist('selected_items') or checkout_state['items']
         
         if not selected_item_ids:
             messages.error(request, 'Pilih minimal 1 produk untuk checkout!')
@@ -908,6 +998,16 @@ def checkout(request):
         
         cart_total = sum(item.get_subtotal() for item in cart_items)
     
+    # Diskon dihitung ulang dari Voucher setiap kali, session hanya menyimpan kodenya
+    applied_voucher = price_voucher(checkout_state['voucher'], cart_total)
+    voucher_discount = Decimal(0)
+    
+    if applied_voucher:
+        voucher_discount = applied_voucher['discount_amount']
+    elif checkout_state['voucher']:
+        clear_checkout_state(request.session, 'voucher')
+        messages.warning(request, f'Voucher {checkout_state["voucher"]} sudah tidak berlaku dan dilepas dari pesanan.')
+    
     user_profile, created = UserProfile.objects.get_or_create(user=request.user)
     default_address = ShippingAddress.objects.filter(user=request.user, is_default=True).first()
     kecamatan_list = ShippingCost.objects.filter(is_active=True).order_by('kecamatan')
@@ -942,13 +1042,13 @@ def checkout(request):
             if not all([full_name, phone, address, city, district]):
                 messages.error(request, 'Mohon lengkapi semua data pengiriman termasuk kecamatan!')
                 if not is_buy_now:
-                    request.session['selected_items'] = selected_item_ids
+                    update_checkout_state(request.session, items=selected_item_ids)
                 return redirect('checkout')
         else:
             if not all([full_name, phone]):
                 messages.error(request, 'Mohon lengkapi nama dan telepon untuk pickup!')
                 if not is_buy_now:
-                    request.session['selected_items'] = selected_item_ids
+                    update_checkout_state(request.session, items=selected_item_ids)
                 return redirect('checkout')
             address = "Ambil di toko - MancingMo Store"
             city = "Makassar"
@@ -982,7 +1082,7 @@ def checkout(request):
             if cart_total < Decimal(applied_voucher['min_purchase_amount']):
                 messages.error(request, f'Voucher {applied_voucher["code"]} memerlukan minimum pembelian Rp {applied_voucher["min_purchase_amount"]:,.0f}')
                 if not is_buy_now:
-                    request.session['selected_items'] = selected_item_ids
+                    update_checkout_state(request.session, items=selected_item_ids)
                 return redirect('checkout')
         
         # Validasi stock
@@ -990,7 +1090,7 @@ def checkout(request):
             if item.quantity > item.product.stock:
                 messages.error(request, f'Stock {item.product.name} tidak mencukupi! Tersisa {item.product.stock} item.')
                 if not is_buy_now:
-                    request.session['selected_items'] = selected_item_ids
+                    update_checkout_state(request.session, items=selected_item_ids)
                 return redirect('checkout')
         
         subtotal = cart_total
@@ -1022,15 +1122,9 @@ def checkout(request):
             
             # ✅ DIPERBAIKI: Simpan data voucher ke order dengan benar
             if applied_voucher:
-                try:
-                    voucher = Voucher.objects.get(code=applied_voucher['code'])
-                    order.voucher = voucher
-                    order.voucher_code = voucher.code
-                    order.save()  # Simpan perubahan voucher
-                except Voucher.DoesNotExist:
-                    # Jika voucher tidak ditemukan, tetap simpan kode voucher
-                    order.voucher_code = applied_voucher['code']
-                    order.save()
+                order.voucher = applied_voucher['voucher']
+                order.voucher_code = applied_voucher['code']
+                order.save()  # Simpan perubahan voucher
             
             # Buat order items
             for item in cart_items:
@@ -1049,11 +1143,7 @@ def checkout(request):
             
             # ✅ DIPERBAIKI: Gunakan voucher setelah order berhasil dibuat
             if applied_voucher:
-                try:
-                    voucher = Voucher.objects.get(code=applied_voucher['code'])
-                    voucher.use_voucher()
-                except Voucher.DoesNotExist:
-                    pass  # Jika voucher tidak ditemukan, skip penggunaan
+                applied_voucher['voucher'].use_voucher()
             
             # Simpan alamat jika diminta
             if save_address and shipping_method == 'delivery':
@@ -1082,17 +1172,11 @@ def checkout(request):
                 order.midtrans_order_id = order.order_number
                 order.save()
                 
-                # Bersihkan session data
-                if is_buy_now:
-                    del request.session['buy_now_data']
-                else:
+                if not is_buy_now:
                     CartItem.objects.filter(id__in=selected_item_ids).delete()
-                    if 'selected_items' in request.session:
-                        del request.session['selected_items']
                 
-                # ✅ DIPERBAIKI: Hapus voucher dari session SETELAH order berhasil dibuat
-                if 'applied_voucher' in request.session:
-                    del request.session['applied_voucher']
+                # ✅ DIPERBAIKI: Bersihkan state checkout (termasuk voucher) SETELAH order berhasil dibuat
+                clear_checkout_state(request.session)
                 
                 return redirect('midtrans_payment', order_id=order.id)
             else:
@@ -1103,28 +1187,44 @@ def checkout(request):
                 
                 # Rollback penggunaan voucher
                 if applied_voucher:
-                    try:
-                        voucher = Voucher.objects.get(code=applied_voucher['code'])
-                        if voucher.used_count > 0:
-                            voucher.used_count -= 1
-                            voucher.save()
-                    except Voucher.DoesNotExist:
-                        pass
+                    voucher = applied_voucher['voucher']
+                    if voucher.used_count > 0:
+                        voucher.used_count -= 1
+                        voucher.save()
                 
                 order.delete()
                 messages.error(request, f'Gagal membuat transaksi: {result["error"]}')
                 if not is_buy_now:
-                    request.session['selected_items'] = selected_item_ids
+                    update_checkout_state(request.session, items=selected_item_ids)
                 return redirect('checkout')
             
         except Exception as e:
             messages.error(request, f'Terjadi kesalahan saat membuat pesanan: {str(e)}')
             if not is_buy_now:
-                request.session['selected_items'] = selected_item_ids
+                update_checkout_state(request.session, items=selected_item_ids)
             return redirect('checkout')
     
-    if not is_buy_now and 'selected_items' in request.session and request.method == 'GET':
-        del request.session['selected_items']
+    if not is_buy_now and request.method == 'GET':
+        clear_checkout_state(request.session, 'items')
+    
+    # Data untuk static/js/checkout.js
+    address_fields = ['phone', 'address', 'city', 'province', 'district', 'postal_code']
+    saved_address = {
+        field: getattr(user_profile, field) or (getattr(default_address, field) if default_address else '')
+        for field in address_fields
+    }
+    saved_address['full_name'] = f"{request.user.first_name} {request.user.last_name}"
+    checkout_config = {
+        'saved_address': saved_address,
+        'subtotal': int(cart_total),
+        'applied_voucher': {
+            'code': applied_voucher['code'],
+            'discount_amount': float(applied_voucher['discount_amount']),
+        } if applied_voucher else None,
+        'apply_voucher_url': reverse('apply_voucher_ajax'),
+        'remove_voucher_url': reverse('remove_voucher_ajax'),
+        'shipping_method': shipping_method,
+    }
     
     # ✅ DIPERBAIKI: Kosongkan data alamat di context
     context = {
@@ -1140,6 +1240,7 @@ def checkout(request):
         'total': cart_total + shipping_cost - voucher_discount,
         'is_buy_now': is_buy_now,
         'applied_voucher': applied_voucher,  # ✅ Pastikan ini dikirim ke template
+        'checkout_config': checkout_config,
     }
     
     return render(request, 'checkout.html', context)
@@ -1176,9 +1277,9 @@ def midtrans_payment(request, order_id):
     return render(request, 'midtrans_payment.html', context)
 
 @login_required
-def continue_payment(request, order_id):
-    """View untuk melanjutkan pembayaran order yang masih pending"""
-    order = get_object_or_404(Order, id=order_id, user=request.user)
+async def continue_payment(request, order_id):
+    """View untuk melanjutkan pembayaran order yang masih pending (async, lihat order_detail)"""
+    order = await aget_object_or_404(Order, id=order_id, user=await request.auser())
     
     # Validasi: hanya order dengan status pending yang bisa lanjut bayar
     if order.status != 'pending':
@@ -1195,17 +1296,17 @@ def continue_payment(request, order_id):
         return redirect('midtrans_payment', order_id=order.id)
     
     # Jika belum punya snap token, buat baru
-    from .midtrans_utils import MidtransPayment
+    from .midtrans_utils import AsyncMidtransPayment
     
     try:
-        midtrans = MidtransPayment()
-        result = midtrans.create_transaction(order)
+        midtrans = AsyncMidtransPayment()
+        result = await midtrans.create_transaction(order)
         
         if result['success']:
             # Simpan snap token ke order
             order.midtrans_snap_token = result['snap_token']
             order.midtrans_order_id = order.order_number
-            order.save()
+            await order.asave()
             
             # Redirect ke payment page
             return redirect('midtrans_payment', order_id=order.id)
@@ -1218,9 +1319,9 @@ def continue_payment(request, order_id):
         return redirect('order_detail', order_id=order.id)
 
 @login_required
-def retry_payment(request, order_id):
-    """View untuk membuat transaksi pembayaran baru jika yang lama expired"""
-    order = get_object_or_404(Order, id=order_id, user=request.user)
+async def retry_payment(request, order_id):
+    """View untuk membuat transaksi pembayaran baru jika yang lama expired (async, lihat order_detail)"""
+    order = await aget_object_or_404(Order, id=order_id, user=await request.auser())
     
     # Validasi: hanya order dengan status pending yang bisa retry
     if order.status != 'pending':
@@ -1233,18 +1334,18 @@ def retry_payment(request, order_id):
         return redirect('order_detail', order_id=order.id)
     
     # Buat transaksi Midtrans baru (akan generate snap token baru)
-    from .midtrans_utils import MidtransPayment
+    from .midtrans_utils import AsyncMidtransPayment
     
     try:
-        midtrans = MidtransPayment()
-        result = midtrans.create_transaction(order)
+        midtrans = AsyncMidtransPayment()
+        result = await midtrans.create_transaction(order)
         
         if result['success']:
             # Update order dengan snap token baru
             order.midtrans_snap_token = result['snap_token']
             order.midtrans_order_id = order.order_number
             order.midtrans_transaction_status = 'pending'  # Reset status ke pending
-            order.save()
+            await order.asave()
             
             messages.success(request, 'Transaksi pembayaran baru berhasil dibuat!')
             # Redirect ke payment page
@@ -1270,15 +1371,8 @@ def cancel_order(request, order_id):
         return redirect('order_detail', order_id=order.id)
     
     try:
-        # Kembalikan stock produk
-        for item in order.items.all():
-            product = item.product
-            product.stock += item.quantity
-            product.save()
-        
-        # Update status order menjadi cancelled
-        order.status = 'cancelled'
-        order.save()
+        # Stock produk dikembalikan oleh state machine
+        transition_order(order, 'cancelled', source='customer', changed_by=request.user)
         
         messages.success(request, 'Pesanan berhasil dibatalkan. Stock produk telah dikembalikan.')
         return redirect('order_detail', order_id=order.id)
@@ -1289,10 +1383,11 @@ def cancel_order(request, order_id):
 
 
 @require_POST
-def midtrans_notification(request):
+async def midtrans_notification(request):
     """
     Webhook handler untuk notifikasi dari Midtrans
     Midtrans akan mengirim POST request ke endpoint ini setiap ada perubahan status transaksi
+    (async; transisi status tetap berjalan sync lewat sync_to_async karena memakai transaksi)
     """
     import json
     from django.views.decorators.csrf import csrf_exempt
@@ -1310,7 +1405,7 @@ def midtrans_notification(request):
         
         # Cari order berdasarkan order_id
         try:
-            order = Order.objects.get(order_number=order_id)
+            order = await Order.objects.aget(order_number=order_id)
         except Order.DoesNotExist:
             return JsonResponse({'status': 'error', 'message': 'Order not found'}, status=404)
         
@@ -1318,25 +1413,23 @@ def midtrans_notification(request):
         order.midtrans_transaction_id = transaction_id
         order.midtrans_transaction_status = transaction_status
         order.midtrans_payment_type = payment_type
+        await order.asave(update_fields=[
+            'midtrans_transaction_id', 'midtrans_transaction_status', 'midtrans_payment_type', 'updated_at'
+        ])
         
-        # Handle transaction status
+        # Handle transaction status (notifikasi berulang dilewati oleh state machine,
+        # sehingga stock tidak dikembalikan dua kali)
+        new_status = None
         if transaction_status == 'capture':
             if fraud_status == 'accept':
-                order.status = 'paid'
-                order.paid_at = timezone.now()
+                new_status = 'paid'
         elif transaction_status == 'settlement':
-            order.status = 'paid'
-            order.paid_at = timezone.now()
-        elif transaction_status == 'pending':
-            order.status = 'pending'
+            new_status = 'paid'
         elif transaction_status in ['deny', 'expire', 'cancel']:
-            order.status = 'cancelled'
-            # Kembalikan stock jika dibatalkan
-            for item in order.items.all():
-                item.product.stock += item.quantity
-                item.product.save()
+            new_status = 'cancelled'
         
-        order.save()
+        if new_status:
+            await sync_to_async(transition_order)(order, new_status, source='midtrans', note=f'Midtrans: {transaction_status}')
         
         return JsonResponse({'status': 'success'}, status=200)
         
@@ -1346,6 +1439,7 @@ def midtrans_notification(request):
 # ==================== AJAX HELPER ====================
 
 @login_required
+@conditional_page(cart_count_state)
 def get_cart_count(request):
     """API endpoint untuk mendapatkan jumlah item di cart"""
     try:
@@ -1356,6 +1450,30 @@ def get_cart_count(request):
     
     return JsonResponse({'count': count})
 
+
+@never_cache
+def header_status(request):
+    """
+    API endpoint bagian header yang personal (menu user & badge keranjang)
+    Dipanggil oleh static/js/base.js di halaman yang di-cache
+    """
+    if not request.user.is_authenticated:
+        # Cookie penanda login sudah basi (mis. sesi kedaluwarsa)
+        mark_auth_cookie(request, False)
+        return JsonResponse({'authenticated': False, 'cart_count': 0})
+
+    html = render_to_string('includes/header_user.html', request=request)
+    try:
+        cart_count = request.user.cart.get_unique_items_count()
+    except Cart.DoesNotExist:
+        cart_count = 0
+
+    return JsonResponse({
+        'authenticated': True,
+        'cart_count': cart_count,
+        'html': html,
+    })
+
 @login_required
 @require_POST
 def apply_voucher(request):
@@ -1380,7 +1498,7 @@ def apply_voucher(request):
             cart = Cart.objects.get(user=request.user)
             
             # ✅ HITUNG MANUAL dari selected items di session
-            selected_item_ids = request.session.get('selected_items', [])
+            selected_item_ids = load_checkout_state(request.session)['items']
             if selected_item_ids:
                 # Pakai selected items dari session (yang dipilih user di cart)
                 cart_items = cart.items.filter(id__in=selected_item_ids)
@@ -1439,17 +1557,8 @@ def apply_voucher(request):
         discount = voucher.calculate_discount(Decimal(cart_total))
         print(f"💰 Diskon: {discount}")
         
-        # Store voucher in session
-        request.session['applied_voucher'] = {
-            'code': voucher.code,
-            'discount_type': voucher.discount_type,
-            'discount_value': float(voucher.discount_value),
-            'discount_amount': float(discount),
-            'min_purchase_amount': float(voucher.min_purchase_amount),
-            'max_discount_amount': float(voucher.max_discount_amount) if voucher.max_discount_amount else None
-        }
-        
-        request.session.modified = True
+        # Session hanya menyimpan kode, diskon dihitung ulang saat checkout
+        update_checkout_state(request.session, voucher=voucher.code)
         
         return JsonResponse({
             'success': True,
@@ -1475,9 +1584,9 @@ def apply_voucher(request):
 def remove_voucher(request):
     """Remove applied voucher"""
     try:
-        if 'applied_voucher' in request.session:
-            voucher_code = request.session['applied_voucher']['code']
-            del request.session['applied_voucher']
+        voucher_code = load_checkout_state(request.session)['voucher']
+        if voucher_code:
+            clear_checkout_state(request.session, 'voucher')
             
             return JsonResponse({
                 'success': True,
@@ -1519,7 +1628,7 @@ def apply_voucher_ajax(request):
             cart = Cart.objects.get(user=request.user)
             
             # ✅ HITUNG MANUAL dari selected items di session
-            selected_item_ids = request.session.get('selected_items', [])
+            selected_item_ids = load_checkout_state(request.session)['items']
             if selected_item_ids:
                 # Pakai selected items dari session (yang dipilih user di cart)
                 cart_items = cart.items.filter(id__in=selected_item_ids)
@@ -1578,17 +1687,8 @@ def apply_voucher_ajax(request):
         discount = voucher.calculate_discount(Decimal(cart_total))
         print(f"💰 Diskon: {discount}")
         
-        # Store voucher in session
-        request.session['applied_voucher'] = {
-            'code': voucher.code,
-            'discount_type': voucher.discount_type,
-            'discount_value': float(voucher.discount_value),
-            'discount_amount': float(discount),
-            'min_purchase_amount': float(voucher.min_purchase_amount),
-            'max_discount_amount': float(voucher.max_discount_amount) if voucher.max_discount_amount else None
-        }
-        
-        request.session.modified = True
+        # Session hanya menyimpan kode, diskon dihitung ulang saat checkout
+        update_checkout_state(request.session, voucher=voucher.code)
         
         return JsonResponse({
             'success': True,
@@ -1614,10 +1714,9 @@ def apply_voucher_ajax(request):
 def remove_voucher_ajax(request):
     """Remove applied voucher tanpa page refresh"""
     try:
-        if 'applied_voucher' in request.session:
-            voucher_code = request.session['applied_voucher']['code']
-            del request.session['applied_voucher']
-            request.session.modified = True
+        voucher_code = load_checkout_state(request.session)['voucher']
+        if voucher_code:
+            clear_checkout_state(request.session, 'voucher')
             
             return JsonResponse({
                 'success': True,
@@ -1633,4 +1732,20 @@ def remove_voucher_ajax(request):
         return JsonResponse({
             'success': False,
             'message': f'Terjadi kesalahan: {str(e)}'
-        })
\ No newline at end of file
+        })
+
+# ==================== CRON ====================
+
+@never_cache
+def cron_send_order_notifications(request):
+    """
+    Dipanggil Vercel Cron (crons di vercel.json) untuk mengirim antrian email
+    status pesanan; di server sendiri pakai python manage.py send_order_notifications.
+    Vercel mengirim header Authorization: Bearer <CRON_SECRET>.
+    """
+    expected = f'Bearer {settings.CRON_SECRET}'
+    if not settings.CRON_SECRET or not constant_time_compare(request.headers.get('Authorization', ''), expected):
+        return JsonResponse({'status': 'error', 'message': 'Unauthorized'}, status=401)
+
+    processed = send_pending_notifications(limit=settings.ORDER_NOTIFICATION_CRON_BATCH)
+    return JsonResponse({'status': 'success', 'processed': processed})
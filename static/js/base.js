@@ -0,0 +1,94 @@
+// ============ HEADER ============
+// Toggle dropdown menu
+function initUserMenu() {
+    const userBtn = document.querySelector('.user-btn');
+    const dropdownMenu = document.querySelector('.dropdown-menu');
+    
+    if (userBtn && dropdownMenu) {
+        userBtn.addEventListener('click', function(e) {
+            e.stopPropagation();
+            dropdownMenu.classList.toggle('show');
+        });
+    }
+}
+
+// Close dropdown when clicking outside
+document.addEventListener('click', function(e) {
+    const dropdownMenu = document.querySelector('.dropdown-menu');
+    if (dropdownMenu && !e.target.closest('.user-menu')) {
+        dropdownMenu.classList.remove('show');
+    }
+});
+
+// Halaman ter-cache / pre-render merender versi anonim.
+// True jika halaman ini versi tersebut dan browser punya cookie penanda login.
+function shouldHydrate() {
+    const navIcons = document.getElementById('navIcons');
+    if (!navIcons || !navIcons.dataset.hydrateUrl) {
+        return false;
+    }
+    const authCookie = navIcons.dataset.authCookie + '=';
+    return document.cookie.split('; ').some(function(cookie) {
+        return cookie.indexOf(authCookie) === 0;
+    });
+}
+
+window.shouldHydrate = shouldHydrate;
+
+// Muat menu user & badge keranjang dari server
+function hydrateHeader() {
+    if (!shouldHydrate()) {
+        return;
+    }
+    
+    const navIcons = document.getElementById('navIcons');
+    fetch(navIcons.dataset.hydrateUrl, {
+        credentials: 'same-origin',
+        headers: {'X-Requested-With': 'XMLHttpRequest'}
+    })
+    .then(function(response) { return response.json(); })
+    .then(function(data) {
+        if (data.authenticated) {
+            navIcons.innerHTML = data.html;
+            initUserMenu();
+        }
+    })
+    .catch(function(error) {
+        console.error('Gagal memuat header:', error);
+    });
+}
+
+document.addEventListener('DOMContentLoaded', function() {
+    initUserMenu();
+    hydrateHeader();
+});
+
+// ✅ FUNGSI UPDATE CART BADGE - OTOMATIS HIDE JIKA 0
+function updateCartBadge(count) {
+    const badge = document.getElementById('cartBadge');
+    if (badge) {
+        if (count > 0) {
+            badge.textContent = count;
+            badge.style.display = 'flex';
+        } else {
+            badge.style.display = 'none';
+        }
+    }
+}
+
+// Make function available globally
+window.updateCartBadge = updateCartBadge;
+
+// ============ MESSAGES ============
+// Auto-hide messages after 5 seconds
+document.addEventListener('DOMContentLoaded', function() {
+    const alerts = document.querySelectorAll('.alert');
+    alerts.forEach(function(alert) {
+        setTimeout(function() {
+            alert.style.animation = 'slideOutRight 0.3s ease-out';
+            setTimeout(function() {
+                alert.remove();
+            }, 300);
+        }, 5000);
+    });
+});
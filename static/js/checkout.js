@@ -0,0 +1,582 @@
+// static/js/checkout.js
+// Data dari view (lihat checkout_config)
+const checkoutConfig = JSON.parse(document.getElementById('checkout-config').textContent);
+
+// Data untuk auto-fill
+const savedAddressData = checkoutConfig.saved_address;
+
+// HARGA ONGKIR
+const shippingCosts = {
+    'Biringkanaya': 12000,
+    'Bontoala': 8000,
+    'Kepulauan Sangkarrang': 25000,
+    'Makassar': 9000,
+    'Mamajang': 8500,
+    'Manggala': 15000,
+    'Mariso': 7500,
+    'Panakkukang': 11000,
+    'Rappocini': 10000,
+    'Tallo': 9500,
+    'Tamalanrea': 13000,
+    'Tamalate': 10500,
+    'Ujung Pandang': 7000,
+    'Ujung Tanah': 8000,
+    'Wajo': 9000,
+};
+
+const EXPRESS_SURCHARGE = 10000;
+
+// Function to format number to Rupiah
+function formatRupiah(number) {
+    const num = parseInt(number);
+    if (isNaN(num)) {
+        return 'Rp 0';
+    }
+    return 'Rp ' + num.toLocaleString('id-ID').replace(/,/g, '.');
+}
+
+// Function untuk parse subtotal dari Django template
+function getSubtotal() {
+    const subtotalElement = document.querySelector('.summary-totals .total-row:first-child span:last-child');
+    if (subtotalElement) {
+        const subtotalText = subtotalElement.textContent.replace(/[^\d]/g, '');
+        return parseInt(subtotalText) || 0;
+    }
+    return parseInt(checkoutConfig.subtotal);
+}
+
+// ✅ SIMPLE VOUCHER MANAGEMENT
+let currentVoucher = checkoutConfig.applied_voucher;
+
+// ✅ FUNCTION BARU: Select Shipping Method
+function selectShippingMethod(method) {
+    document.querySelectorAll('.shipping-method-option').forEach(option => {
+        option.classList.remove('selected');
+    });
+    document.querySelector(`.shipping-method-option input[value="${method}"]`).parentElement.classList.add('selected');
+    
+    document.getElementById('shippingMethod').value = method;
+    
+    const deliveryFields = document.getElementById('deliveryAddressFields');
+    const pickupInfo = document.getElementById('pickupInfo');
+    
+    if (method === 'delivery') {
+        deliveryFields.style.display = 'block';
+        pickupInfo.classList.remove('show');
+        selectShippingType('reguler');
+        updateShippingCost();
+    } else {
+        deliveryFields.style.display = 'none';
+        pickupInfo.classList.add('show');
+        updateSummaryForPickup();
+    }
+    
+    checkFormValidity();
+}
+
+// ✅ FUNCTION BARU: Update summary untuk pickup
+function updateSummaryForPickup() {
+    const subtotal = getSubtotal();
+    const discountAmount = currentVoucher ? currentVoucher.discount_amount : 0;
+    const total = subtotal - discountAmount;
+    
+    document.getElementById('summary-shipping-type').textContent = 'Pick Up';
+    document.getElementById('summary-shipping').textContent = 'GRATIS';
+    document.getElementById('summary-total').textContent = formatRupiah(total);
+    
+    updatePaymentSectionTotals(subtotal, 0, discountAmount);
+}
+
+// ✅ FUNCTION: Update shipping cost
+function updateShippingCost() {
+    const districtSelect = document.getElementById('district');
+    const selectedDistrict = districtSelect.value;
+    const shippingCostPreview = document.getElementById('shippingCostPreview');
+    const shippingTypeSection = document.getElementById('shippingTypeSection');
+    
+    if (selectedDistrict && shippingCosts[selectedDistrict]) {
+        const baseShippingCost = shippingCosts[selectedDistrict];
+        const shippingType = document.getElementById('shippingType').value;
+        let displayShippingCost = baseShippingCost;
+        let shippingTypeName = 'Reguler';
+        
+        if (shippingType === 'express') {
+            displayShippingCost = baseShippingCost + EXPRESS_SURCHARGE;
+            shippingTypeName = 'Express';
+        }
+        
+        document.getElementById('shippingCostDisplay').textContent = formatRupiah(displayShippingCost);
+        document.getElementById('shippingCostLabel').textContent = `Biaya Pengiriman ${shippingTypeName}:`;
+        
+        const shippingCostCard = document.getElementById('shippingCostCard');
+        if (shippingType === 'express') {
+            shippingCostCard.classList.add('express');
+        } else {
+            shippingCostCard.classList.remove('express');
+        }
+        
+        shippingCostPreview.style.display = 'block';
+        shippingTypeSection.style.display = 'block';
+        
+        document.getElementById('regulerPrice').textContent = formatRupiah(baseShippingCost);
+        document.getElementById('expressPrice').textContent = formatRupiah(baseShippingCost + EXPRESS_SURCHARGE);
+        
+        updateShippingCostDisplay();
+        checkFormValidity();
+    } else {
+        shippingCostPreview.style.display = 'none';
+        shippingTypeSection.style.display = 'none';
+        document.getElementById('summary-shipping').textContent = 'Pilih kecamatan';
+        updateTotals();
+    }
+}
+
+// ✅ FUNCTION: Update shipping cost display
+function updateShippingCostDisplay() {
+    const shippingMethod = document.getElementById('shippingMethod').value;
+    
+    if (shippingMethod === 'pickup') {
+        updateSummaryForPickup();
+        return;
+    }
+    
+    const districtSelect = document.getElementById('district');
+    const selectedDistrict = districtSelect.value;
+    const shippingType = document.getElementById('shippingType').value;
+    
+    if (selectedDistrict && shippingCosts[selectedDistrict]) {
+        const baseShippingCost = shippingCosts[selectedDistrict];
+        let finalShippingCost = baseShippingCost;
+        let shippingTypeName = 'Reguler';
+        
+        if (shippingType === 'express') {
+            finalShippingCost = baseShippingCost + EXPRESS_SURCHARGE;
+            shippingTypeName = 'Express';
+        }
+        
+        updateTotals(finalShippingCost);
+        
+        document.getElementById('shippingCostDisplay').textContent = formatRupiah(finalShippingCost);
+        document.getElementById('shippingCostLabel').textContent = `Biaya Pengiriman ${shippingTypeName}:`;
+        
+        const shippingCostCard = document.getElementById('shippingCostCard');
+        if (shippingType === 'express') {
+            shippingCostCard.classList.add('express');
+        } else {
+            shippingCostCard.classList.remove('express');
+        }
+    }
+}
+
+// ✅ FUNCTION: Select shipping type
+function selectShippingType(type) {
+    document.querySelectorAll('.shipping-option').forEach(option => {
+        option.classList.remove('selected');
+    });
+    document.querySelector(`.shipping-option input[value="${type}"]`).parentElement.classList.add('selected');
+    
+    document.getElementById('shippingType').value = type;
+    updateShippingCost();
+}
+
+// ✅ FUNCTION: Check form validity
+function checkFormValidity() {
+    const shippingMethod = document.getElementById('shippingMethod').value;
+    const fullName = document.getElementById('full_name').value.trim();
+    const phone = document.getElementById('phone').value.trim();
+    const continueBtn = document.querySelector('.btn-continue');
+    
+    let isValid = fullName && phone;
+    
+    if (shippingMethod === 'delivery') {
+        const address = document.getElementById('address').value.trim();
+        const district = document.getElementById('district').value.trim();
+        isValid = isValid && address && district;
+    }
+    
+    if (continueBtn) {
+        continueBtn.disabled = !isValid;
+        continueBtn.style.opacity = isValid ? '1' : '0.5';
+        continueBtn.style.cursor = isValid ? 'pointer' : 'not-allowed';
+    }
+    
+    return isValid;
+}
+
+// ✅ FUNCTION: Use saved address - DIPERBAIKI
+function useSavedAddress() {
+    const shippingMethod = document.getElementById('shippingMethod').value;
+    
+    // Isi form dengan data alamat default
+    document.getElementById('full_name').value = savedAddressData.full_name || '';
+    document.getElementById('phone').value = savedAddressData.phone || '';
+    
+    if (shippingMethod === 'delivery') {
+        document.getElementById('address').value = savedAddressData.address || '';
+        document.getElementById('city').value = savedAddressData.city || 'Makassar';
+        document.getElementById('province').value = savedAddressData.province || 'Sulawesi Selatan';
+        document.getElementById('postal_code').value = savedAddressData.postal_code || '';
+        
+        if (savedAddressData.district) {
+            const districtSelect = document.getElementById('district');
+            for (let i = 0; i < districtSelect.options.length; i++) {
+                if (districtSelect.options[i].value === savedAddressData.district) {
+                    districtSelect.selectedIndex = i;
+                    break;
+                }
+            }
+            setTimeout(() => updateShippingCost(), 100);
+        }
+        
+        const notice = document.querySelector('.address-notice');
+        if (notice) notice.remove();
+    }
+    
+    checkFormValidity();
+    
+    // Tampilkan pesan sukses
+    showVoucherMessage('Alamat default berhasil diisi!', 'success');
+}
+
+// ✅ FUNCTION: Show payment section
+function showPayment() {
+    if (!checkFormValidity()) {
+        alert('Mohon lengkapi semua data yang wajib diisi!');
+        return;
+    }
+
+    document.getElementById('paymentSection').style.display = 'block';
+    document.getElementById('paymentSection').scrollIntoView({ behavior: 'smooth', block: 'start' });
+    
+    // ✅ PASTIKAN: Update totals sebelum menampilkan payment section
+    const shippingCost = getCurrentShippingCost();
+    const subtotal = getSubtotal();
+    const discountAmount = currentVoucher ? currentVoucher.discount_amount : 0;
+    updatePaymentSectionTotals(subtotal, shippingCost, discountAmount);
+}
+
+// ✅ SIMPLE VOUCHER FUNCTIONS
+function applyVoucher() {
+    const voucherCode = document.getElementById('voucherCode').value.trim();
+    const messageDiv = document.getElementById('voucherMessage');
+    
+    if (!voucherCode) {
+        showVoucherMessage('Kode voucher tidak boleh kosong!', 'error');
+        return;
+    }
+    
+    const btn = document.querySelector('.btn-apply-voucher');
+    btn.disabled = true;
+    btn.textContent = 'Memproses...';
+    
+    fetch(checkoutConfig.apply_voucher_url, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+            'X-CSRFToken': getCookie('csrftoken')
+        },
+        body: JSON.stringify({ voucher_code: voucherCode })
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            currentVoucher = {
+                code: data.voucher.code,
+                discount_amount: data.discount_amount
+            };
+            showVoucherMessage(data.message, 'success');
+            updateTotals();
+            updateVoucherUI();
+        } else {
+            showVoucherMessage(data.message, 'error');
+        }
+    })
+    .catch(error => {
+        console.error('Error:', error);
+        showVoucherMessage('Terjadi kesalahan!', 'error');
+    })
+    .finally(() => {
+        btn.disabled = false;
+        btn.textContent = 'Terapkan';
+    });
+}
+
+function removeVoucher() {
+    fetch(checkoutConfig.remove_voucher_url, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+            'X-CSRFToken': getCookie('csrftoken')
+        }
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            currentVoucher = null;
+            updateTotals();
+            updateVoucherUI();
+            showVoucherMessage(data.message, 'success');
+        } else {
+            showVoucherMessage(data.message, 'error');
+        }
+    })
+    .catch(error => {
+        console.error('Error:', error);
+        showVoucherMessage('Terjadi kesalahan!', 'error');
+    });
+}
+
+// ✅ FUNCTION: Update voucher UI
+function updateVoucherUI() {
+    const voucherSection = document.getElementById('voucherSection');
+    
+    if (currentVoucher) {
+        voucherSection.innerHTML = `
+            <h3 class="section-subtitle">Voucher Diskon</h3>
+            <div class="applied-voucher">
+                <div class="voucher-success">
+                    <svg width="20" height="20" fill="currentColor" viewBox="0 0 24 24">
+                        <path d="M9 16.17L4.83 12l-1.42 1.41L9 19 21 7l-1.41-1.41z"/>
+                    </svg>
+                    <div>
+                        <strong>Voucher ${currentVoucher.code} diterapkan!</strong>
+                        <span>Diskon: ${formatRupiah(currentVoucher.discount_amount)}</span>
+                    </div>
+                    <button type="button" class="remove-voucher-btn" onclick="removeVoucher()">
+                        <svg width="16" height="16" fill="none" stroke="currentColor" viewBox="0 0 24 24">
+                            <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M6 18L18 6M6 6l12 12"/>
+                        </svg>
+                    </button>
+                </div>
+            </div>
+        `;
+    } else {
+        voucherSection.innerHTML = `
+            <h3 class="section-subtitle">Voucher Diskon</h3>
+            <div class="voucher-input-group">
+                <input type="text" id="voucherCode" placeholder="Masukkan kode voucher" maxlength="20">
+                <button type="button" class="btn-apply-voucher" onclick="applyVoucher()">Terapkan</button>
+            </div>
+            <div id="voucherMessage" class="voucher-message"></div>
+        `;
+    }
+}
+
+// ✅ FUNCTION: Update all totals
+function updateTotals(shippingCost = null) {
+    const subtotal = getSubtotal();
+    const finalShippingCost = shippingCost !== null ? shippingCost : getCurrentShippingCost();
+    const discountAmount = currentVoucher ? currentVoucher.discount_amount : 0;
+    const total = subtotal + finalShippingCost - discountAmount;
+    
+    updateSummaryTotals(subtotal, finalShippingCost, discountAmount);
+    updatePaymentSectionTotals(subtotal, finalShippingCost, discountAmount);
+}
+
+// ✅ FUNCTION: Update summary totals
+function updateSummaryTotals(subtotal, shippingCost, discountAmount) {
+    const total = subtotal + shippingCost - discountAmount;
+    const shippingMethod = document.getElementById('shippingMethod').value;
+    const shippingType = document.getElementById('shippingType').value;
+    
+    // Update subtotal
+    const subtotalElement = document.querySelector('.summary-totals .total-row:first-child span:last-child');
+    if (subtotalElement) {
+        subtotalElement.textContent = formatRupiah(subtotal);
+    }
+    
+    // Update discount row
+    let discountRow = document.querySelector('.summary-totals .discount-row');
+    if (discountAmount > 0 && currentVoucher) {
+        if (!discountRow) {
+            const subtotalRow = document.querySelector('.summary-totals .total-row:first-child');
+            discountRow = document.createElement('div');
+            discountRow.className = 'total-row discount-row';
+            discountRow.innerHTML = `
+                <span>Diskon Voucher (${currentVoucher.code})</span>
+                <span>- ${formatRupiah(discountAmount)}</span>
+            `;
+            if (subtotalRow && subtotalRow.parentNode) {
+                subtotalRow.parentNode.insertBefore(discountRow, subtotalRow.nextSibling);
+            }
+        }
+    } else if (discountRow) {
+        discountRow.remove();
+    }
+    
+    // Update shipping
+    let shippingTypeName = 'Reguler';
+    if (shippingMethod === 'pickup') {
+        shippingTypeName = 'Pick Up';
+        document.getElementById('summary-shipping').textContent = 'GRATIS';
+    } else {
+        if (shippingType === 'express') {
+            shippingTypeName = 'Express';
+        }
+        document.getElementById('summary-shipping').textContent = formatRupiah(shippingCost);
+    }
+    
+    document.getElementById('summary-shipping-type').textContent = shippingTypeName;
+    document.getElementById('summary-total').textContent = formatRupiah(total);
+}
+
+// ✅ FUNCTION: Update payment section totals
+function updatePaymentSectionTotals(subtotal, shippingCost, discountAmount) {
+    const total = subtotal + shippingCost - discountAmount;
+    const paymentSection = document.getElementById('paymentSection');
+    const shippingMethod = document.getElementById('shippingMethod').value;
+    const shippingType = document.getElementById('shippingType').value;
+    
+    if (paymentSection.style.display !== 'none') {
+        // Update subtotal
+        const paymentSubtotalElement = document.querySelector('.payment-summary .summary-row:first-child .amount');
+        if (paymentSubtotalElement) {
+            paymentSubtotalElement.textContent = formatRupiah(subtotal);
+        }
+        
+        // Update discount
+        let paymentDiscountRow = document.querySelector('.payment-summary .discount-row');
+        if (discountAmount > 0 && currentVoucher) {
+            if (!paymentDiscountRow) {
+                const paymentSubtotalRow = document.querySelector('.payment-summary .summary-row:first-child');
+                paymentDiscountRow = document.createElement('div');
+                paymentDiscountRow.className = 'summary-row discount-row';
+                paymentDiscountRow.innerHTML = `
+                    <span>Diskon Voucher (${currentVoucher.code})</span>
+                    <span class="amount">- ${formatRupiah(discountAmount)}</span>
+                `;
+                if (paymentSubtotalRow && paymentSubtotalRow.parentNode) {
+                    paymentSubtotalRow.parentNode.insertBefore(paymentDiscountRow, paymentSubtotalRow.nextSibling);
+                }
+            }
+        } else if (paymentDiscountRow) {
+            paymentDiscountRow.remove();
+        }
+        
+        // Update shipping
+        let shippingTypeName = 'Reguler';
+        if (shippingMethod === 'pickup') {
+            shippingTypeName = 'Pick Up';
+            document.getElementById('finalShippingCost').textContent = 'GRATIS';
+        } else {
+            if (shippingType === 'express') {
+                shippingTypeName = 'Express';
+            }
+            document.getElementById('finalShippingCost').textContent = formatRupiah(shippingCost);
+        }
+        
+        document.getElementById('finalShippingType').textContent = shippingTypeName;
+        document.getElementById('finalTotal').textContent = formatRupiah(total);
+    }
+}
+
+function getCurrentShippingCost() {
+    const shippingMethod = document.getElementById('shippingMethod').value;
+    
+    if (shippingMethod === 'pickup') {
+        return 0;
+    }
+    
+    const districtSelect = document.getElementById('district');
+    const selectedDistrict = districtSelect.value;
+    const shippingType = document.getElementById('shippingType').value;
+    
+    if (selectedDistrict && shippingCosts[selectedDistrict]) {
+        const baseCost = shippingCosts[selectedDistrict];
+        return shippingType === 'express' ? baseCost + EXPRESS_SURCHARGE : baseCost;
+    }
+    
+    return 0;
+}
+
+function showVoucherMessage(message, type) {
+    const messageDiv = document.getElementById('voucherMessage');
+    if (messageDiv) {
+        messageDiv.textContent = message;
+        messageDiv.className = `voucher-message ${type}`;
+        
+        if (type === 'success') {
+            setTimeout(() => {
+                messageDiv.textContent = '';
+                messageDiv.className = 'voucher-message';
+            }, 3000);
+        }
+    }
+}
+
+// Function to get CSRF token
+function getCookie(name) {
+    let cookieValue = null;
+    if (document.cookie && document.cookie !== '') {
+        const cookies = document.cookie.split(';');
+        for (let i = 0; i < cookies.length; i++) {
+            const cookie = cookies[i].trim();
+            if (cookie.substring(0, name.length + 1) === (name + '=')) {
+                cookieValue = decodeURIComponent(cookie.substring(name.length + 1));
+                break;
+            }
+        }
+    }
+    return cookieValue;
+}
+
+// Event listeners
+document.querySelectorAll('input, textarea, select').forEach(field => {
+    field.addEventListener('input', function() {
+        this.classList.remove('input-error');
+        checkFormValidity();
+        if (this.id === 'district') updateShippingCost();
+    });
+    field.addEventListener('change', function() {
+        this.classList.remove('input-error');
+        checkFormValidity();
+        if (this.id === 'district') updateShippingCost();
+    });
+});
+
+// ✅ DIPERBAIKI: Initialize dengan form kosong
+document.addEventListener('DOMContentLoaded', function() {
+    console.log('Checkout page loaded');
+    
+    // Initialize voucher UI
+    updateVoucherUI();
+    
+    // ✅ DIPERBAIKI: Auto-set city dan province TANPA mengisi field lain
+    const cityField = document.getElementById('city');
+    const provinceField = document.getElementById('province');
+    if (cityField && !cityField.value) cityField.value = 'Makassar';
+    if (provinceField && !provinceField.value) provinceField.value = 'Sulawesi Selatan';
+    
+    // ✅ DIPERBAIKI: Kosongkan field lainnya
+    document.getElementById('full_name').value = '';
+    document.getElementById('phone').value = '';
+    document.getElementById('address').value = '';
+    document.getElementById('district').selectedIndex = 0;
+    document.getElementById('postal_code').value = '';
+    
+    // Initialize shipping method
+    const initialShippingMethod = checkoutConfig.shipping_method;
+    selectShippingMethod(initialShippingMethod);
+    
+    // Add event listeners
+    document.querySelectorAll('input[name="shipping_type_radio"]').forEach(radio => {
+        radio.addEventListener('change', function() {
+            selectShippingType(this.value);
+        });
+    });
+    
+    // Initialize shipping cost if delivery
+    if (initialShippingMethod === 'delivery') {
+        const districtSelect = document.getElementById('district');
+        if (districtSelect.value) {
+            setTimeout(() => updateShippingCost(), 500);
+        }
+        districtSelect.addEventListener('change', function() {
+            updateShippingCost();
+        });
+    }
+    
+    // Initial totals update
+    updateTotals();
+    checkFormValidity();
+});
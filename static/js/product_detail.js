@@ -0,0 +1,367 @@
+// static/js/product_detail.js
+// ============ IMAGE GALLERY ============
+// Data dari view (lihat product_config)
+const productConfig = JSON.parse(document.getElementById('product-config').textContent);
+
+const images = productConfig.images;
+let currentImageIndex = 0;
+const maxStock = productConfig.max_stock;
+
+function changeImage(direction) {
+    if (images.length <= 1) return;
+    currentImageIndex += direction;
+    if (currentImageIndex < 0) currentImageIndex = images.length - 1;
+    else if (currentImageIndex >= images.length) currentImageIndex = 0;
+    updateImage();
+}
+
+function selectImage(index) {
+    currentImageIndex = index;
+    updateImage();
+}
+
+function updateImage() {
+    const mainImage = document.getElementById('mainImage');
+    if (mainImage && images[currentImageIndex]) {
+        mainImage.src = images[currentImageIndex];
+    }
+    document.querySelectorAll('.thumbnail').forEach((thumb, index) => {
+        thumb.classList.toggle('active', index === currentImageIndex);
+    });
+}
+
+// ============ QUANTITY CONTROLS ============
+function increaseQty() {
+    const input = document.getElementById('qty-input');
+    if (parseInt(input.value) < maxStock) input.value = parseInt(input.value) + 1;
+}
+
+function decreaseQty() {
+    const input = document.getElementById('qty-input');
+    if (parseInt(input.value) > 1) input.value = parseInt(input.value) - 1;
+}
+
+// ============ TOAST NOTIFICATION ============
+function showToast(message, isError = false) {
+    const toast = document.getElementById('toast');
+    const toastMessage = document.getElementById('toastMessage');
+    
+    toastMessage.textContent = message;
+    
+    if (isError) {
+        toast.classList.add('error');
+    } else {
+        toast.classList.remove('error');
+    }
+    
+    toast.classList.add('show');
+    
+    setTimeout(() => {
+        toast.classList.remove('show');
+    }, 3000);
+}
+
+// ============ ADD TO CART - AJAX ============
+const addToCartForm = document.getElementById('addToCartForm');
+
+function initAddToCart() {
+    if (!addToCartForm || !document.getElementById('addToCartBtn')) return;
+    addToCartForm.addEventListener('submit', function(e) {
+        e.preventDefault();
+    
+        const form = this;
+        const btn = document.getElementById('addToCartBtn');
+        const formData = new FormData(form);
+    
+        btn.classList.add('loading');
+        btn.disabled = true;
+    
+        fetch(form.action, {
+            method: 'POST',
+            body: formData,
+            headers: {
+                'X-Requested-With': 'XMLHttpRequest',
+                'X-CSRFToken': formData.get('csrfmiddlewaretoken')
+            }
+        })
+        .then(response => response.json())
+        .then(data => {
+            btn.classList.remove('loading');
+            btn.disabled = false;
+        
+            if (data.success) {
+                showToast(data.message, false);
+            
+                if (typeof window.updateCartBadge === 'function') {
+                    window.updateCartBadge(data.cart_count);
+                }
+            
+                document.getElementById('qty-input').value = 1;
+            } else {
+                showToast(data.message, true);
+            }
+        })
+        .catch(error => {
+            console.error('Error:', error);
+            btn.classList.remove('loading');
+            btn.disabled = false;
+            showToast('Terjadi kesalahan. Silakan coba lagi.', true);
+        });
+    });
+}
+
+initAddToCart();
+
+// ✅ BUY NOW - LANGSUNG KE CHECKOUT
+function buyNow() {
+    const btn = document.getElementById('buyNowBtn');
+    if (!btn) {
+        window.location.href = productConfig.login_url;
+        return;
+    }
+
+    const quantity = document.getElementById('qty-input').value;
+    
+    btn.classList.add('loading');
+    btn.disabled = true;
+    
+    const formData = new FormData();
+    formData.append('quantity', quantity);
+    formData.append('csrfmiddlewaretoken', addToCartForm.querySelector('[name=csrfmiddlewaretoken]').value);
+    
+    fetch(productConfig.buy_now_url, {
+        method: 'POST',
+        body: formData,
+        headers: {
+            'X-Requested-With': 'XMLHttpRequest',
+        }
+    })
+    .then(response => response.json())
+    .then(data => {
+        btn.classList.remove('loading');
+        btn.disabled = false;
+        
+        if (data.success) {
+            // Redirect ke checkout
+            window.location.href = data.redirect_url;
+        } else {
+            showToast(data.message, true);
+        }
+    })
+    .catch(error => {
+        console.error('Error:', error);
+        btn.classList.remove('loading');
+        btn.disabled = false;
+        showToast('Terjadi kesalahan. Silakan coba lagi.', true);
+    });
+}
+
+// ============ STAR RATING ============
+function initStarRating(containerId, inputId) {
+    const container = document.getElementById(containerId);
+    const input = document.getElementById(inputId);
+    
+    if (!container || !input) return;
+    
+    const stars = container.querySelectorAll('.star');
+    
+    stars.forEach(star => {
+        star.addEventListener('click', function() {
+            const value = this.getAttribute('data-value');
+            input.value = value;
+            
+            stars.forEach(s => {
+                if (parseInt(s.getAttribute('data-value')) <= parseInt(value)) {
+                    s.textContent = '★';
+                    s.classList.add('active');
+                } else {
+                    s.textContent = '☆';
+                    s.classList.remove('active');
+                }
+            });
+        });
+        
+        star.addEventListener('mouseover', function() {
+            const value = this.getAttribute('data-value');
+            stars.forEach(s => {
+                if (parseInt(s.getAttribute('data-value')) <= parseInt(value)) {
+                    s.textContent = '★';
+                } else {
+                    s.textContent = '☆';
+                }
+            });
+        });
+    });
+    
+    container.addEventListener('mouseleave', function() {
+        const currentValue = input.value;
+        stars.forEach(s => {
+            if (parseInt(s.getAttribute('data-value')) <= parseInt(currentValue)) {
+                s.textContent = '★';
+            } else {
+                s.textContent = '☆';
+            }
+        });
+    });
+}
+
+// Initialize star ratings
+initStarRating('starRating', 'ratingInput');
+initStarRating('editStarRating', 'editRatingInput');
+
+// ============ EDIT REVIEW MODAL ============
+function editReview(reviewId, rating, comment) {
+    const modal = document.getElementById('editReviewModal');
+    const form = document.getElementById('editReviewForm');
+    const ratingInput = document.getElementById('editRatingInput');
+    const commentInput = document.getElementById('editComment');
+    
+    form.action = `/review/${reviewId}/edit/`;
+    ratingInput.value = rating;
+    commentInput.value = comment;
+    
+    // Set star display
+    const stars = document.querySelectorAll('#editStarRating .star');
+    stars.forEach(star => {
+        const value = parseInt(star.getAttribute('data-value'));
+        if (value <= rating) {
+            star.textContent = '★';
+            star.classList.add('active');
+        } else {
+            star.textContent = '☆';
+            star.classList.remove('active');
+        }
+    });
+    
+    modal.style.display = 'block';
+}
+
+function closeModal() {
+    document.getElementById('editReviewModal').style.display = 'none';
+}
+
+// Close modal when clicking outside
+window.onclick = function(event) {
+    const modal = document.getElementById('editReviewModal');
+    if (event.target == modal) {
+        modal.style.display = 'none';
+    }
+}
+
+// ============ REVIEWS (CURSOR PAGINATION) ============
+// Halaman pertama dirender server, berikutnya dari endpoint product_reviews
+let ownReview = null;
+
+function applyOwnReview(container) {
+    if (!ownReview) return;
+    const header = container.querySelector(`.review-item[data-review-id="${ownReview.id}"] .review-header`);
+    if (header && !header.querySelector('.review-actions')) {
+        header.insertAdjacentHTML('beforeend', ownReview.html);
+    }
+}
+
+function initReviews() {
+    const list = document.getElementById('reviewsList');
+    const loadMore = document.getElementById('loadMoreReviews');
+    const sortSelect = document.getElementById('reviewSort');
+    if (!list || !loadMore) return;
+    
+    // Tombol edit/hapus review milik user yang dirender server dipakai ulang untuk halaman berikutnya
+    const existingActions = list.querySelector('.review-actions');
+    if (existingActions) {
+        ownReview = {
+            id: existingActions.closest('.review-item').dataset.reviewId,
+            html: existingActions.outerHTML
+        };
+    }
+    
+    let loading = false;
+    
+    function loadReviews(cursor, replace) {
+        if (loading) return;
+        loading = true;
+        loadMore.disabled = true;
+        
+        const params = new URLSearchParams({sort: sortSelect ? sortSelect.value : 'newest'});
+        if (cursor) params.set('cursor', cursor);
+        
+        fetch(`${productConfig.reviews_url}?${params}`, {
+            headers: {'X-Requested-With': 'XMLHttpRequest'}
+        })
+        .then(response => response.json())
+        .then(data => {
+            const html = data.html.trim();
+            if (replace) {
+                list.innerHTML = html || '<div class="no-reviews"><p>Belum ada review untuk pilihan ini.</p></div>';
+            } else {
+                list.insertAdjacentHTML('beforeend', html);
+            }
+            applyOwnReview(list);
+            loadMore.dataset.cursor = data.next_cursor || '';
+            loadMore.hidden = !data.next_cursor;
+        })
+        .catch(error => {
+            console.error('Gagal memuat review:', error);
+            showToast('Gagal memuat review', true);
+        })
+        .finally(() => {
+            loading = false;
+            loadMore.disabled = false;
+        });
+    }
+    
+    loadMore.addEventListener('click', () => loadReviews(loadMore.dataset.cursor, false));
+    if (sortSelect) {
+        sortSelect.addEventListener('change', () => loadReviews('', true));
+    }
+}
+
+initReviews();
+
+// ============ HYDRATE (HALAMAN TER-CACHE / PRE-RENDER) ============
+// HTML versi anonim; bagian personal dimuat dari endpoint product_user_state
+function addCsrfInput(form, token) {
+    if (!form || form.querySelector('[name=csrfmiddlewaretoken]')) return;
+    const input = document.createElement('input');
+    input.type = 'hidden';
+    input.name = 'csrfmiddlewaretoken';
+    input.value = token;
+    form.prepend(input);
+}
+
+function hydrateProductPage() {
+    if (typeof window.shouldHydrate !== 'function' || !window.shouldHydrate()) return;
+    
+    fetch(productConfig.user_state_url, {
+        credentials: 'same-origin',
+        headers: {'X-Requested-With': 'XMLHttpRequest'}
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (!data.authenticated) return;
+        
+        const actions = document.getElementById('productActions');
+        if (actions) {
+            addCsrfInput(addToCartForm, data.csrf_token);
+            actions.innerHTML = data.actions_html;
+            initAddToCart();
+        }
+        
+        const reviewForm = document.getElementById('productReviewForm');
+        if (reviewForm) {
+            reviewForm.innerHTML = data.review_form_html;
+            initStarRating('starRating', 'ratingInput');
+        }
+        
+        if (data.own_review) {
+            ownReview = data.own_review;
+            applyOwnReview(document);
+        }
+        addCsrfInput(document.getElementById('editReviewForm'), data.csrf_token);
+    })
+    .catch(error => {
+        console.error('Gagal memuat data user:', error);
+    });
+}
+
+hydrateProductPage();
@@ -0,0 +1,102 @@
+// static/js/search_suggest.js
+// ============ SEARCH SUGGEST ============
+// Autocomplete kotak pencarian shop dari /api/search/suggest/ (lihat products/search_index.py)
+(function() {
+    const form = document.querySelector('.search-form[data-suggest-url]');
+    const input = document.getElementById('searchInput');
+    const list = document.getElementById('searchSuggestions');
+    if (!form || !input || !list) {
+        return;
+    }
+
+    const typeLabels = {category: 'Kategori', product: 'Produk'};
+    let timer = null;
+    let lastQuery = '';
+    let activeIndex = -1;
+
+    function hide() {
+        list.hidden = true;
+        list.innerHTML = '';
+        activeIndex = -1;
+        lastQuery = '';
+    }
+
+    function render(suggestions) {
+        list.innerHTML = '';
+        activeIndex = -1;
+        suggestions.forEach(function(suggestion) {
+            const item = document.createElement('li');
+            const link = document.createElement('a');
+            link.href = suggestion.url;
+            link.textContent = suggestion.label;
+            const type = document.createElement('span');
+            type.className = 'suggestion-type';
+            type.textContent = typeLabels[suggestion.type] || '';
+            link.appendChild(type);
+            item.appendChild(link);
+            list.appendChild(item);
+        });
+        list.hidden = suggestions.length === 0;
+    }
+
+    function fetchSuggestions() {
+        const query = input.value.trim();
+        if (query === lastQuery) {
+            return;
+        }
+        lastQuery = query;
+        if (!query) {
+            hide();
+            return;
+        }
+
+        fetch(form.dataset.suggestUrl + '?q=' + encodeURIComponent(query))
+        .then(function(response) { return response.json(); })
+        .then(function(data) {
+            // Abaikan jawaban untuk teks yang sudah diganti
+            if (data.query === input.value.trim()) {
+                render(data.suggestions);
+            }
+        })
+        .catch(function(error) {
+            console.error('Gagal memuat saran pencarian:', error);
+        });
+    }
+
+    function setActive(index) {
+        const links = list.querySelectorAll('a');
+        if (!links.length) {
+            return;
+        }
+        activeIndex = (index + links.length) % links.length;
+        links.forEach(function(link, i) {
+            link.classList.toggle('active', i === activeIndex);
+        });
+    }
+
+    input.addEventListener('input', function() {
+        clearTimeout(timer);
+        timer = setTimeout(fetchSuggestions, 120);
+    });
+
+    input.addEventListener('keydown', function(e) {
+        if (list.hidden) {
+            return;
+        }
+        if (e.key === 'ArrowDown' || e.key === 'ArrowUp') {
+            e.preventDefault();
+            setActive(activeIndex + (e.key === 'ArrowDown' ? 1 : -1));
+        } else if (e.key === 'Enter' && activeIndex >= 0) {
+            e.preventDefault();
+            window.location.href = list.querySelectorAll('a')[activeIndex].href;
+        } else if (e.key === 'Escape') {
+            hide();
+        }
+    });
+
+    document.addEventListener('click', function(e) {
+        if (!form.contains(e.target)) {
+            hide();
+        }
+    });
+})();